@@ -0,0 +1,10 @@
+"""
+Benchmarks del proyecto.
+
+Cada módulo se ejecuta desde la raíz del repositorio, por ejemplo::
+
+    python -m benchmarks.paginacion --filas 1000000
+
+Ninguno toca la base de datos configurada en settings.py: todos trabajan sobre
+una base de datos de pruebas que se crea y se destruye al terminar.
+"""
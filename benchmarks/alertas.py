@@ -0,0 +1,93 @@
+"""
+Costo de las alertas por umbrales (``insect_app/alertas.py``) en el camino de
+escritura de una lectura de Temperatura.
+
+    python -m benchmarks.alertas --lecturas 500 --reglas 200
+
+Guarda lecturas una por una como la vista de creación (``create`` dentro de
+``transaction.atomic``, con las señales de resúmenes y caché) y reporta los
+microsegundos por lectura en cada caso:
+
+* ``sin revisión``: con la señal ``revisar_alertas`` desconectada (la base).
+* ``sin reglas``: la señal conectada y ninguna regla activa.
+* ``dentro de rango``: ``--reglas`` reglas activas (de otras áreas y una del
+  área de las lecturas) que ninguna lectura incumple.
+* ``fuera de rango``: cada lectura incumple una regla y escribe su ``Alerta`` y
+  su fila de ``SalidaAlerta``.
+
+Mide también la ingesta en lote (``ingesta.TEMPERATURA.guardar``) de
+``--lote`` lecturas, todas fuera de rango, con y sin ``revisar_lote``.
+"""
+import argparse
+import datetime
+import itertools
+from decimal import Decimal
+from unittest import mock
+
+from . import entorno
+
+AREA = 'Área Fase Adulta'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lecturas', type=int, default=500)
+    parser.add_argument('--reglas', type=int, default=200)
+    parser.add_argument('--lote', type=int, default=10000)
+    parser.add_argument('--repeticiones', type=int, default=5)
+    args = parser.parse_args()
+
+    entorno.configurar()
+    from django.db import transaction
+    from django.db.models.signals import post_save
+
+    from insect_app import alertas, ingesta, signals
+    from insect_app.models import Temperatura, ReglaAlerta, Alerta
+
+    minutos = itertools.count()
+
+    def lectura(valor):
+        momento = datetime.datetime(2024, 1, 1) + datetime.timedelta(minutes=next(minutos))
+        return Temperatura(temperatura=valor, max_temperatura=Decimal('30.0'), min_temperatura=Decimal('20.0'),
+                           hora=momento.time(), area_de_trabajo=AREA, fecha_creacion=momento)
+
+    def escribir(valor):
+        for _ in range(args.lecturas):
+            with transaction.atomic():
+                lectura(valor).save()
+
+    def por_lectura(valor):
+        return entorno.medir(lambda: escribir(valor), args.repeticiones) * 1000 / args.lecturas
+
+    with entorno.base_de_datos_temporal() as connection:
+        print(f"{args.lecturas} lecturas por medición ({connection.vendor}), {args.reglas} reglas")
+        print(f"{'caso':<18} {'µs/lectura':>11} {'extra µs':>9}")
+        dentro = Decimal('25.0')
+
+        post_save.disconnect(signals.revisar_alertas, sender=Temperatura)
+        base = por_lectura(dentro)
+        post_save.connect(signals.revisar_alertas, sender=Temperatura)
+        print(f"{'sin revisión':<18} {base:>11.0f} {'':>9}")
+
+        casos = {'sin reglas': (dentro, 0), 'dentro de rango': (dentro, args.reglas), 'fuera de rango': (Decimal('35.0'), args.reglas)}
+        for nombre, (valor, cantidad) in casos.items():
+            ReglaAlerta.objects.all().delete()
+            # Todas menos una son de otras áreas: la del área de las lecturas decide
+            areas = [f'Área {i}' for i in range(1, cantidad)] + [AREA] if cantidad else []
+            ReglaAlerta.objects.bulk_create(
+                [ReglaAlerta(variable='temperatura', area_de_trabajo=area, maximo=Decimal('30.0')) for area in areas]
+            )
+            alertas.olvidar_reglas()
+            tiempo = por_lectura(valor)
+            print(f"{nombre:<18} {tiempo:>11.0f} {tiempo - base:>9.0f}")
+
+        lote = lambda: ingesta.TEMPERATURA.guardar([lectura(Decimal('35.0')) for _ in range(args.lote)])
+        with mock.patch.object(alertas, 'revisar_lote'):
+            sin_alertas = entorno.medir(lote, args.repeticiones)
+        con_alertas = entorno.medir(lote, args.repeticiones)
+        print(f"ingesta de {args.lote}: {sin_alertas:.0f} ms sin alertas, {con_alertas:.0f} ms con "
+              f"{args.lote} alertas ({Alerta.objects.count()} alertas en total)")
+
+
+if __name__ == '__main__':
+    main()
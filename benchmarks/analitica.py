@@ -0,0 +1,87 @@
+"""
+Tiempo de las estadísticas de diez años de lecturas de Temperatura con
+``insect_app/analitica.py``, contra el mismo cálculo con instancias del modelo
+y ``Decimal``.
+
+    python -m benchmarks.analitica --dias 3650 --sitios 10
+
+Genera las lecturas con ``generar_datos`` (tres por día hábil y área, por
+sitio) y mide, para todas las áreas y para un filtro típico ("Área Fase
+Adulta", último año):
+
+* ``instancias``: ``Temperatura.objects.filter(...)`` y los promedios, mínimos,
+  máximos y lecturas fuera de rango por área y día en un diccionario.
+* ``numpy``: ``analitica.diario`` y ``analitica.movil(7)``, que leen
+  ``ResumenDiario``, y ``fuera_de_rango()`` sobre ``analitica.cargar``.
+* ``caché``: lo mismo con la serie de ``analitica.serie``, ya guardada en la
+  caché.
+"""
+import argparse
+import datetime
+import io
+from collections import defaultdict
+
+from . import entorno
+
+
+def con_instancias(condicion):
+    from insect_app.models import Temperatura
+
+    grupos = defaultdict(lambda: [0, 0, None, None, 0])
+    for lectura in Temperatura.objects.filter(condicion):
+        if lectura.temperatura is None:
+            continue
+        grupo = grupos[lectura.area_de_trabajo, lectura.fecha_creacion.date()]
+        grupo[0] += 1
+        grupo[1] += lectura.temperatura
+        grupo[2] = lectura.temperatura if grupo[2] is None else min(grupo[2], lectura.temperatura)
+        grupo[3] = lectura.temperatura if grupo[3] is None else max(grupo[3], lectura.temperatura)
+        if lectura.max_temperatura is not None and lectura.min_temperatura is not None:
+            grupo[4] += not lectura.min_temperatura <= lectura.temperatura <= lectura.max_temperatura
+    return {clave: (cantidad, suma / cantidad, minimo, maximo, fuera)
+            for clave, (cantidad, suma, minimo, maximo, fuera) in grupos.items()}
+
+
+def estadisticas(analitica, cargar, params):
+    fuente = analitica.TEMPERATURA
+    return analitica.diario(fuente, params), analitica.movil(fuente, params, 7), cargar(fuente, params).fuera_de_rango()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dias', type=int, default=3650)
+    parser.add_argument('--sitios', type=int, default=10)
+    parser.add_argument('--repeticiones', type=int, default=5)
+    args = parser.parse_args()
+
+    entorno.configurar()
+    from django.core.management import call_command
+    from django.test import override_settings
+
+    from insect_app import analitica
+    from insect_app.models import Temperatura
+
+    desde = datetime.date(2015, 1, 1)
+    ultimo_anio = (desde + datetime.timedelta(days=args.dias - 365)).isoformat()
+    casos = {
+        'todas': {},
+        'adulta, último año': {'area': 'Área Fase Adulta', 'desde': ultimo_anio},
+    }
+    cache = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    with entorno.base_de_datos_temporal() as connection, override_settings(CACHES=cache):
+        call_command('generar_datos', desde=desde, dias=args.dias, sitios=args.sitios, stdout=io.StringIO())
+        print(f"{Temperatura.objects.count()} lecturas de Temperatura ({connection.vendor}), "
+              f"{args.dias} días, {args.sitios} sitios")
+        print(f"{'filtro':<20} {'lecturas':>9} {'instancias ms':>14} {'numpy ms':>9} {'caché ms':>9} {'mejora':>7}")
+        for nombre, params in casos.items():
+            condicion = analitica.TEMPERATURA.filtros.condicion(params)
+            antes = entorno.medir(lambda: con_instancias(condicion), args.repeticiones)
+            ahora = entorno.medir(lambda: estadisticas(analitica, analitica.cargar, params), args.repeticiones)
+            analitica.serie(analitica.TEMPERATURA, params)
+            en_cache = entorno.medir(lambda: estadisticas(analitica, analitica.serie, params), args.repeticiones)
+            lecturas = len(analitica.serie(analitica.TEMPERATURA, params))
+            print(f"{nombre:<20} {lecturas:>9} {antes:>14.1f} {ahora:>9.1f} {en_cache:>9.1f} {antes / ahora:>6.1f}x")
+
+
+if __name__ == '__main__':
+    main()
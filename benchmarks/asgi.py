@@ -0,0 +1,240 @@
+"""
+Peticiones concurrentes servidas con WSGI (workers síncronos de gunicorn) y con
+ASGI (workers de uvicorn, vistas asíncronas).
+
+    python -m benchmarks.asgi --veces 10 --clientes 32 --exportadores 4 --segundos 20
+
+Siembra una base de datos de pruebas como ``benchmarks.carga`` y arranca
+gunicorn dos veces sobre ella, con ``--workers`` procesos: primero
+``insectario_project.wsgi`` con los workers síncronos (la configuración
+anterior) y después ``insectario_project.asgi`` con ``uvicorn_worker`` (la del
+Dockerfile). En cada uno, durante ``--segundos``, ``--exportadores`` clientes
+descargan sin pausa la exportación CSV de un modelo (peticiones largas) y el
+resto de los ``--clientes`` piden páginas de DataTables y listas, como la
+tabla de un usuario que navega mientras otro exporta. Cada cliente es un hilo
+con su propia conexión HTTP y la cookie de una sesión iniciada.
+
+Informa, por servidor y tipo de petición, las peticiones por segundo y la
+latencia p50/p95. Con ``--salida`` guarda el resultado en JSON.
+
+Con SQLite la base de datos está en el mismo proceso y no hay espera de red:
+la diferencia entre los dos servidores es menor que con MariaDB.
+"""
+import argparse
+import http.client
+import io
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+from . import entorno
+from .carga import CLAVE, DATATABLES, FORMULARIOS, USUARIO, percentiles
+from .importacion import volcado_sintetico
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVIDORES = {
+    'wsgi': ['insectario_project.wsgi:application'],
+    'asgi': ['insectario_project.asgi:application', '--worker-class', 'uvicorn_worker.UvicornWorker'],
+}
+
+# Configuración de los servidores: la del proyecto sobre la base de datos de pruebas
+CONFIGURACION = """\
+from {modulo} import *  # noqa
+
+DEBUG = False
+ALLOWED_HOSTS = ['*']
+DATABASES = {{'default': {{**DATABASES['default'], **{base_de_datos!r}}}}}
+CACHES = {{'default': {{'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': {cache!r}}}}}
+"""
+
+
+def puerto_libre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def rutas(prefijo, numero):
+    """Las peticiones de un cliente que navega: páginas de DataTables (con y sin búsqueda) y la lista."""
+    desplazamiento = {**DATATABLES, 'start': str(25 * (numero % 20))}
+    busqueda = {**DATATABLES, 'search[value]': ('Adulta', 'Inmadura', 'Aedes', '1')[numero % 4]}
+    return [
+        ('datos', f'/{prefijo}/datos/?{urlencode(desplazamiento)}'),
+        ('datos', f'/{prefijo}/datos/?{urlencode(busqueda)}'),
+        ('lista', f'/{prefijo}/'),
+    ]
+
+
+def urls_de_modelos():
+    """Prefijo de las URL de cada modelo (``/temperaturas/``, ...), según ``insect_app/urls.py``."""
+    from django.urls import reverse
+
+    return [reverse(f'{nombre}_list').strip('/') for nombre, _, _ in FORMULARIOS]
+
+
+def cliente(puerto, cookie, peticiones, hasta):
+    """Repite ``peticiones`` hasta el instante ``hasta``; devuelve ``(tipo, segundos, error)`` de cada una."""
+    conexion = http.client.HTTPConnection('127.0.0.1', puerto, timeout=300)
+    mediciones = []
+    i = 0
+    while time.perf_counter() < hasta:
+        tipo, url = peticiones[i % len(peticiones)]
+        i += 1
+        inicio = time.perf_counter()
+        try:
+            conexion.request('GET', url, headers={'Cookie': cookie})
+            response = conexion.getresponse()
+            response.read()
+            error = response.status != 200
+            if response.will_close:
+                conexion.close()
+        except (OSError, http.client.HTTPException):
+            conexion.close()
+            error = True
+        mediciones.append((tipo, time.perf_counter() - inicio, error))
+    conexion.close()
+    return mediciones
+
+
+def esperar(puerto, proceso, limite=60):
+    """Espera a que el servidor acepte conexiones."""
+    fin = time.monotonic() + limite
+    while time.monotonic() < fin:
+        if proceso.poll() is not None:
+            raise RuntimeError(f"gunicorn terminó con código {proceso.returncode}")
+        try:
+            with socket.create_connection(('127.0.0.1', puerto), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("gunicorn no aceptó conexiones a tiempo")
+
+
+def medir_servidor(servidor, entorno_servidor, args, cookie, prefijos):
+    puerto = puerto_libre()
+    proceso = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', *SERVIDORES[servidor], '--workers', str(args.workers),
+         '--bind', f'127.0.0.1:{puerto}', '--log-level', 'warning'],
+        cwd=RAIZ, env=entorno_servidor,
+    )
+    try:
+        esperar(puerto, proceso)
+        peticiones = []
+        for numero in range(args.clientes):
+            prefijo = prefijos[numero % len(prefijos)]
+            if numero < args.exportadores:
+                peticiones.append([('exportacion', f'/{prefijo}/exportar/?formato=csv')])
+            else:
+                peticiones.append(rutas(prefijo, numero))
+        # Calentamiento: cada proceso carga Django y la caché de las listas
+        for lista in peticiones:
+            cliente(puerto, cookie, lista, time.perf_counter() + 0.05)
+
+        hasta = time.perf_counter() + args.segundos
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(args.clientes) as ejecutor:
+            partes = list(ejecutor.map(lambda lista: cliente(puerto, cookie, lista, hasta), peticiones))
+        segundos = time.perf_counter() - inicio
+    finally:
+        proceso.send_signal(signal.SIGTERM)
+        proceso.wait(30)
+
+    mediciones = [m for parte in partes for m in parte]
+    resultado = {}
+    for tipo in ('datos', 'lista', 'exportacion'):
+        tiempos = [s * 1000 for t, s, _ in mediciones if t == tipo]
+        if not tiempos:
+            continue
+        p50, p95, _ = percentiles(tiempos)
+        resultado[tipo] = {
+            'peticiones': len(tiempos),
+            'errores': sum(error for t, _, error in mediciones if t == tipo),
+            'por_segundo': round(len(tiempos) / segundos, 2),
+            'p50_ms': round(p50, 3),
+            'p95_ms': round(p95, 3),
+        }
+    resultado['total'] = {'peticiones': len(mediciones), 'por_segundo': round(len(mediciones) / segundos, 2)}
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--archivo', default='bd_insecta.sql')
+    parser.add_argument('--veces', type=int, default=10)
+    parser.add_argument('--workers', type=int, default=3)
+    parser.add_argument('--clientes', type=int, default=32)
+    parser.add_argument('--exportadores', type=int, default=4)
+    parser.add_argument('--segundos', type=float, default=20)
+    parser.add_argument('--salida', help="archivo JSON donde guardar los resultados")
+    args = parser.parse_args()
+    if not 0 <= args.exportadores < args.clientes:
+        parser.error("--exportadores debe ser menor que --clientes")
+
+    entorno.configurar()
+    from django.conf import settings
+    from django.contrib.auth.models import User
+    from django.core.management import call_command
+    from django.test import Client
+
+    with tempfile.TemporaryDirectory() as directorio, entorno.base_de_datos_temporal(compartida=True) as connection:
+        ruta = os.path.join(directorio, 'volcado.sql')
+        filas = volcado_sintetico(args.archivo, ruta, args.veces, 500)
+        call_command('importar_volcado', ruta, progreso=0, stdout=io.StringIO())
+        usuario = User.objects.create_superuser(USUARIO, password=CLAVE)
+        # La sesión se guarda en la base de datos compartida con los servidores
+        sesion = Client()
+        sesion.force_login(usuario)
+        cookie = f'{settings.SESSION_COOKIE_NAME}={sesion.cookies[settings.SESSION_COOKIE_NAME].value}'
+        prefijos = urls_de_modelos()
+        connection.close()
+
+        with open(os.path.join(directorio, 'configuracion_benchmark.py'), 'w', encoding='utf-8') as archivo:
+            archivo.write(CONFIGURACION.format(
+                modulo=os.environ['DJANGO_SETTINGS_MODULE'],
+                base_de_datos={'NAME': connection.settings_dict['NAME']},
+                cache=os.path.join(directorio, 'cache'),
+            ))
+        entorno_servidor = {
+            **os.environ,
+            'DJANGO_SETTINGS_MODULE': 'configuracion_benchmark',
+            'PYTHONPATH': os.pathsep.join(filter(None, [directorio, RAIZ, os.environ.get('PYTHONPATH')])),
+            # gunicorn.conf.py vacía el directorio de las métricas al arrancar: no el de otro servidor
+            'PROMETHEUS_MULTIPROC_DIR': os.path.join(directorio, 'metricas'),
+        }
+
+        print(f"{filas} filas sembradas ({connection.vendor}); {args.workers} workers, "
+              f"{args.clientes} clientes ({args.exportadores} exportando), {args.segundos:.0f} s por servidor")
+        resultados = {}
+        for servidor in SERVIDORES:
+            resultados[servidor] = medir_servidor(servidor, entorno_servidor, args, cookie, prefijos)
+
+    print(f"{'servidor':<8} {'petición':<12} {'n':>6} {'err':>4} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9}")
+    for servidor, resultado in resultados.items():
+        for tipo, m in resultado.items():
+            if tipo == 'total':
+                continue
+            print(f"{servidor:<8} {tipo:<12} {m['peticiones']:>6} {m['errores']:>4} {m['por_segundo']:>8.1f} "
+                  f"{m['p50_ms']:>9.1f} {m['p95_ms']:>9.1f}")
+        print(f"{servidor:<8} {'total':<12} {resultado['total']['peticiones']:>6} {'':>4} {resultado['total']['por_segundo']:>8.1f}")
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as archivo:
+            json.dump({
+                'configuracion': {
+                    'motor': connection.vendor, 'filas': filas, 'workers': args.workers, 'clientes': args.clientes,
+                    'exportadores': args.exportadores, 'segundos': args.segundos, 'nucleos': os.cpu_count(),
+                },
+                'servidores': resultados,
+            }, archivo, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,281 @@
+"""
+Prueba de carga de toda la aplicación, con varios clientes a la vez.
+
+    python -m benchmarks.carga --veces 10 --clientes 8 --rondas 5 --salida carga.json
+    python -m benchmarks.carga --veces 10 --clientes 8 --rondas 5 --comparar carga.json
+
+Siembra una base de datos de pruebas con las filas de ``--archivo`` repetidas
+``--veces`` veces (el volcado sintético de ``benchmarks.importacion``, cargado
+con ``importar_volcado``) y lanza ``--clientes`` clientes, cada uno un hilo con
+su propio ``django.test.Client`` (todo el middleware, sin red). Cada cliente
+repite ``--rondas`` veces el recorrido por todas las URL de
+``insect_app/urls.py``: inicia sesión, y en cada modelo pide la lista, una
+página de DataTables y la exportación CSV, crea un registro, lo actualiza y lo
+elimina (formularios y confirmaciones incluidos); después envía un lote a cada
+ingesta, lee ``/metrics`` y cierra la sesión.
+
+Por endpoint (método y nombre de la URL) informa la latencia p50/p95/p99, las
+peticiones por segundo y las consultas por petición; con ``--salida`` guarda el
+resultado en JSON. Con ``--comparar`` sale con código 1 si el p95 de algún
+endpoint empeoró más de ``--umbral`` (proporción) y más de ``--tolerancia-ms``
+respecto de ese JSON, para que CI marque la regresión.
+
+Los clientes son hilos de un mismo proceso: la concurrencia ejercita los
+bloqueos de la base de datos y de la caché, no el paralelismo entre los
+workers de gunicorn.
+"""
+import argparse
+import base64
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import async_to_sync
+
+from . import entorno
+from .importacion import volcado_sintetico
+from .ingesta import lecturas
+
+USUARIO = 'carga'
+CLAVE = 'clave-de-prueba-1928'
+
+# Parámetros de la primera página que pide DataTables (ver datatables.py)
+DATATABLES = {'draw': '1', 'start': '0', 'length': '25', 'order[0][column]': '0', 'order[0][dir]': 'desc'}
+
+# Datos válidos del formulario de cada modelo: (prefijo de las URL, campo de observaciones, datos)
+FORMULARIOS = [
+    ('temperatura', 'obs', {
+        'temperatura': '25.5', 'max_temperatura': '30.0', 'min_temperatura': '20.0',
+        'hora': '07:30', 'area_de_trabajo': 'Área Fase Adulta',
+    }),
+    ('humedad', 'obs', {
+        'humedad': '80.0', 'max_humedad': '90.0', 'min_humedad': '70.0',
+        'hora': '07:30', 'area_de_trabajo': 'Área Fase Inmadura',
+    }),
+    ('vida', 'obs', {
+        'especie': 'Aedes aegypti', 'cepa': 'Rockefeller',
+        'fecha_inicio_bandejas': '2024-01-02', 'fecha_pupacion': '2024-01-09',
+        'numero_bandejas_antes_trabajo': '10', 'pupas_vivas': '120', 'pupas_muertas': '4',
+        'total_pupas_vivas_y_muertas': '124', 'larvas_muertas': '3', 'bandejas_divididas': '2',
+        'bandejas_existentes_despues_trabajo': '12', 'am_pm_pupas_vivas': 'AM',
+        'am_pm_pupas_muertas': 'AM', 'am_pm_larvas_muertas': 'PM', 'tiempo_bandeja': '7 días',
+    }),
+    ('mortalidad_pupas', 'obs', {'cepa': 'Yaviza', 'cantidad': '15'}),
+    ('registrotemperaturaagua', 'observaciones', {
+        'fecha': '2024-01-02', 'especie': 'Anopheles albimanus', 'cepa': 'Agua Clara',
+        'fecha_bandeja': '2024-01-01', 'temp_730am': '25.50', 'temp_max_730am': '26.00',
+        'temp_min_730am': '24.00', 'temp_1200md': '28.15', 'temp_1500pm': '27.00',
+    }),
+]
+
+
+@async_to_sync
+async def _leer_asincrona(response):
+    return b''.join([parte async for parte in response.streaming_content])
+
+
+def leer(response):
+    """El cuerpo completo de una respuesta por partes (las exportaciones son asíncronas)."""
+    if response.is_async:
+        return _leer_asincrona(response)
+    return b''.join(response.streaming_content)
+
+
+class Cliente:
+    """Un usuario que recorre la aplicación y anota cada petición."""
+
+    def __init__(self, numero):
+        from django.test import Client
+
+        self.numero = numero
+        self.client = Client(raise_request_exception=False)
+        self.mediciones = []
+
+    def pedir(self, metodo, nombre, args=(), esperado=(200,), **kwargs):
+        """
+        Hace la petición y anota ``(endpoint, segundos, consultas, error)``. Las
+        respuestas por partes (exportaciones) se leen completas dentro de la medición.
+        """
+        from django.db import connection
+        from django.urls import reverse
+
+        consultas = 0
+
+        def contar(execute, sql, params, many, context):
+            nonlocal consultas
+            consultas += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(contar):
+            inicio = time.perf_counter()
+            response = getattr(self.client, metodo)(reverse(nombre, args=args), **kwargs)
+            if response.streaming:
+                leer(response)
+            segundos = time.perf_counter() - inicio
+        self.mediciones.append((f'{metodo.upper()} {nombre}', segundos, consultas, response.status_code not in esperado))
+        return response
+
+    def ronda(self, ronda):
+        from django.apps import apps
+
+        self.pedir('get', 'login')
+        self.pedir('post', 'login', data={'username': USUARIO, 'password': CLAVE}, esperado=(302,))
+        for prefijo, campo_obs, datos in FORMULARIOS:
+            self.pedir('get', f'{prefijo}_list')
+            self.pedir('get', f'{prefijo}_data', data=DATATABLES)
+            self.pedir('get', f'{prefijo}_export', data={'formato': 'csv'})
+
+            # Crea un registro propio, lo actualiza y lo elimina
+            marca = f'carga {self.numero}-{ronda}'
+            self.pedir('get', f'{prefijo}_create')
+            self.pedir('post', f'{prefijo}_create', data={**datos, campo_obs: marca}, esperado=(302,))
+            modelo = apps.get_model('insect_app', prefijo)
+            pk = modelo.objects.filter(**{campo_obs: marca}).values_list('pk', flat=True).first()
+            if pk is None:
+                continue
+            self.pedir('get', f'{prefijo}_update', args=[pk])
+            self.pedir('post', f'{prefijo}_update', args=[pk], data={**datos, campo_obs: marca + ' (editado)'}, esperado=(302,))
+            self.pedir('get', f'{prefijo}_delete', args=[pk])
+            self.pedir('post', f'{prefijo}_delete', args=[pk], esperado=(302,))
+
+        cabecera = 'Basic ' + base64.b64encode(f'{USUARIO}:{CLAVE}'.encode()).decode()
+        temperaturas = list(lecturas(50, semilla=self.numero * 1000 + ronda))
+        humedades = [
+            {'humedad': '80.0', 'max_humedad': '90.0', 'min_humedad': '70.0',
+             **{campo: lectura[campo] for campo in ('hora', 'area_de_trabajo', 'obs', 'fecha_creacion')}}
+            for lectura in temperaturas
+        ]
+        for prefijo, lote in (('temperatura', temperaturas), ('humedad', humedades)):
+            self.pedir('post', f'{prefijo}_ingesta', data=json.dumps(lote), content_type='application/json',
+                       headers={'authorization': cabecera}, esperado=(201,))
+
+        self.pedir('get', 'metricas')
+        self.pedir('get', 'logout', esperado=(302,))
+
+    def recorrer(self, rondas):
+        from django.db import connection
+
+        try:
+            for ronda in range(rondas):
+                self.ronda(ronda)
+        finally:
+            connection.close()
+        return self.mediciones
+
+
+def percentiles(tiempos):
+    """p50, p95 y p99 de ``tiempos``."""
+    if len(tiempos) == 1:
+        return tiempos * 3
+    cortes = statistics.quantiles(tiempos, n=100, method='inclusive')
+    return cortes[49], cortes[94], cortes[98]
+
+
+def resumir(mediciones, segundos):
+    """Agrupa las mediciones por endpoint: latencias en ms, peticiones por segundo y consultas."""
+    por_endpoint = {}
+    for endpoint, duracion, consultas, error in mediciones:
+        por_endpoint.setdefault(endpoint, []).append((duracion * 1000, consultas, error))
+    endpoints = {}
+    for endpoint, filas in sorted(por_endpoint.items()):
+        tiempos = [ms for ms, _, _ in filas]
+        consultas = [n for _, n, _ in filas]
+        p50, p95, p99 = percentiles(tiempos)
+        endpoints[endpoint] = {
+            'peticiones': len(filas),
+            'errores': sum(error for _, _, error in filas),
+            'p50_ms': round(p50, 3),
+            'p95_ms': round(p95, 3),
+            'p99_ms': round(p99, 3),
+            'por_segundo': round(len(filas) / segundos, 2),
+            'consultas_media': round(statistics.mean(consultas), 2),
+            'consultas_max': max(consultas),
+        }
+    return endpoints
+
+
+def regresiones(actual, base, umbral, tolerancia_ms):
+    """Endpoints cuyo p95 empeoró más de ``umbral`` y de ``tolerancia_ms`` respecto de ``base``."""
+    for endpoint, medicion in actual['endpoints'].items():
+        anterior = base['endpoints'].get(endpoint)
+        if anterior is None:
+            continue
+        antes, ahora = anterior['p95_ms'], medicion['p95_ms']
+        if ahora > antes * (1 + umbral) and ahora - antes > tolerancia_ms:
+            yield endpoint, antes, ahora
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--archivo', default='bd_insecta.sql')
+    parser.add_argument('--veces', type=int, default=10)
+    parser.add_argument('--clientes', type=int, default=8)
+    parser.add_argument('--rondas', type=int, default=5)
+    parser.add_argument('--salida', help="archivo JSON donde guardar los resultados")
+    parser.add_argument('--comparar', help="JSON de una ejecución anterior para detectar regresiones")
+    parser.add_argument('--umbral', type=float, default=0.2)
+    parser.add_argument('--tolerancia-ms', type=float, default=2.0)
+    args = parser.parse_args()
+
+    entorno.configurar()
+    from django.contrib.auth.models import User
+    from django.core.management import call_command
+    from django.test import override_settings
+
+    with tempfile.TemporaryDirectory() as directorio, entorno.base_de_datos_temporal(compartida=True) as connection:
+        if connection.vendor == 'sqlite':
+            # Los clientes escriben a la vez: cada transacción toma el bloqueo de
+            # escritura al empezar, en lugar de fallar al pasar de lectura a escritura
+            connection.settings_dict['OPTIONS']['transaction_mode'] = 'IMMEDIATE'
+        ruta = os.path.join(directorio, 'volcado.sql')
+        filas = volcado_sintetico(args.archivo, ruta, args.veces, 500)
+        call_command('importar_volcado', ruta, progreso=0, stdout=io.StringIO())
+        User.objects.create_superuser(USUARIO, password=CLAVE)
+        print(f"{filas} filas sembradas ({connection.vendor}); {args.clientes} clientes x {args.rondas} rondas")
+
+        # La misma caché en archivos que en producción, pero en un directorio propio
+        cache = {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': os.path.join(directorio, 'cache')}
+        with override_settings(CACHES={'default': cache}):
+            inicio = time.perf_counter()
+            with ThreadPoolExecutor(args.clientes) as ejecutor:
+                clientes = [Cliente(numero) for numero in range(args.clientes)]
+                mediciones = [m for parte in ejecutor.map(lambda c: c.recorrer(args.rondas), clientes) for m in parte]
+            segundos = time.perf_counter() - inicio
+
+    resultado = {
+        'configuracion': {
+            'motor': connection.vendor, 'filas': filas, 'clientes': args.clientes, 'rondas': args.rondas,
+            'python': sys.version.split()[0], 'nucleos': os.cpu_count(),
+        },
+        'total': {'peticiones': len(mediciones), 'segundos': round(segundos, 3), 'por_segundo': round(len(mediciones) / segundos, 2)},
+        'endpoints': resumir(mediciones, segundos),
+    }
+
+    print(f"{'endpoint':<40} {'n':>5} {'err':>4} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>7} {'consultas':>9}")
+    for endpoint, m in resultado['endpoints'].items():
+        print(f"{endpoint:<40} {m['peticiones']:>5} {m['errores']:>4} {m['p50_ms']:>8.1f} {m['p95_ms']:>8.1f} "
+              f"{m['p99_ms']:>8.1f} {m['por_segundo']:>7.1f} {m['consultas_media']:>9.1f}")
+    total = resultado['total']
+    print(f"Total: {total['peticiones']} peticiones en {total['segundos']:.1f} s ({total['por_segundo']:.1f} por segundo)")
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as archivo:
+            json.dump(resultado, archivo, ensure_ascii=False, indent=2)
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as archivo:
+            base = json.load(archivo)
+        peores = list(regresiones(resultado, base, args.umbral, args.tolerancia_ms))
+        for endpoint, antes, ahora in peores:
+            print(f"REGRESIÓN {endpoint}: p95 {antes:.1f} ms -> {ahora:.1f} ms")
+        if peores:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
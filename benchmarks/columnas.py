@@ -0,0 +1,98 @@
+"""
+Memoria y tiempo para leer las filas de una lista: instancias completas del
+modelo (``Temperatura.objects.all()``, como antes) contra las filas de
+``listas.TEMPERATURA`` (solo las columnas que se muestran y el comienzo de las
+observaciones, ver ``insect_app/listas.py``).
+
+    python -m benchmarks.columnas --filas 10000 --observaciones 2000 --con-observaciones 0.3
+
+Siembra ``--filas`` lecturas de Temperatura; una fracción
+``--con-observaciones`` de ellas tiene un texto de ``--observaciones``
+caracteres (notas de laboratorio pegadas en el campo). Informa, por cada
+forma de leer, la mediana del tiempo y el pico de memoria de Python
+(``tracemalloc``) al cargar todas las filas en una lista, y lo mismo
+por cada 10 000 filas.
+"""
+import argparse
+import datetime
+import random
+import tracemalloc
+from decimal import Decimal
+
+from . import entorno
+
+LOTE = 5000
+
+
+def sembrar(filas, largo, fraccion):
+    from insect_app.models import Temperatura
+
+    inicio = datetime.datetime(2020, 1, 1, 7, 30)
+    aleatorio = random.Random(1928)
+    for desde in range(0, filas, LOTE):
+        lote = []
+        for i in range(desde, min(desde + LOTE, filas)):
+            momento = inicio + datetime.timedelta(minutes=20 * i)
+            obs = ''
+            if aleatorio.random() < fraccion:
+                obs = ''.join(aleatorio.choices('abcdefghijklmnopqrstuvwxyz ', k=largo))
+            lote.append(Temperatura(
+                temperatura=Decimal(aleatorio.randint(220, 300)) / 10,
+                max_temperatura=Decimal(aleatorio.randint(280, 320)) / 10,
+                min_temperatura=Decimal(aleatorio.randint(200, 240)) / 10,
+                hora=momento.time(),
+                area_de_trabajo=('Área Fase Inmadura', 'Área Fase Adulta')[i % 2],
+                obs=obs,
+                fecha_creacion=momento,
+            ))
+        Temperatura.objects.bulk_create(lote)
+
+
+def pico_de_memoria(funcion):
+    """Bytes de memoria de Python que llega a ocupar ``funcion()`` (con su resultado)."""
+    tracemalloc.start()
+    try:
+        resultado = funcion()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del resultado
+    return pico
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--filas', type=int, default=10_000)
+    parser.add_argument('--observaciones', type=int, default=2000, help="caracteres de cada observación")
+    parser.add_argument('--con-observaciones', type=float, default=0.3, help="fracción de filas con observaciones")
+    parser.add_argument('--repeticiones', type=int, default=10)
+    args = parser.parse_args()
+
+    entorno.configurar()
+    from insect_app import listas
+    from insect_app.datatables import ORDEN_POR_DEFECTO
+    from insect_app.models import Temperatura
+
+    with entorno.base_de_datos_temporal() as connection:
+        sembrar(args.filas, args.observaciones, args.con_observaciones)
+        formas = {
+            'instancias': lambda: list(Temperatura.objects.order_by(*ORDEN_POR_DEFECTO)),
+            'filas': lambda: list(listas.TEMPERATURA.queryset().order_by(*ORDEN_POR_DEFECTO)),
+        }
+        print(f"{args.filas} lecturas ({connection.vendor}), {args.con_observaciones:.0%} con "
+              f"{args.observaciones} caracteres de observaciones")
+        print(f"{'lectura':<11} {'ms':>9} {'MiB':>8} {'ms/10k':>9} {'MiB/10k':>8}")
+        resultados = {}
+        for nombre, funcion in formas.items():
+            funcion()  # calentamiento
+            ms = entorno.medir(funcion, args.repeticiones)
+            mib = pico_de_memoria(funcion) / 2**20
+            resultados[nombre] = ms, mib
+            por_10k = 10_000 / args.filas
+            print(f"{nombre:<11} {ms:>9.1f} {mib:>8.2f} {ms * por_10k:>9.1f} {mib * por_10k:>8.2f}")
+        (ms_antes, mib_antes), (ms_ahora, mib_ahora) = resultados['instancias'], resultados['filas']
+        print(f"filas: {ms_antes / ms_ahora:.2f}x más rápido, {mib_antes / mib_ahora:.2f}x menos memoria")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Preparación común de los benchmarks.
+"""
+import contextlib
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+import django
+
+
+def configurar():
+    """Inicializa Django con la configuración del proyecto."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'insectario_project.settings')
+    django.setup()
+
+
+@contextlib.contextmanager
+def base_de_datos_temporal(conservar=False, compartida=False):
+    """
+    Crea la base de datos de pruebas (``test_<NAME>`` en MariaDB, o SQLite en
+    memoria) con todas las migraciones aplicadas, igual que ``manage.py test``,
+    y la destruye al salir. Con ``conservar=True`` se reutiliza entre ejecuciones.
+    Con ``compartida=True`` SQLite usa un archivo temporal en lugar de la memoria,
+    para que otros procesos puedan abrir la misma base de datos.
+    """
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    nombre_original = connection.settings_dict['NAME']
+    directorio = None
+    if compartida and connection.vendor == 'sqlite' and not connection.settings_dict['TEST'].get('NAME'):
+        directorio = tempfile.mkdtemp(prefix='benchmarks-')
+        connection.settings_dict['TEST']['NAME'] = os.path.join(directorio, 'db.sqlite3')
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=conservar)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(nombre_original, verbosity=0, keepdb=conservar)
+        teardown_test_environment()
+        if directorio:
+            del connection.settings_dict['TEST']['NAME']
+            shutil.rmtree(directorio, ignore_errors=True)
+
+
+def medir(funcion, repeticiones=20):
+    """Ejecuta ``funcion`` varias veces y devuelve la mediana en milisegundos."""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tiempos)
@@ -0,0 +1,111 @@
+"""
+Escalado de ``manage.py importar_volcado --workers N`` con el número de procesos.
+
+    python -m benchmarks.importacion --archivo bd_insecta.sql --veces 100
+
+Genera un volcado sintético con las filas de ``--archivo`` repetidas ``--veces``
+veces (con ids nuevos y las fechas corridas para que cada copia caiga en días
+distintos, en sentencias de ``--filas-por-insert`` filas, como las escribe
+phpMyAdmin) e importa ese volcado en una base de datos de pruebas nueva
+con 1, 2, 4, ... procesos, hasta ``--max-workers`` (por defecto, los núcleos de
+la máquina). Cada importación empieza con la base de datos vacía.
+
+Con SQLite los procesos comparten un único bloqueo de escritura, así que solo se
+reparte la lectura y la conversión; el escalado que importa es el de MariaDB.
+"""
+import argparse
+import datetime
+import io
+import os
+import re
+import tempfile
+import time
+
+from . import entorno
+
+_ESCAPES = str.maketrans({'\\': '\\\\', "'": "\\'", '\n': '\\n', '\r': '\\r', '\0': '\\0'})
+_FECHA = re.compile(r'\d{4}-\d{2}-\d{2}')
+
+
+def literal(valor):
+    if valor is None:
+        return 'NULL'
+    if isinstance(valor, str):
+        return "'" + valor.translate(_ESCAPES) + "'"
+    return str(valor)
+
+
+def correr_fechas(valor, dias):
+    if isinstance(valor, str) and _FECHA.match(valor):
+        fecha = datetime.date.fromisoformat(valor[:10]) + datetime.timedelta(days=dias)
+        return fecha.isoformat() + valor[10:]
+    return valor
+
+
+def volcado_sintetico(origen, destino, veces, filas_por_insert):
+    """Escribe en ``destino`` las filas de ``origen`` repetidas ``veces`` veces; devuelve cuántas filas escribió."""
+    from insect_app.importacion import TABLAS
+    from insect_app.volcado import filas
+
+    por_tabla = {}
+    with open(origen, encoding='utf-8') as archivo:
+        for tabla, valores in filas(archivo, tablas=TABLAS):
+            por_tabla.setdefault(tabla, []).append(valores)
+
+    escritas = 0
+    with open(destino, 'w', encoding='utf-8') as salida:
+        for tabla, originales in por_tabla.items():
+            ultimo_id = max(valores[0] for valores in originales)
+            lineas = []
+            for vez in range(veces):
+                for valores in originales:
+                    fila = (valores[0] + vez * ultimo_id,) + tuple(correr_fechas(v, vez * 1000) for v in valores[1:])
+                    lineas.append('(' + ', '.join(map(literal, fila)) + ')')
+                    if len(lineas) == filas_por_insert:
+                        salida.write(f"INSERT INTO `{tabla}` VALUES\n" + ',\n'.join(lineas) + ';\n\n')
+                        escritas += len(lineas)
+                        lineas = []
+            if lineas:
+                salida.write(f"INSERT INTO `{tabla}` VALUES\n" + ',\n'.join(lineas) + ';\n\n')
+                escritas += len(lineas)
+    return escritas
+
+
+def importar(ruta, trabajadores):
+    """Importa ``ruta`` en una base de datos de pruebas nueva; devuelve los segundos y el motor."""
+    from django.core.management import call_command
+
+    with entorno.base_de_datos_temporal(compartida=True) as connection:
+        inicio = time.perf_counter()
+        call_command('importar_volcado', ruta, workers=trabajadores, progreso=0, stdout=io.StringIO())
+        return time.perf_counter() - inicio, connection.vendor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--archivo', default='bd_insecta.sql')
+    parser.add_argument('--veces', type=int, default=100)
+    parser.add_argument('--filas-por-insert', type=int, default=500)
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+    entorno.configurar()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, 'volcado.sql')
+        filas = volcado_sintetico(args.archivo, ruta, args.veces, args.filas_por_insert)
+        megas = os.path.getsize(ruta) / 1e6
+        print(f"Volcado sintético: {filas} filas, {megas:.1f} MB ({os.cpu_count()} núcleos disponibles)")
+
+        trabajadores = [1]
+        while trabajadores[-1] * 2 <= max(args.max_workers, 1):
+            trabajadores.append(trabajadores[-1] * 2)
+        print(f"{'workers':>8} {'s':>8} {'filas/s':>10} {'aceleración':>12}")
+        base = None
+        for n in trabajadores:
+            segundos, motor = importar(ruta, n)
+            base = base or segundos
+            print(f"{n:>8} {segundos:>8.1f} {filas / segundos:>10,.0f} {base / segundos:>11.2f}x  ({motor})")
+
+
+if __name__ == '__main__':
+    main()
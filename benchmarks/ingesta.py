@@ -0,0 +1,99 @@
+"""
+Mide cuántas lecturas por segundo acepta el endpoint de ingesta masiva.
+
+    python -m benchmarks.ingesta --lecturas 50000 --lote 10000
+
+Envía lotes JSON y CSV de lecturas de Temperatura con el cliente de pruebas de
+Django (sin red) y reporta lecturas por segundo, incluyendo el parseo, la
+validación, el bulk_create y la actualización de los resúmenes. Cada petición
+paga además una verificación de contraseña (HTTP Basic), que se informa aparte.
+"""
+import argparse
+import base64
+import csv
+import datetime
+import io
+import json
+import random
+import time
+
+from . import entorno
+
+USUARIO = 'registrador'
+CLAVE = 'clave-de-prueba-1928'
+
+
+def lecturas(cantidad, semilla=1928):
+    aleatorio = random.Random(semilla)
+    inicio = datetime.datetime(2024, 1, 1, 0, 0)
+    areas = ['Área Fase Inmadura', 'Área Fase Adulta']
+    for i in range(cantidad):
+        momento = inicio + datetime.timedelta(minutes=i)
+        yield {
+            'temperatura': f'{aleatorio.uniform(22, 30):.1f}',
+            'max_temperatura': f'{aleatorio.uniform(29, 32):.1f}',
+            'min_temperatura': f'{aleatorio.uniform(20, 23):.1f}',
+            'hora': momento.strftime('%H:%M'),
+            'area_de_trabajo': areas[i % 2],
+            'obs': '',
+            'fecha_creacion': momento.strftime('%Y-%m-%d %H:%M:%S'),
+        }
+
+
+def como_csv(filas):
+    salida = io.StringIO()
+    escritor = csv.DictWriter(salida, fieldnames=list(filas[0]))
+    escritor.writeheader()
+    escritor.writerows(filas)
+    return salida.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lecturas', type=int, default=50000)
+    parser.add_argument('--lote', type=int, default=10000)
+    args = parser.parse_args()
+
+    entorno.configurar()
+    from django.conf import settings
+    from django.contrib.auth import authenticate
+    from django.contrib.auth.models import User
+    from django.test import Client
+    from insect_app.models import Temperatura, ResumenDiario, ResumenHorario
+
+    # Los lotes grandes superan el límite por defecto de 2,5 MB del cuerpo
+    settings.DATA_UPLOAD_MAX_MEMORY_SIZE = None
+
+    with entorno.base_de_datos_temporal():
+        User.objects.create_superuser(USUARIO, password=CLAVE)
+        cabecera = 'Basic ' + base64.b64encode(f'{USUARIO}:{CLAVE}'.encode()).decode()
+        cliente = Client(HTTP_AUTHORIZATION=cabecera)
+        ms_clave = entorno.medir(lambda: authenticate(username=USUARIO, password=CLAVE), 3)
+
+        todas = list(lecturas(args.lecturas))
+        for formato in ('json', 'csv'):
+            # Cada formato parte de tablas vacías, también las de resúmenes
+            Temperatura.objects.all().delete()
+            ResumenDiario.objects.all().delete()
+            ResumenHorario.objects.all().delete()
+            inicio = time.perf_counter()
+            for desde in range(0, len(todas), args.lote):
+                lote = todas[desde:desde + args.lote]
+                if formato == 'json':
+                    respuesta = cliente.post('/temperaturas/ingesta/', json.dumps(lote), content_type='application/json')
+                else:
+                    respuesta = cliente.post('/temperaturas/ingesta/', como_csv(lote), content_type='text/csv')
+                assert respuesta.status_code == 201, respuesta.content[:500]
+            segundos = time.perf_counter() - inicio
+            peticiones = -(-len(todas) // args.lote)
+            sin_clave = segundos - peticiones * ms_clave / 1000
+            print(
+                f"{formato.upper():>4}: {len(todas)} lecturas en {segundos:.2f} s "
+                f"-> {len(todas) / segundos:,.0f} lecturas/s "
+                f"({len(todas) / sin_clave:,.0f} lecturas/s sin la verificación de contraseña)"
+            )
+        print(f"Verificación de contraseña por petición: {ms_clave:.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Tiempo de las páginas de lista sin caché y servidas desde la caché.
+
+    python -m benchmarks.listas --filas 10000
+
+Siembra ``--filas`` lecturas de Temperatura y mide ``temperatura_list`` (la
+vista, sin el middleware de sesión y autenticación) cuando la página no está en
+la caché (versión renovada antes de cada petición) y cuando sí lo está, con los
+backends en memoria y en archivos. También cuenta las consultas de una
+petición servida desde la caché (deberían ser cero).
+"""
+import argparse
+import tempfile
+
+from . import entorno
+from .paginacion import sembrar
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--filas', type=int, default=10000)
+    parser.add_argument('--repeticiones', type=int, default=200)
+    args = parser.parse_args()
+
+    entorno.configurar()
+    from asgiref.sync import async_to_sync
+    from django.contrib.auth.models import User
+    from django.db import connection
+    from django.test import RequestFactory, override_settings
+    from django.test.utils import CaptureQueriesContext
+
+    from insect_app import cache_listas, views
+    from insect_app.models import Temperatura
+
+    directorio = tempfile.TemporaryDirectory()
+    backends = {
+        'memoria': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+        'archivos': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': directorio.name},
+    }
+    with directorio, entorno.base_de_datos_temporal():
+        sembrar(args.filas)
+        request = RequestFactory().get('/temperaturas/')
+        request.user = User.objects.create_user('benchmark')
+
+        async def auser():
+            return request.user
+        request.auser = auser
+        # La vista es asíncrona (ver insect_app/asincronas.py)
+        temperatura_list = async_to_sync(views.temperatura_list)
+
+        print(f"temperatura_list con {args.filas} lecturas (mediana de {args.repeticiones} peticiones)")
+        print(f"{'caché':>10} {'sin caché ms':>13} {'desde caché ms':>15} {'consultas':>10}")
+        for nombre, backend in backends.items():
+            with override_settings(CACHES={'default': backend}):
+                def sin_cache():
+                    cache_listas._nueva_version(Temperatura)
+                    temperatura_list(request)
+
+                ms_sin_cache = entorno.medir(sin_cache, args.repeticiones)
+                temperatura_list(request)
+                ms_cache = entorno.medir(lambda: temperatura_list(request), args.repeticiones)
+                with CaptureQueriesContext(connection) as consultas:
+                    temperatura_list(request)
+            print(f"{nombre:>10} {ms_sin_cache:>13.2f} {ms_cache:>15.3f} {len(consultas):>10}")
+
+
+if __name__ == '__main__':
+    main()
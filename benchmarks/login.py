@@ -0,0 +1,101 @@
+"""
+Inicios de sesión por segundo de un worker, antes y después de verificar la
+contraseña una sola vez.
+
+    python -m benchmarks.login --logins 20 --iteraciones 1000000 600000 260000
+
+Cada inicio de sesión es un POST al formulario de ``login_view`` con todo el
+middleware (``django.test.Client``, un solo hilo, como un worker síncrono).
+"antes" es la vista anterior, que después de validar el formulario
+(``AuthenticationForm.clean()`` ya llama a ``authenticate``) volvía a llamar
+a ``authenticate``: dos hashes PBKDF2 por inicio de sesión. "ahora" es
+``login_view``, que usa ``form.get_user()``. Se repite para cada valor de
+``--iteraciones`` (``CLAVES_ITERACIONES``, ver ``insect_app/claves.py``).
+"""
+import argparse
+import sys
+import time
+import types
+
+from . import entorno
+
+USUARIO = 'benchmark'
+CLAVE = 'clave-de-prueba-1928'
+
+
+def login_anterior(request):
+    """``login_view`` antes del cambio (dos llamadas a ``authenticate``)."""
+    from django.contrib.auth import authenticate, login
+    from django.shortcuts import redirect, render
+
+    from insect_app.forms import CustomAuthenticationForm
+
+    if request.method == 'POST':
+        form = CustomAuthenticationForm(request, data=request.POST)
+        if form.is_valid():
+            username = form.cleaned_data.get('username')
+            password = form.cleaned_data.get('password')
+            user = authenticate(username=username, password=password)
+            if user is not None:
+                login(request, user)
+                return redirect('temperatura_list')
+            else:
+                form.add_error(None, "Nombre de usuario o contraseña incorrectos.")
+    else:
+        form = CustomAuthenticationForm()
+    return render(request, 'login.html', {'form': form, 'titulo': 'Iniciar Sesión'})
+
+
+def urlpatterns_con_login_anterior():
+    """Las URL del proyecto con ``/login-anterior/`` apuntando a ``login_anterior``."""
+    from django.urls import path
+
+    from insectario_project.urls import urlpatterns
+
+    return [path('login-anterior/', login_anterior), *urlpatterns]
+
+
+def logins_por_segundo(url, cantidad):
+    from django.test import Client
+
+    cliente = Client()
+    inicio = time.perf_counter()
+    for _ in range(cantidad):
+        response = cliente.post(url, {'username': USUARIO, 'password': CLAVE})
+        assert response.status_code == 302, response.status_code
+        cliente.cookies.clear()
+    return cantidad / (time.perf_counter() - inicio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--logins', type=int, default=20)
+    parser.add_argument('--iteraciones', type=int, nargs='+', default=[1_000_000, 600_000, 260_000])
+    args = parser.parse_args()
+
+    entorno.configurar()
+    from django.contrib.auth.models import User
+    from django.test import override_settings
+
+    # Módulo de URL con la vista anterior, para medirla con el mismo middleware
+    urls = types.ModuleType('benchmarks_login_urls')
+    urls.urlpatterns = urlpatterns_con_login_anterior()
+    sys.modules[urls.__name__] = urls
+
+    with entorno.base_de_datos_temporal(), override_settings(ROOT_URLCONF=urls.__name__):
+        usuario = User.objects.create_user(USUARIO, password=CLAVE)
+        print(f"{args.logins} inicios de sesión por medición")
+        print(f"{'iteraciones':>12} {'antes /s':>9} {'ahora /s':>9} {'mejora':>7}")
+        for iteraciones in args.iteraciones:
+            with override_settings(CLAVES_ITERACIONES=iteraciones):
+                # La contraseña guardada con estas iteraciones (si no, se recalcularía al entrar)
+                usuario.set_password(CLAVE)
+                usuario.save()
+                logins_por_segundo('/', 1)
+                antes = logins_por_segundo('/login-anterior/', args.logins)
+                ahora = logins_por_segundo('/', args.logins)
+            print(f"{iteraciones:>12,} {antes:>9.2f} {ahora:>9.2f} {ahora / antes:>6.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Compara el costo de pedir la página N con OFFSET y con paginación por clave.
+
+    python -m benchmarks.paginacion --filas 1000000 --tamano 25
+
+Con OFFSET el tiempo crece con el número de página, porque la base de datos
+tiene que recorrer y descartar todas las filas anteriores. Con el cursor sobre
+``(fecha_creacion, id)`` la página N cuesta lo mismo que la página 1.
+"""
+import argparse
+import datetime
+import random
+from decimal import Decimal
+
+from . import entorno
+
+LOTE = 10000
+
+
+def sembrar(filas):
+    """Inserta ``filas`` lecturas de Temperatura sintéticas, una cada 20 minutos."""
+    from insect_app.models import Temperatura
+
+    inicio = datetime.datetime(2015, 1, 1, 7, 30)
+    areas = ['Área Fase Inmadura', 'Área Fase Adulta']
+    aleatorio = random.Random(1928)
+    for desde in range(0, filas, LOTE):
+        lote = []
+        for i in range(desde, min(desde + LOTE, filas)):
+            momento = inicio + datetime.timedelta(minutes=20 * i)
+            lote.append(Temperatura(
+                temperatura=Decimal(aleatorio.randint(220, 300)) / 10,
+                max_temperatura=Decimal(aleatorio.randint(280, 320)) / 10,
+                min_temperatura=Decimal(aleatorio.randint(200, 240)) / 10,
+                hora=momento.time(),
+                area_de_trabajo=areas[i % 2],
+                fecha_creacion=momento,
+            ))
+        Temperatura.objects.bulk_create(lote)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--filas', type=int, default=1_000_000)
+    parser.add_argument('--tamano', type=int, default=25)
+    parser.add_argument('--repeticiones', type=int, default=20)
+    args = parser.parse_args()
+
+    entorno.configurar()
+    from insect_app.datatables import ORDEN_POR_DEFECTO
+    from insect_app.models import Temperatura
+    from insect_app.paginacion import codificar_cursor
+
+    with entorno.base_de_datos_temporal():
+        print(f"Sembrando {args.filas} lecturas de Temperatura...")
+        sembrar(args.filas)
+
+        queryset = Temperatura.objects.all()
+        ultima = (args.filas - 1) // args.tamano
+        paginas = sorted({0, 1, 10, 100, 1000, ultima // 2, ultima} & set(range(ultima + 1)))
+
+        print(f"{'página':>10} {'offset (ms)':>12} {'cursor (ms)':>12}")
+        for numero in paginas:
+            desde = numero * args.tamano
+            ms_offset = entorno.medir(
+                lambda: list(queryset.order_by(*ORDEN_POR_DEFECTO)[desde:desde + args.tamano]),
+                args.repeticiones,
+            )
+            if numero == 0:
+                cursor = None
+            else:
+                # El cursor lo daría la página anterior; aquí se obtiene fuera de la medición
+                cursor = codificar_cursor(queryset.order_by(*ORDEN_POR_DEFECTO)[desde - 1])
+            ms_cursor = entorno.medir(
+                lambda: queryset.pagina(cursor, tamano=args.tamano).objetos,
+                args.repeticiones,
+            )
+            print(f"{numero + 1:>10} {ms_offset:>12.2f} {ms_cursor:>12.2f}")
+
+
+if __name__ == '__main__':
+    main()
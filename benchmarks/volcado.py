@@ -0,0 +1,111 @@
+"""
+Compara el tokenizador de ``insect_app.volcado`` con el análisis por
+expresiones regulares que usaba ``insert_data.py``.
+
+    python -m benchmarks.volcado --archivo bd_insecta.sql
+
+Mide el tiempo de extraer las filas de las cinco tablas que se importan, con el
+volcado ya en memoria (no se mide la lectura del disco), y el de extraerlas y
+pasarlas por las conversiones de ``insect_app.importacion`` (el método anterior
+entrega texto y deja los ``Decimal``/``int`` a la conversión; el tokenizador ya
+entrega valores tipados). Después repite la medición con filas sintéticas cuya
+observación tiene cada vez más texto con comas: el método anterior vuelve a
+recorrer el resto de la fila por cada coma (costo cuadrático por fila), el
+tokenizador la recorre una sola vez.
+"""
+import argparse
+import io
+import re
+
+from . import entorno
+
+TABLAS = (
+    'environmental_temperatures', 'humidities', 'lives',
+    'pupa_mortality_in_breeders', 'tray_water_temperatures',
+)
+
+
+# --- Método anterior (copiado de insert_data.py antes del tokenizador) ---
+
+def parse_sql_values(values_str):
+    values = []
+    parts = re.split(r",(?=(?:[^']*'[^']*')*[^']*$)", values_str)
+    for part in parts:
+        cleaned_part = part.strip()
+        if cleaned_part.upper() == 'NULL':
+            values.append(None)
+        elif cleaned_part.startswith("'") and cleaned_part.endswith("'"):
+            values.append(cleaned_part[1:-1].strip())
+        else:
+            values.append(cleaned_part)
+    return values
+
+def filas_con_regex(sql_content):
+    filas = []
+    for tabla in TABLAS:
+        patron = re.compile(rf"INSERT INTO `{tabla}` \([^)]+\) VALUES\s*((?:\([^)]+\)(?:,\s*)?)+);")
+        for values_block_str in patron.findall(sql_content):
+            for values_str in re.findall(r"\(([^)]+)\)", values_block_str):
+                filas.append((tabla, parse_sql_values(values_str)))
+    return filas
+
+
+def filas_con_tokenizador(sql_content):
+    from insect_app import volcado
+
+    return list(volcado.filas(io.StringIO(sql_content), tablas=TABLAS))
+
+
+def convertir(filas):
+    from insect_app.importacion import TABLAS as CONVERSIONES
+
+    return [CONVERSIONES[tabla][1](valores) for tabla, valores in filas]
+
+
+def volcado_sintetico(filas, largo_obs):
+    """Un INSERT de ``filas`` temperaturas cuya observación tiene ``largo_obs`` caracteres."""
+    obs = ('lectura, revisada, ' * (largo_obs // 19 + 1))[:largo_obs]
+    lineas = [
+        "INSERT INTO `environmental_temperatures` (`id`, `temperature`, `max_temperature`, "
+        "`min_temperature`, `hour`, `work_area`, `observations`, `user_id`, `created_at`, `updated_at`) VALUES"
+    ]
+    for i in range(1, filas + 1):
+        fin = ';' if i == filas else ','
+        lineas.append(
+            f"({i}, 28.50, 29.40, 24.70, '7:30 am', 'Area Fase Adulta', '{obs}', 8, "
+            f"'2023-01-05 18:54:36', '2023-01-05 18:54:36'){fin}"
+        )
+    return '\n'.join(lineas) + '\n'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--archivo', default='bd_insecta.sql')
+    parser.add_argument('--repeticiones', type=int, default=10)
+    args = parser.parse_args()
+    entorno.configurar()
+
+    with open(args.archivo, encoding='utf-8') as archivo:
+        contenido = archivo.read()
+
+    anterior = filas_con_regex(contenido)
+    nuevo = filas_con_tokenizador(contenido)
+    print(f"{args.archivo}: {len(anterior)} filas con regex, {len(nuevo)} con el tokenizador")
+    ms_regex = entorno.medir(lambda: filas_con_regex(contenido), args.repeticiones)
+    ms_tokens = entorno.medir(lambda: filas_con_tokenizador(contenido), args.repeticiones)
+    print(f"  extraer filas             regex: {ms_regex:7.1f} ms   tokenizador: {ms_tokens:7.1f} ms")
+    ms_regex = entorno.medir(lambda: convertir(filas_con_regex(contenido)), args.repeticiones)
+    ms_tokens = entorno.medir(lambda: convertir(filas_con_tokenizador(contenido)), args.repeticiones)
+    print(f"  extraer y convertir       regex: {ms_regex:7.1f} ms   tokenizador: {ms_tokens:7.1f} ms")
+
+    print("\n1000 filas sintéticas, según el largo de la observación:")
+    print(f"{'obs':>6} {'regex ms':>10} {'tokenizador ms':>15}")
+    for largo in (0, 100, 400, 1600):
+        sintetico = volcado_sintetico(1000, largo)
+        ms_regex = entorno.medir(lambda: filas_con_regex(sintetico), 3)
+        ms_tokens = entorno.medir(lambda: filas_con_tokenizador(sintetico), 3)
+        print(f"{largo:>6} {ms_regex:>10.1f} {ms_tokens:>15.1f}")
+
+
+if __name__ == '__main__':
+    main()
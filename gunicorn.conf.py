@@ -0,0 +1,30 @@
+"""
+Configuración de gunicorn (se lee automáticamente desde el directorio de trabajo).
+
+Las métricas de /metrics se suman entre los procesos a través de los archivos de
+PROMETHEUS_MULTIPROC_DIR (ver insect_app/metricas.py): el directorio se vacía al
+arrancar, para no sumar los valores de una ejecución anterior, y se descartan
+los valores de proceso (gauges) de cada worker que termina.
+
+La variable se define aquí y no en el Dockerfile: solo los procesos de gunicorn
+escriben métricas en archivos. Los comandos de manage.py (collectstatic,
+enviar_alertas) usan el registro de su proceso y no dependen de que exista el
+directorio.
+"""
+import os
+import shutil
+
+# Antes de importar prometheus_client, que al importarse decide si usa los archivos
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/metricas')
+
+from prometheus_client import multiprocess  # noqa: E402
+
+
+def on_starting(server):
+    directorio = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(directorio, ignore_errors=True)
+    os.makedirs(directorio, exist_ok=True)
+
+
+def child_exit(server, worker):
+    multiprocess.mark_process_dead(worker.pid)
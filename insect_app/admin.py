@@ -1,3 +1,31 @@
 from django.contrib import admin
 
+from .models import ReglaAlerta, Alerta
+
 # Register your models here.
+
+
+@admin.register(ReglaAlerta)
+class ReglaAlertaAdmin(admin.ModelAdmin):
+    """Reglas de las alertas por umbrales (ver alertas.py)."""
+    list_display = ('variable', 'area_de_trabajo', 'especie', 'cepa', 'franja', 'minimo', 'maximo', 'activa')
+    list_filter = ('variable', 'activa')
+
+
+@admin.register(Alerta)
+class AlertaAdmin(admin.ModelAdmin):
+    """Alertas registradas; solo lectura."""
+    list_display = ('fecha', 'regla', 'registro', 'franja', 'valor', 'limite', 'entregada')
+    list_select_related = ('regla', 'salida')
+    date_hierarchy = 'fecha'
+
+    @admin.display(description="Entregada")
+    def entregada(self, alerta):
+        salida = getattr(alerta, 'salida', None)
+        return salida and salida.entregada
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
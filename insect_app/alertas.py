@@ -0,0 +1,187 @@
+"""
+Alertas por umbrales, evaluadas al guardar cada lectura.
+
+Las reglas (``ReglaAlerta``) fijan un mínimo y/o un máximo para la temperatura
+o la humedad de un área de trabajo, o para la temperatura del agua de una
+especie, cepa y franja horaria; un campo vacío abarca todas. Cada proceso
+guarda en memoria las reglas activas, indexadas por variable y alcance, durante
+``ALERTAS_REGLAS_SEGUNDOS``: revisar una lectura es buscar en un diccionario
+las pocas claves que le corresponden (dos en Temperatura y Humedad, ocho por
+franja en el agua) y comparar, sin consultar la base de datos ni leer lecturas
+anteriores. Las reglas se descartan de este proceso al guardar o eliminar una
+(señales, ver ``signals.py``); los demás workers las vuelven a leer al vencer.
+
+Solo cuando una lectura queda fuera de rango se escribe: una ``Alerta`` (una
+por regla, registro y franja; al editar una lectura que ya tenía su alerta no
+se repite) y su fila en ``SalidaAlerta``, en la misma transacción que la
+lectura. ``python manage.py enviar_alertas`` entrega después las pendientes
+por correo (``entregar``), fuera del camino de escritura.
+
+Las señales cubren los formularios y el admin; la ingesta de los registradores
+(``bulk_create``) llama a ``revisar_lote``. Las cargas del volcado y los datos
+sintéticos no se revisan.
+"""
+import threading
+import time
+from collections import defaultdict, namedtuple
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Temperatura, Humedad, RegistroTemperaturaAgua, ReglaAlerta, Alerta, SalidaAlerta
+
+# Umbral de una regla en memoria
+Umbral = namedtuple('Umbral', 'regla minimo maximo')
+
+# Después de tantos intentos fallidos una alerta deja de enviarse (queda con su error en SalidaAlerta)
+MAXIMO_INTENTOS = 10
+
+
+class Fuente:
+    """
+    Cómo se revisa un modelo: su ``variable`` en las reglas, sus ``lecturas``
+    como ``(franja, campo)`` y los campos que forman el alcance.
+    """
+
+    def __init__(self, variable, lecturas, alcance):
+        self.variable = variable
+        self.lecturas = lecturas
+        self.alcance = alcance
+
+    def claves(self, obj, franja):
+        """Las claves del índice de reglas que aplican a ``obj`` en ``franja``: la exacta y las de campos vacíos."""
+        if self.alcance == 'area':
+            return [(self.variable, area, '', '', '') for area in (obj.area_de_trabajo, '')]
+        return [
+            (self.variable, '', especie, cepa, f)
+            for especie in (obj.especie, '') for cepa in (obj.cepa, '') for f in (franja, '')
+        ]
+
+
+FUENTES = {
+    Temperatura: Fuente('temperatura', [('', 'temperatura')], 'area'),
+    Humedad: Fuente('humedad', [('', 'humedad')], 'area'),
+    RegistroTemperaturaAgua: Fuente('temperatura_agua', [
+        ('730am', 'temp_730am'), ('1200md', 'temp_1200md'), ('1500pm', 'temp_1500pm'),
+    ], 'especie'),
+}
+
+
+# --- Reglas en memoria ---
+
+_reglas = None
+_candado = threading.Lock()
+
+
+def _duracion():
+    return getattr(settings, 'ALERTAS_REGLAS_SEGUNDOS', 30)
+
+def _indice():
+    indice = defaultdict(list)
+    for regla in ReglaAlerta.objects.filter(activa=True):
+        clave = (regla.variable, regla.area_de_trabajo, regla.especie, regla.cepa, regla.franja)
+        indice[clave].append(Umbral(regla.pk, regla.minimo, regla.maximo))
+    return dict(indice)
+
+def reglas():
+    """Las reglas activas por clave ``(variable, área, especie, cepa, franja)``, de la memoria del proceso."""
+    global _reglas
+    guardadas = _reglas
+    if guardadas is None or guardadas[0] < time.monotonic():
+        with _candado:
+            guardadas = _reglas
+            if guardadas is None or guardadas[0] < time.monotonic():
+                guardadas = _reglas = (time.monotonic() + _duracion(), _indice())
+    return guardadas[1]
+
+def olvidar_reglas():
+    """Descarta las reglas guardadas en este proceso (se vuelven a leer en la próxima lectura)."""
+    global _reglas
+    _reglas = None
+
+
+# --- Revisión de las lecturas ---
+
+def evaluar(obj):
+    """Las ``Alerta`` (sin guardar) de las reglas que ``obj`` incumple."""
+    fuente = FUENTES[type(obj)]
+    indice = reglas()
+    if not indice:
+        return []
+    alertas = []
+    for franja, campo in fuente.lecturas:
+        valor = getattr(obj, campo)
+        if valor is None:
+            continue
+        for clave in fuente.claves(obj, franja):
+            for umbral in indice.get(clave, ()):
+                if umbral.minimo is not None and valor < umbral.minimo:
+                    limite = umbral.minimo
+                elif umbral.maximo is not None and valor > umbral.maximo:
+                    limite = umbral.maximo
+                else:
+                    continue
+                alertas.append(Alerta(regla_id=umbral.regla, registro=obj.pk, franja=franja, valor=valor, limite=limite))
+    return alertas
+
+def registrar(alertas, nuevas=True):
+    """
+    Guarda las ``alertas`` y su fila en la bandeja de salida. Con ``nuevas=False``
+    (lecturas editadas) omite las que ya existían para la misma regla, registro y franja.
+    """
+    if not alertas:
+        return []
+    with transaction.atomic():
+        if not nuevas:
+            existentes = set(Alerta.objects.filter(
+                registro__in={alerta.registro for alerta in alertas},
+                regla__in={alerta.regla_id for alerta in alertas},
+            ).values_list('regla', 'registro', 'franja'))
+            alertas = [a for a in alertas if (a.regla_id, a.registro, a.franja) not in existentes]
+        alertas = Alerta.objects.bulk_create(alertas)
+        SalidaAlerta.objects.bulk_create([SalidaAlerta(alerta=alerta) for alerta in alertas])
+    return alertas
+
+def revisar(obj, creada=True):
+    """Revisa una lectura recién guardada y registra sus alertas."""
+    return registrar(evaluar(obj), nuevas=creada)
+
+def revisar_lote(objetos):
+    """Como ``revisar`` para lecturas nuevas guardadas con ``bulk_create`` (con pk)."""
+    return registrar([alerta for obj in objetos for alerta in evaluar(obj)])
+
+
+# --- Entrega de la bandeja de salida ---
+
+def pendientes(cantidad):
+    """Las primeras ``cantidad`` filas de la bandeja de salida sin entregar, en orden de llegada."""
+    return list(
+        SalidaAlerta.objects.filter(entregada__isnull=True, intentos__lt=MAXIMO_INTENTOS)
+        .select_related('alerta__regla').order_by('entregada', 'id')[:cantidad]
+    )
+
+def _mensaje(salidas):
+    lineas = [f"{salida.alerta.fecha:%d/%m/%Y %H:%M} {salida.alerta}: {salida.alerta.regla}" for salida in salidas]
+    return f"Alertas del insectario: {len(salidas)} lecturas fuera de rango", '\n'.join(lineas)
+
+def entregar(cantidad=200):
+    """
+    Envía en un correo a ``ALERTAS_DESTINATARIOS`` hasta ``cantidad`` alertas
+    pendientes y las marca como entregadas; si el envío falla, suma un intento y
+    guarda el error. Devuelve ``(entregadas, fallidas)``.
+    """
+    salidas = pendientes(cantidad)
+    if not salidas:
+        return 0, 0
+    asunto, cuerpo = _mensaje(salidas)
+    ids = [salida.pk for salida in salidas]
+    try:
+        send_mail(asunto, cuerpo, None, settings.ALERTAS_DESTINATARIOS)
+    except OSError as e:
+        SalidaAlerta.objects.filter(pk__in=ids).update(intentos=F('intentos') + 1, error=str(e))
+        return 0, len(ids)
+    SalidaAlerta.objects.filter(pk__in=ids).update(entregada=timezone.now(), intentos=F('intentos') + 1, error='')
+    return len(ids), 0
@@ -0,0 +1,294 @@
+"""
+Estadísticas de las series de Temperatura, Humedad y temperatura del agua con NumPy.
+
+``cargar`` lee las lecturas que cumplen los filtros de la URL (los de las
+listas, ver ``filtros.py``) en una sola consulta de ``values_list`` y las
+guarda en arreglos de NumPy (``Serie``): el grupo de cada lectura (el área de
+trabajo, o la especie y la cepa en la temperatura del agua), el instante, el
+valor y el máximo y mínimo registrados. Los valores se piden ya convertidos a
+``double`` y la fecha a texto (``Cast``), y las filas se leen con el cursor,
+sin los conversores de Django: no se construye una instancia del modelo, un
+``Decimal`` ni un ``datetime`` por lectura.
+
+Sobre la serie, todo vectorizado:
+
+* ``Serie.diario()``: cantidad, promedio, mínimo y máximo por grupo y día.
+* ``Serie.movil(dias)``: las mismas estadísticas en una ventana móvil de
+  ``dias`` días sobre el calendario completo.
+* ``Serie.fuera_de_rango()``: por grupo, con qué frecuencia el valor queda por
+  encima del máximo o por debajo del mínimo de su propia fila.
+
+Las estadísticas diarias y móviles de Temperatura y Humedad no necesitan las
+lecturas: ``diario`` y ``movil`` las leen de ``ResumenDiario`` (una fila por
+área y día, ver ``resumenes.py``). Solo la temperatura del agua, que no tiene
+resúmenes, un filtro por ``hora``, que los resúmenes diarios no distinguen, y
+las lecturas fuera de rango, que dependen del máximo y mínimo de cada fila, se
+calculan sobre la serie.
+
+``serie`` guarda la serie cargada en la caché de las listas con la versión del
+modelo (``cache_listas.clave``) y los filtros: se vuelve a leer de la base de
+datos solo después de un cambio en el modelo.
+"""
+import hashlib
+from collections import namedtuple
+from datetime import time
+
+import numpy as np
+from django.db import connections
+from django.db.models import CharField, FloatField
+from django.db.models.functions import Cast
+from numpy.lib.stride_tricks import sliding_window_view
+
+from . import cache_listas, filtros, resumenes
+from .models import ResumenDiario
+
+# Estadísticas por grupo y día (arreglos alineados; ``grupo`` es el índice en ``grupos``)
+Diario = namedtuple('Diario', 'grupos grupo dia cantidad promedio minimo maximo')
+# Ventana móvil: una fila por grupo y una columna por día de ``dias``
+Movil = namedtuple('Movil', 'grupos dias cantidad promedio minimo maximo')
+# Lecturas fuera del máximo y mínimo de su fila, por grupo
+Envolvente = namedtuple('Envolvente', 'grupos evaluadas arriba abajo fraccion')
+
+
+class Fuente:
+    """
+    De dónde sale la serie de un modelo: sus ``filtros`` de la URL, los campos
+    que forman el ``grupo``, el ``campo_fecha`` de la lectura y las ``lecturas``
+    de cada fila como ``(valor, máximo, mínimo, hora)``; ``hora`` es la hora del
+    día de la lectura si ``campo_fecha`` es solo una fecha, o ``None``.
+    ``variable`` es la de sus resúmenes por área y día, si los tiene.
+    """
+
+    def __init__(self, filtros, grupo, lecturas, campo_fecha='fecha_creacion', variable=None):
+        self.filtros = filtros
+        self.modelo = filtros.modelo
+        self.grupo = grupo
+        self.lecturas = lecturas
+        self.campo_fecha = campo_fecha
+        self.variable = variable
+
+    def queryset(self, condicion):
+        """Grupo, fecha (como texto ISO) y los valores como ``double`` de las filas que cumplen ``condicion``, sin ordenar."""
+        # NumPy lee el texto 'AAAA-MM-DD HH:MM:SS' mucho más rápido que un datetime por fila
+        columnas = {'fecha_texto': Cast(self.campo_fecha, CharField())}
+        columnas.update(
+            (f'{campo}_real', Cast(campo, FloatField()))
+            for valor, maximo, minimo, _ in self.lecturas for campo in (valor, maximo, minimo)
+        )
+        # order_by() sin campos: el orden por defecto (Meta.ordering) obligaría a ordenar en la base de datos
+        return self.modelo.objects.filter(condicion).order_by().annotate(**columnas).values_list(
+            *self.grupo, *columnas,
+        )
+
+
+class Serie:
+    """
+    Las lecturas de una ``Fuente`` como arreglos, ordenadas por grupo e
+    instante. ``grupos`` son los nombres de los grupos; ``grupo``, el índice en
+    ``grupos`` de cada lectura. Los máximos y mínimos que faltan son ``nan``.
+    """
+
+    def __init__(self, grupos, grupo, instante, valor, maximo, minimo):
+        self.grupos = grupos
+        self.grupo = grupo
+        self.instante = instante
+        self.valor = valor
+        self.maximo = maximo
+        self.minimo = minimo
+
+    @classmethod
+    def desde_filas(cls, fuente, filas):
+        """La serie de las ``filas`` de ``fuente.queryset()`` (una o varias lecturas por fila)."""
+        ancho = len(fuente.grupo) + 1 + 3 * len(fuente.lecturas)
+        columnas = list(zip(*filas)) if filas else [()] * ancho
+        cantidad_grupo = len(fuente.grupo)
+        etiquetas = columnas[0] if cantidad_grupo == 1 else list(map(' / '.join, zip(*columnas[:cantidad_grupo])))
+        grupos, grupo = np.unique(np.array(etiquetas, dtype=str), return_inverse=True)
+        fecha = np.array(columnas[cantidad_grupo], dtype='datetime64[s]')
+
+        partes = []
+        for indice, (*_, hora) in enumerate(fuente.lecturas):
+            inicio = cantidad_grupo + 1 + 3 * indice
+            valor, maximo, minimo = (np.array(columna, dtype=np.float64) for columna in columnas[inicio:inicio + 3])
+            instante = fecha
+            if hora is not None:
+                instante = fecha + np.timedelta64(hora.hour * 3600 + hora.minute * 60, 's')
+            presentes = ~np.isnan(valor)
+            partes.append([arreglo[presentes] for arreglo in (grupo, instante, valor, maximo, minimo)])
+        grupo, instante, valor, maximo, minimo = (np.concatenate(arreglos) for arreglos in zip(*partes))
+
+        orden = np.lexsort((instante, grupo))
+        return cls(tuple(grupos.tolist()), grupo[orden], instante[orden], valor[orden], maximo[orden], minimo[orden])
+
+    def __len__(self):
+        return len(self.valor)
+
+    def fuera(self):
+        """Qué lecturas quedaron por encima de su máximo o por debajo de su mínimo."""
+        # Las comparaciones con nan (sin máximo o mínimo) son falsas
+        return (self.valor > self.maximo) | (self.valor < self.minimo)
+
+    def diario(self):
+        """Cantidad, promedio, mínimo y máximo por grupo y día."""
+        dias = self.instante.astype('datetime64[D]')
+        if not len(self):
+            vacio = np.array([], dtype=np.float64)
+            return Diario(self.grupos, self.grupo, dias, np.array([], dtype=np.int64), vacio, vacio, vacio)
+        # Ordenadas por grupo e instante, las lecturas de cada grupo y día son un tramo contiguo
+        cambios = (np.diff(self.grupo) != 0) | (np.diff(dias) != np.timedelta64(0, 'D'))
+        inicios = np.concatenate(([0], np.flatnonzero(cambios) + 1))
+        cantidad = np.diff(np.append(inicios, len(self)))
+        return Diario(
+            grupos=self.grupos,
+            grupo=self.grupo[inicios],
+            dia=dias[inicios],
+            cantidad=cantidad,
+            promedio=np.add.reduceat(self.valor, inicios) / cantidad,
+            minimo=np.minimum.reduceat(self.valor, inicios),
+            maximo=np.maximum.reduceat(self.valor, inicios),
+        )
+
+    def movil(self, dias=7):
+        """Las estadísticas de ``diario()`` en una ventana móvil de ``dias`` días (ver ``ventana``)."""
+        return ventana(self.diario(), dias)
+
+    def fuera_de_rango(self):
+        """
+        Por grupo: lecturas con máximo y mínimo registrados (``evaluadas``),
+        cuántas quedaron por encima del máximo o por debajo del mínimo y la
+        fracción de las evaluadas que quedó fuera (``nan`` si no hay ninguna).
+        """
+        cantidad_grupos = len(self.grupos)
+        evaluadas = ~(np.isnan(self.maximo) | np.isnan(self.minimo))
+        arriba = np.bincount(self.grupo[self.valor > self.maximo], minlength=cantidad_grupos)
+        abajo = np.bincount(self.grupo[self.valor < self.minimo], minlength=cantidad_grupos)
+        evaluadas = np.bincount(self.grupo[evaluadas], minlength=cantidad_grupos)
+        fraccion = np.divide(arriba + abajo, evaluadas, out=np.full(cantidad_grupos, np.nan), where=evaluadas > 0)
+        return Envolvente(self.grupos, evaluadas, arriba, abajo, fraccion)
+
+
+def ventana(diario, dias=7):
+    """
+    Cantidad, promedio, mínimo y máximo de las lecturas de los últimos ``dias``
+    días (el día incluido) a partir de las estadísticas de ``diario``, para
+    cada grupo y cada día del calendario desde el primer día hasta el último.
+    Los días sin lecturas en la ventana quedan en ``nan``.
+    """
+    if dias < 1:
+        raise ValueError("La ventana debe ser de al menos un día.")
+    if not len(diario.dia):
+        vacio = np.empty((len(diario.grupos), 0))
+        return Movil(diario.grupos, diario.dia, vacio.astype(np.int64), vacio, vacio, vacio)
+    calendario = np.arange(diario.dia.min(), diario.dia.max() + np.timedelta64(1, 'D'))
+    forma = (len(diario.grupos), len(calendario))
+    posicion = (diario.grupo, (diario.dia - calendario[0]).astype(np.int64))
+    cantidad = np.zeros(forma, dtype=np.int64)
+    suma = np.zeros(forma)
+    minimo = np.full(forma, np.inf)
+    maximo = np.full(forma, -np.inf)
+    cantidad[posicion] = diario.cantidad
+    suma[posicion] = diario.promedio * diario.cantidad
+    minimo[posicion] = diario.minimo
+    maximo[posicion] = diario.maximo
+
+    # Sumas de cada ventana con la suma acumulada; mínimos y máximos sobre una vista deslizante
+    desde = np.maximum(np.arange(forma[1]) + 1 - dias, 0)
+    acumulada = np.concatenate((np.zeros((forma[0], 1)), suma.cumsum(axis=1)), axis=1)
+    suma = acumulada[:, 1:] - acumulada[:, desde]
+    acumulada = np.concatenate((np.zeros((forma[0], 1), dtype=np.int64), cantidad.cumsum(axis=1)), axis=1)
+    cantidad = acumulada[:, 1:] - acumulada[:, desde]
+    relleno = ((0, 0), (dias - 1, 0))
+    minimo = sliding_window_view(np.pad(minimo, relleno, constant_values=np.inf), dias, axis=1).min(axis=-1)
+    maximo = sliding_window_view(np.pad(maximo, relleno, constant_values=-np.inf), dias, axis=1).max(axis=-1)
+
+    vacias = cantidad == 0
+    promedio = np.divide(suma, cantidad, out=np.full(forma, np.nan), where=~vacias)
+    minimo[vacias] = np.nan
+    maximo[vacias] = np.nan
+    return Movil(diario.grupos, calendario, cantidad, promedio, minimo, maximo)
+
+
+def cargar(fuente, params=None):
+    """La serie de ``fuente`` con los filtros de ``params``. Lanza ``FiltroInvalido`` si alguno no es válido."""
+    queryset = fuente.queryset(fuente.filtros.condicion(params or {}))
+    # Las columnas salen en el orden de values_list: primero los campos y después las anotaciones
+    sql, parametros = queryset.query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(sql, parametros)
+        filas = cursor.fetchall()
+    return Serie.desde_filas(fuente, filas)
+
+
+def _clave(fuente, params):
+    # La consulta normalizada de los filtros (mismo orden siempre), resumida para que sirva de clave en cualquier backend
+    consulta = fuente.filtros.consulta(params or {})
+    return cache_listas.clave(fuente.modelo, 'analitica', hashlib.sha1(consulta.encode()).hexdigest())
+
+def serie(fuente, params=None):
+    """Como ``cargar``, pero de la caché si el modelo no cambió desde la última vez con los mismos filtros."""
+    clave = _clave(fuente, params)
+    cache = cache_listas.backend()
+    resultado = cache.get(clave)
+    if resultado is None:
+        resultado = cargar(fuente, params)
+        cache.set(clave, resultado, cache_listas.DURACION)
+    return resultado
+
+
+def _diario_de_resumenes(fuente, params):
+    """Las estadísticas diarias de ``fuente`` desde ``ResumenDiario``: una fila por área y día, sin leer las lecturas."""
+    desde, hasta = fuente.filtros.fechas(params)
+    area = fuente.filtros.valores(params).get('area')
+    filas = resumenes.consultar(ResumenDiario, fuente.variable, area, desde, hasta).annotate(
+        suma_real=Cast('suma', FloatField()), minimo_real=Cast('minimo', FloatField()),
+        maximo_real=Cast('maximo', FloatField()),
+    ).values_list('area_de_trabajo', 'dia', 'cantidad', 'suma_real', 'minimo_real', 'maximo_real')
+    columnas = list(zip(*filas)) or [()] * 6
+    grupos, grupo = np.unique(np.array(columnas[0], dtype=str), return_inverse=True)
+    dia = np.array(columnas[1], dtype='datetime64[D]')
+    cantidad = np.array(columnas[2], dtype=np.int64)
+    suma, minimo, maximo = (np.array(columna, dtype=np.float64) for columna in columnas[3:])
+    # Los resúmenes salen por día y área; Serie.diario() los da por grupo y día
+    orden = np.lexsort((dia, grupo))
+    return Diario(
+        tuple(grupos.tolist()), grupo[orden], dia[orden], cantidad[orden],
+        suma[orden] / cantidad[orden], minimo[orden], maximo[orden],
+    )
+
+def diario(fuente, params=None):
+    """
+    Cantidad, promedio, mínimo y máximo por grupo y día de ``fuente`` con los
+    filtros de ``params``: de ``ResumenDiario`` si la fuente tiene resúmenes y
+    no se filtra por ``hora``, o de la serie (``serie(...).diario()``).
+    Lanza ``FiltroInvalido`` si algún filtro no es válido.
+    """
+    params = params or {}
+    fuente.filtros.condicion(params)
+    if fuente.variable is None or 'hora' in fuente.filtros.valores(params):
+        return serie(fuente, params).diario()
+    return _diario_de_resumenes(fuente, params)
+
+def movil(fuente, params=None, dias=7):
+    """Como ``diario``, en una ventana móvil de ``dias`` días (ver ``ventana``)."""
+    return ventana(diario(fuente, params), dias)
+
+
+TEMPERATURA = Fuente(
+    filtros.TEMPERATURA, grupo=['area_de_trabajo'],
+    lecturas=[('temperatura', 'max_temperatura', 'min_temperatura', None)],
+    variable='temperatura',
+)
+HUMEDAD = Fuente(
+    filtros.HUMEDAD, grupo=['area_de_trabajo'],
+    lecturas=[('humedad', 'max_humedad', 'min_humedad', None)],
+    variable='humedad',
+)
+# Tres lecturas por registro, a las 7:30, 12:00 y 15:00 del día de ``fecha``
+REGISTRO_TEMPERATURA_AGUA = Fuente(
+    filtros.REGISTRO_TEMPERATURA_AGUA, grupo=['especie', 'cepa'], campo_fecha='fecha',
+    lecturas=[
+        ('temp_730am', 'temp_max_730am', 'temp_min_730am', time(7, 30)),
+        ('temp_1200md', 'temp_max_1200md', 'temp_min_1200md', time(12, 0)),
+        ('temp_1500pm', 'temp_max_1500pm', 'temp_min_1500pm', time(15, 0)),
+    ],
+)
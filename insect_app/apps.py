@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class InsectAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'insect_app'
+
+    def ready(self):
+        from . import signals # noqa: F401 Conecta las señales de los modelos
@@ -0,0 +1,64 @@
+"""
+Apoyo para las vistas asíncronas (listas, páginas de DataTables y exportaciones).
+
+Con un servidor ASGI (ver Dockerfile y ``insectario_project/asgi.py``) esas
+vistas esperan a la base de datos con el ORM asíncrono (``acount``,
+``aiterator``, ...) sin ocupar un worker: una exportación larga o una consulta
+lenta ya no bloquean a las demás peticiones del mismo proceso. Con WSGI siguen
+funcionando, cada una en su propio bucle de eventos.
+
+En una vista asíncrona ``request.user`` no se puede resolver (consultaría la
+base de datos de forma síncrona); ``login_required`` carga el usuario con
+``request.auser()`` y ``usuario`` lo deja también en ``request.user`` para las
+plantillas, el ETag y la caché de las listas.
+
+Todo el middleware debe aceptar peticiones asíncronas: con uno solo síncrono,
+Django atiende el resto de la cadena (y la vista) en su único hilo síncrono, una
+petición a la vez. ``ArchivosEstaticosMiddleware`` es el de WhiteNoise con esa
+capacidad.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.shortcuts import render as render_sincrono
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+
+async def usuario(request):
+    """El usuario de la petición, cargado con ``request.auser()`` y disponible en ``request.user``."""
+    actual = await request.auser()
+    # Lo que lee request.user (django.contrib.auth.middleware.get_user) antes de consultar la sesión
+    request._cached_user = actual
+    return actual
+
+
+async def render(request, plantilla, contexto):
+    """``render`` para las vistas asíncronas; el contexto ya debe estar evaluado."""
+    await usuario(request)
+    return render_sincrono(request, plantilla, contexto)
+
+
+class ArchivosEstaticosMiddleware(WhiteNoiseMiddleware):
+    """``WhiteNoiseMiddleware`` que también acepta peticiones asíncronas."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings)
+        self.asincrono = iscoroutinefunction(get_response)
+        if self.asincrono:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.asincrono:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            archivo = await sync_to_async(self.find_file, thread_sensitive=False)(request.path_info)
+        else:
+            archivo = self.files.get(request.path_info)
+        if archivo is not None:
+            # Abre el archivo y lee sus cabeceras: fuera del bucle de eventos
+            return await sync_to_async(self.serve, thread_sensitive=False)(archivo, request)
+        return await self.get_response(request)
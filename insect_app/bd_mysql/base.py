@@ -0,0 +1,79 @@
+"""
+Backend de MySQL/MariaDB de Django con un pool de conexiones por proceso.
+
+``ENGINE = 'insect_app.bd_mysql'`` en ``DATABASES``; el pool se configura en
+``OPTIONS['pool']`` (ver ``insect_app/conexiones.py``). Las conexiones que
+Django abre y cierra en cada petición se toman y se devuelven al pool. Una
+conexión se descarta en lugar de devolverse si se cierra con una transacción
+abierta, fuera de autocommit o después de un error de la base de datos.
+
+Al tomar una conexión que ya se había usado no se repite la preparación de la
+sesión (``SQL_AUTO_IS_NULL`` y nivel de aislamiento), y los datos del servidor
+que Django consulta una vez por objeto de conexión (versión, ``sql_mode``, ...)
+se leen una sola vez por pool.
+"""
+from django.db.backends.mysql import base
+from django.utils.functional import cached_property
+
+from insect_app import conexiones
+
+
+def _responde(conexion):
+    try:
+        # Sin reconectar: una conexión nueva no tendría la sesión preparada
+        conexion.ping(False)
+    except base.Database.Error:
+        return False
+    return True
+
+
+def _cerrar(conexion):
+    conexion.close()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    @property
+    def pool(self):
+        datos = self.settings_dict
+        return conexiones.pool(
+            (self.alias, datos['NAME'], datos['HOST'], datos['PORT'], datos['USER']),
+            datos['OPTIONS'].get('pool', {}), _responde, _cerrar,
+        )
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop('pool', None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        try:
+            return self.pool.obtener(lambda: self._preparar(super(DatabaseWrapper, self).get_new_connection(conn_params)))
+        except conexiones.PoolAgotado as e:
+            raise base.Database.OperationalError(str(e)) from e
+
+    @staticmethod
+    def _preparar(conexion):
+        # Marca las conexiones nuevas: init_connection_state solo prepara la sesión una vez
+        conexion.sesion_preparada = False
+        return conexion
+
+    def init_connection_state(self):
+        if self.connection.sesion_preparada:
+            return
+        super().init_connection_state()
+        self.connection.sesion_preparada = True
+
+    @cached_property
+    def mysql_server_data(self):
+        pool = self.pool
+        if pool.datos_servidor is None:
+            pool.datos_servidor = super().mysql_server_data
+        return pool.datos_servidor
+
+    def _close(self):
+        if self.connection is None:
+            return
+        # Una conexión a medio usar (transacción abierta, sin autocommit o con un error) no se reutiliza
+        reutilizable = self.autocommit and not self.in_atomic_block and not self.errors_occurred
+        self.pool.devolver(self.connection, reutilizable)
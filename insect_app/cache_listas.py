@@ -0,0 +1,147 @@
+"""
+Caché de las páginas de lista (``temperatura_list``, ``humedad_list``, ...).
+
+Cada página se guarda ya renderizada con la clave
+``lista:<modelo>:<versión>:<usuario>`` (la página muestra el nombre del
+usuario, así que cada uno tiene la suya). La versión de cada modelo está en la
+misma caché y cambia cada vez que se guarda o elimina un registro del modelo
+(señales ``post_save``/``post_delete``, ver ``signals.py``) o se carga un lote
+(``importacion``, ``ingesta``): desde ese momento las páginas guardadas con la
+versión anterior ya no se usan y se descartan solas al vencer. La versión se
+cambia al confirmar la transacción, para que nadie guarde en la versión nueva
+una página leída antes del cambio.
+
+El backend es el alias ``CACHE_LISTAS`` de ``CACHES`` en settings.py (por
+defecto ``'default'``). Con varios procesos (gunicorn) la caché tiene que ser
+compartida (archivos o memcached): con ``LocMemCache`` cada proceso solo se
+enteraría de sus propios cambios.
+
+``estadisticas()`` devuelve los aciertos y fallos por modelo de este proceso;
+los de todos los procesos se publican en ``/metrics`` (``metricas.CACHE_LISTAS``).
+"""
+import functools
+import time
+from collections import Counter
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse
+
+from . import asincronas, metricas
+
+# Segundos que se conserva una página (cambie o no la versión, después se vuelve a generar)
+DURACION = 60 * 60
+
+aciertos = Counter()
+fallos = Counter()
+
+
+def backend():
+    return caches[getattr(settings, 'CACHE_LISTAS', 'default')]
+
+def _clave_version(modelo):
+    return f'lista:version:{modelo._meta.label_lower}'
+
+def version(modelo):
+    """Versión actual de las páginas de ``modelo``."""
+    cache = backend()
+    actual = cache.get(_clave_version(modelo))
+    if actual is None:
+        # Sin versión (caché vacía o la clave se descartó): se empieza una nueva,
+        # distinta de cualquiera que se haya usado antes
+        cache.add(_clave_version(modelo), time.time_ns(), timeout=None)
+        actual = cache.get(_clave_version(modelo))
+    return actual
+
+async def aversion(modelo):
+    """Como ``version``, para las vistas asíncronas."""
+    cache = backend()
+    actual = await cache.aget(_clave_version(modelo))
+    if actual is None:
+        await cache.aadd(_clave_version(modelo), time.time_ns(), timeout=None)
+        actual = await cache.aget(_clave_version(modelo))
+    return actual
+
+def _nueva_version(modelo):
+    # La hora en nanosegundos: solo crece y no depende de leer la versión anterior,
+    # así que dos cambios simultáneos no pueden dejar la misma versión (cache.incr
+    # no es atómico en todos los backends)
+    backend().set(_clave_version(modelo), time.time_ns(), timeout=None)
+
+def _clave(modelo, version_actual, partes):
+    return ':'.join(['lista', modelo._meta.label_lower, str(version_actual), *map(str, partes)])
+
+def clave(modelo, *partes):
+    """Clave de caché para ``modelo`` en su versión actual (cambia con cada registro guardado)."""
+    return _clave(modelo, version(modelo), partes)
+
+async def aclave(modelo, *partes):
+    """Como ``clave``, para las vistas asíncronas."""
+    return _clave(modelo, await aversion(modelo), partes)
+
+def invalidar(modelo):
+    """Descarta las páginas de ``modelo`` al confirmarse la transacción en curso."""
+    transaction.on_commit(functools.partial(_nueva_version, modelo))
+
+
+def _contar(etiqueta, acierto):
+    (aciertos if acierto else fallos)[etiqueta] += 1
+    metricas.CACHE_LISTAS.labels(etiqueta, 'acierto' if acierto else 'fallo').inc()
+
+def _guardable(response):
+    return response.status_code == 200 and not response.streaming
+
+
+def en_cache(modelo):
+    """
+    Decorador para las vistas de lista de ``modelo``: responde con la página
+    guardada para la versión actual y el usuario, o la genera y la guarda.
+    Acepta vistas síncronas y asíncronas.
+    """
+    etiqueta = modelo._meta.label_lower
+
+    def decorador(vista):
+        if iscoroutinefunction(vista):
+            @functools.wraps(vista)
+            async def envoltura_asincrona(request, *args, **kwargs):
+                if request.method != 'GET' or request.GET:
+                    return await vista(request, *args, **kwargs)
+                usuario = await asincronas.usuario(request)
+                clave_pagina = await aclave(modelo, usuario.pk)
+                cache = backend()
+                contenido = await cache.aget(clave_pagina)
+                _contar(etiqueta, contenido is not None)
+                if contenido is not None:
+                    return HttpResponse(contenido)
+                response = await vista(request, *args, **kwargs)
+                if _guardable(response):
+                    await cache.aset(clave_pagina, response.content, DURACION)
+                return response
+            return envoltura_asincrona
+
+        @functools.wraps(vista)
+        def envoltura(request, *args, **kwargs):
+            if request.method != 'GET' or request.GET:
+                return vista(request, *args, **kwargs)
+            clave_pagina = clave(modelo, request.user.pk)
+            cache = backend()
+            contenido = cache.get(clave_pagina)
+            _contar(etiqueta, contenido is not None)
+            if contenido is not None:
+                return HttpResponse(contenido)
+            response = vista(request, *args, **kwargs)
+            if _guardable(response):
+                cache.set(clave_pagina, response.content, DURACION)
+            return response
+        return envoltura
+    return decorador
+
+
+def estadisticas():
+    """Aciertos y fallos de la caché por modelo, desde que arrancó el proceso."""
+    return {
+        etiqueta: {'aciertos': aciertos[etiqueta], 'fallos': fallos[etiqueta]}
+        for etiqueta in sorted(aciertos.keys() | fallos.keys())
+    }
@@ -0,0 +1,20 @@
+"""
+Hasher de contraseñas con el costo ajustable desde settings.py.
+
+Es el PBKDF2-SHA256 de Django (mismo algoritmo y formato: las contraseñas ya
+guardadas siguen valiendo) con ``CLAVES_ITERACIONES`` iteraciones; sin el
+ajuste, las de Django. Cada verificación cuesta del orden de un
+``CLAVES_ITERACIONES`` de SHA-256, así que el número de iteraciones decide
+cuántos inicios de sesión (e ingestas con HTTP Basic) por segundo atiende
+cada worker. Al cambiarlo, cada contraseña se vuelve a calcular con el nuevo
+valor la próxima vez que su usuario inicia sesión.
+"""
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class PBKDF2Ajustable(PBKDF2PasswordHasher):
+
+    @property
+    def iterations(self):
+        return getattr(settings, 'CLAVES_ITERACIONES', None) or PBKDF2PasswordHasher.iterations
@@ -0,0 +1,93 @@
+"""
+GET condicional (``ETag`` / ``Last-Modified``) para las listas y las exportaciones.
+
+El validador de cada modelo sale de una sola consulta agregada,
+``MAX(fecha_actualizacion)`` y ``COUNT(*)``, que la base de datos resuelve con
+el índice de ``fecha_actualizacion`` sin leer las filas. Guardar un registro
+cambia el máximo (``auto_now``) y eliminarlo cambia la cantidad. Si el
+navegador ya tiene la versión actual (``If-None-Match`` o ``If-Modified-Since``)
+se responde 304 antes de consultar las filas o renderizar la plantilla.
+
+La página muestra el nombre del usuario, así que el ``ETag`` incluye su id. El
+``Last-Modified`` tiene precisión de segundos; los navegadores envían también
+``If-None-Match``, que tiene prioridad y distingue cambios dentro del mismo
+segundo.
+
+El resultado de la consulta se guarda en la caché de las listas con la
+versión del modelo (``cache_listas.clave``), así que solo se repite después de
+un cambio: mientras tanto, los 304 no consultan la base de datos.
+"""
+import functools
+
+from asgiref.sync import iscoroutinefunction
+from django.db.models import Count, Max
+from django.utils import timezone
+from django.views.decorators.http import condition
+
+from . import asincronas, cache_listas
+
+
+AGREGADOS = {'ultima': Max('fecha_actualizacion'), 'cantidad': Count('pk')}
+
+
+def estado(request, modelo):
+    """``(cantidad, última actualización)`` de ``modelo``, una vez por petición."""
+    estados = request.__dict__.setdefault('_estado_registros', {})
+    if modelo not in estados:
+        clave = cache_listas.clave(modelo, 'estado')
+        cache = cache_listas.backend()
+        estados[modelo] = cache.get(clave)
+        if estados[modelo] is None:
+            agregados = modelo.objects.order_by().aggregate(**AGREGADOS)
+            estados[modelo] = agregados['cantidad'], agregados['ultima']
+            cache.set(clave, estados[modelo], cache_listas.DURACION)
+    return estados[modelo]
+
+
+async def aestado(request, modelo):
+    """Como ``estado``, para las vistas asíncronas."""
+    estados = request.__dict__.setdefault('_estado_registros', {})
+    if modelo not in estados:
+        clave = await cache_listas.aclave(modelo, 'estado')
+        cache = cache_listas.backend()
+        estados[modelo] = await cache.aget(clave)
+        if estados[modelo] is None:
+            agregados = await modelo.objects.order_by().aaggregate(**AGREGADOS)
+            estados[modelo] = agregados['cantidad'], agregados['ultima']
+            await cache.aset(clave, estados[modelo], cache_listas.DURACION)
+    return estados[modelo]
+
+
+def segun_cambios(modelo):
+    """
+    Decorador: responde 304 si los registros de ``modelo`` no cambiaron desde la
+    última visita. Acepta vistas síncronas y asíncronas.
+    """
+
+    def etag(request, *args, **kwargs):
+        cantidad, ultima = estado(request, modelo)
+        marca = ultima.strftime('%Y%m%d%H%M%S%f') if ultima else '0'
+        return f'"{modelo._meta.model_name}-{cantidad}-{marca}-{request.user.pk or 0}"'
+
+    def ultima_modificacion(request, *args, **kwargs):
+        _, ultima = estado(request, modelo)
+        if ultima is None:
+            return None
+        # USE_TZ = False: las fechas se guardan en la hora local (TIME_ZONE)
+        return timezone.make_aware(ultima) if timezone.is_naive(ultima) else ultima
+
+    decorador = condition(etag_func=etag, last_modified_func=ultima_modificacion)
+
+    def aplicar(vista):
+        envuelta = decorador(vista)
+        if not iscoroutinefunction(vista):
+            return envuelta
+
+        @functools.wraps(vista)
+        async def previa(request, *args, **kwargs):
+            # condition() calcula el ETag de forma síncrona: el usuario y el estado se cargan antes
+            await asincronas.usuario(request)
+            await aestado(request, modelo)
+            return await envuelta(request, *args, **kwargs)
+        return previa
+    return aplicar
@@ -0,0 +1,195 @@
+"""
+Pool de conexiones a la base de datos, uno por proceso.
+
+Sin pool, Django abre una conexión a MariaDB al empezar cada petición (TCP y
+autenticación) y la cierra al terminar. Con ``CONN_MAX_AGE`` la conexión se
+conserva entre las peticiones de un mismo hilo, pero con ASGI cada petición
+tiene su propio objeto de conexión y no se reutiliza. Con
+``ENGINE = 'insect_app.bd_mysql'`` (ver settings.py) la conexión que Django
+cierra vuelve a un ``Pool`` del proceso y la siguiente petición la toma ya
+abierta, con WSGI o con ASGI.
+
+Opciones, en ``DATABASES['default']['OPTIONS']['pool']``:
+
+* ``maximo``: conexiones abiertas por proceso, en uso o libres. Si todas están
+  en uso, la petición espera a que se devuelva una.
+* ``espera``: segundos que se espera una conexión libre antes de fallar con
+  ``OperationalError`` (por defecto 10).
+* ``verificar``: una conexión que lleva más de estos segundos libre se
+  comprueba (``ping``) antes de entregarla; si el servidor la cerró se abre
+  otra (por defecto 30).
+* ``vida``: segundos tras los que una conexión ya no vuelve al pool y se
+  cierra, por debajo del ``wait_timeout`` del servidor (por defecto 3600).
+
+``estadisticas()`` devuelve el estado de los pools de este proceso; los de
+todos los procesos se publican en ``/metrics`` (``metricas.BD_CONEXIONES``,
+``metricas.BD_ESPERA`` y ``metricas.BD_EVENTOS``).
+"""
+import os
+import threading
+import time
+
+from . import metricas
+
+# Valores de las opciones que no se indiquen en OPTIONS['pool']
+OPCIONES = {'maximo': 10, 'espera': 10.0, 'verificar': 30.0, 'vida': 3600.0}
+
+
+class PoolAgotado(Exception):
+    """No se liberó ninguna conexión dentro del tiempo de espera."""
+
+
+class Pool:
+    """
+    Hasta ``maximo`` conexiones creadas con ``crear`` (se pasa a ``obtener``).
+    ``verificar(conexion)`` devuelve si una conexión libre sigue abierta y
+    ``cerrar(conexion)`` la cierra al descartarla.
+    """
+
+    def __init__(self, verificar, cerrar, maximo=10, espera=10.0, verificar_despues=30.0, vida=3600.0):
+        self.verificar = verificar
+        self.cerrar = cerrar
+        self.maximo = maximo
+        self.espera = espera
+        self.verificar_despues = verificar_despues
+        self.vida = vida
+        self._condicion = threading.Condition()
+        # Libres: (conexión, creada, devuelta); se entrega la última devuelta
+        self._libres = []
+        self._creadas = {}
+        self.en_uso = 0
+        self.esperas = 0
+        self.segundos_espera = 0.0
+        self.agotado = 0
+        self.creadas = 0
+        self.descartadas = 0
+        # Datos del servidor (versión, sql_mode, ...) que lee el backend una vez por pool
+        self.datos_servidor = None
+
+    def obtener(self, crear):
+        """Una conexión libre, o una nueva con ``crear()`` si no hay y no se llegó al máximo."""
+        inicio = time.perf_counter()
+        limite = inicio + self.espera
+        with self._condicion:
+            while not self._libres and self.en_uso >= self.maximo:
+                restante = limite - time.perf_counter()
+                if restante <= 0:
+                    self.agotado += 1
+                    metricas.BD_EVENTOS.labels('agotado').inc()
+                    raise PoolAgotado(
+                        f"Las {self.maximo} conexiones del pool siguen en uso después de {self.espera:g} s."
+                    )
+                self._condicion.wait(restante)
+            libre = self._libres.pop() if self._libres else None
+            self.en_uso += 1
+            esperado = time.perf_counter() - inicio
+            if esperado > 0.001:
+                self.esperas += 1
+                self.segundos_espera += esperado
+            self._publicar()
+        metricas.BD_ESPERA.observe(esperado)
+
+        try:
+            if libre is not None:
+                conexion, creada, devuelta = libre
+                if time.monotonic() - devuelta < self.verificar_despues or self.verificar(conexion):
+                    metricas.BD_EVENTOS.labels('reutilizada').inc()
+                    return self._en_uso(conexion, creada)
+                self._descartar(conexion)
+            conexion = crear()
+        except BaseException:
+            with self._condicion:
+                self.en_uso -= 1
+                self._publicar()
+                self._condicion.notify()
+            raise
+        with self._condicion:
+            self.creadas += 1
+        metricas.BD_EVENTOS.labels('creada').inc()
+        return self._en_uso(conexion, time.monotonic())
+
+    def devolver(self, conexion, reutilizable=True):
+        """Devuelve ``conexion`` al pool; si no es ``reutilizable`` o ya es vieja, la cierra."""
+        with self._condicion:
+            creada = self._creadas.pop(id(conexion))
+        if reutilizable and time.monotonic() - creada < self.vida:
+            with self._condicion:
+                self._libres.append((conexion, creada, time.monotonic()))
+                self.en_uso -= 1
+                self._publicar()
+                self._condicion.notify()
+            return
+        self._descartar(conexion)
+        with self._condicion:
+            self.en_uso -= 1
+            self._publicar()
+            self._condicion.notify()
+
+    def vaciar(self):
+        """Cierra las conexiones libres (las que están en uso se cierran al devolverlas)."""
+        with self._condicion:
+            libres, self._libres = self._libres, []
+            self._publicar()
+        for conexion, _, _ in libres:
+            self._descartar(conexion)
+
+    def estadisticas(self):
+        with self._condicion:
+            return {
+                'maximo': self.maximo,
+                'en_uso': self.en_uso,
+                'libres': len(self._libres),
+                'creadas': self.creadas,
+                'descartadas': self.descartadas,
+                'esperas': self.esperas,
+                'segundos_espera': round(self.segundos_espera, 6),
+                'agotado': self.agotado,
+            }
+
+    def _en_uso(self, conexion, creada):
+        with self._condicion:
+            self._creadas[id(conexion)] = creada
+        return conexion
+
+    def _descartar(self, conexion):
+        with self._condicion:
+            self.descartadas += 1
+        metricas.BD_EVENTOS.labels('descartada').inc()
+        try:
+            self.cerrar(conexion)
+        except Exception:
+            pass
+
+    def _publicar(self):
+        metricas.BD_CONEXIONES.labels('en_uso').set(self.en_uso)
+        metricas.BD_CONEXIONES.labels('libres').set(len(self._libres))
+
+
+_pools = {}
+_candado = threading.Lock()
+
+
+def pool(clave, opciones, verificar, cerrar):
+    """
+    El pool de este proceso para ``clave`` (alias, base de datos y demás datos
+    de conexión: la base de datos de pruebas tiene su propio pool),
+    creado con ``opciones`` la primera vez. Los procesos hijos (workers de
+    gunicorn) crean el suyo.
+    """
+    clave = (os.getpid(), *clave)
+    with _candado:
+        if clave not in _pools:
+            opciones = {**OPCIONES, **opciones}
+            _pools[clave] = Pool(
+                verificar, cerrar, maximo=int(opciones['maximo']), espera=float(opciones['espera']),
+                verificar_despues=float(opciones['verificar']), vida=float(opciones['vida']),
+            )
+        return _pools[clave]
+
+
+def estadisticas():
+    """Estado de los pools de este proceso, por alias y base de datos (``'default:bd_insectario'``)."""
+    pid = os.getpid()
+    with _candado:
+        pools = [(clave[1:3], p) for clave, p in _pools.items() if clave[0] == pid]
+    return {f'{alias}:{nombre}': p.estadisticas() for (alias, nombre), p in pools}
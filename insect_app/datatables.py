@@ -0,0 +1,346 @@
+"""
+Procesamiento del lado del servidor para las tablas DataTables de las listas.
+
+Cada lista tiene un endpoint JSON que recibe los parámetros que envía
+DataTables en modo ``serverSide`` (``draw``, ``start``, ``length``,
+``order[0][column]``, ``order[0][dir]`` y ``search[value]``) y devuelve solo la
+página solicitada. Con el orden por defecto, cada respuesta incluye los cursores
+de paginación por clave (ver ``paginacion.py``) y ``static/js/tablas.js`` los
+envía al pasar a la página siguiente o anterior, de modo que esas páginas no usan
+OFFSET. Los saltos a una página arbitraria y los órdenes por otra columna siguen
+usando LIMIT/OFFSET.
+
+Los filtros de la URL de la lista (``desde``, ``area``, ... ver ``filtros.py``)
+llegan también en cada petición y se aplican antes de contar y paginar:
+``recordsTotal`` es el total de registros filtrados y la búsqueda de DataTables
+se hace dentro de ellos.
+
+Las celdas se formatean igual que en las plantillas ``*_list.html`` para que la
+primera página (que se renderiza en HTML) y las siguientes (que llegan por AJAX)
+se vean idénticas.
+"""
+from django.db.models import Q
+from django.http import HttpResponseBadRequest, JsonResponse
+from django.urls import reverse
+from django.utils import dateformat
+from django.utils.formats import localize
+from django.utils.html import conditional_escape, format_html
+
+from . import filtros, listas
+from .filtros import FiltroInvalido
+from .paginacion import ANTERIOR, SIGUIENTE, CursorInvalido, codificar_cursor
+
+# Filas que se muestran en la primera carga (coincide con pageLength en las plantillas)
+LONGITUD_PAGINA = 5
+# Máximo de filas que se devuelven por petición, aunque el cliente pida más
+LONGITUD_MAXIMA = 100
+ORDEN_POR_DEFECTO = ('-fecha_creacion', '-id')
+# Mayor id posible (BigAutoField); una búsqueda por un número mayor no busca por id
+ID_MAXIMO = 2 ** 63 - 1
+
+FORMATO_FECHA = "d/m/Y"
+FORMATO_FECHA_HORA = r"d/m/Y \a \l\a\s H:i"
+FORMATO_HORA = "H:i"
+
+
+# --- Formateo de celdas (equivalente a los filtros de las plantillas) ---
+
+def celda(valor):
+    """Equivalente a ``{{ valor }}`` en una plantilla."""
+    return conditional_escape(localize(valor))
+
+def celda_defecto(valor, defecto="N/A"):
+    """Equivalente a ``{{ valor|default:"N/A" }}``."""
+    return celda(valor or defecto)
+
+def celda_fecha(valor, formato=FORMATO_FECHA):
+    """Equivalente a ``{{ valor|date:formato }}``."""
+    if valor in (None, ''):
+        return ''
+    return conditional_escape(dateformat.format(valor, formato))
+
+def celda_hora(valor, formato=FORMATO_HORA):
+    """Equivalente a ``{{ valor|time:formato }}``."""
+    if valor in (None, ''):
+        return ''
+    return conditional_escape(dateformat.time_format(valor, formato))
+
+def celda_observaciones(texto, larga, url_observaciones, pk):
+    """Las observaciones (o "N/A"); si la fila solo trae el comienzo, con el enlace para verlas completas."""
+    if not larga:
+        return celda_defecto(texto)
+    return format_html(
+        '{}… <a href="{}" class="ver-observaciones">ver más</a>',
+        celda(texto), reverse(url_observaciones, args=[pk]),
+    )
+
+def celda_acciones(url_actualizar, url_eliminar, pk):
+    """Botones de editar y eliminar de la última columna."""
+    return format_html(
+        '<a href="{}" class="btn btn-warning btn-sm me-1"><i class="bi bi-pen"></i></a>\n'
+        '                                <a href="{}" class="btn btn-danger btn-sm"><i class="bi bi-trash"></i></a>',
+        reverse(url_actualizar, args=[pk]),
+        reverse(url_eliminar, args=[pk]),
+    )
+
+
+# --- Definición de las tablas ---
+
+class Tabla:
+    """
+    Describe cómo se pagina, ordena, busca y serializa la tabla de un modelo.
+
+    ``columnas`` sigue el orden de las columnas de la plantilla; ``None`` marca
+    las columnas que no se pueden ordenar (las acciones). Las filas son las de
+    ``lista`` (ver ``listas.py``), con los ``filtros`` de la URL; ``fila``
+    formatea sus celdas hasta antes de las observaciones, que van siempre al
+    final, antes de las acciones.
+    """
+
+    def __init__(self, lista, filtros, columnas, busqueda, fila, prefijo_url):
+        self.lista = lista
+        self.filtros = filtros
+        self.modelo = lista.modelo
+        self.columnas = columnas
+        self.busqueda = busqueda
+        self.fila = fila
+        self.url_actualizar = f'{prefijo_url}_update'
+        self.url_eliminar = f'{prefijo_url}_delete'
+        self.url_observaciones = f'{prefijo_url}_observaciones'
+
+    def queryset(self, params):
+        """Las filas que cumplen los filtros de ``params``. Lanza ``FiltroInvalido`` si alguno no es válido."""
+        return self.lista.queryset().filter(self.filtros.condicion(params))
+
+    def serializar(self, obj):
+        return self.fila(obj) + [
+            celda_observaciones(
+                getattr(obj, self.lista.observaciones), obj.observaciones_larga, self.url_observaciones, obj.pk,
+            ),
+            celda_acciones(self.url_actualizar, self.url_eliminar, obj.pk),
+        ]
+
+
+def _fila_temperatura(temp):
+    return [
+        celda(temp.id),
+        celda(temp.temperatura),
+        celda(temp.max_temperatura),
+        celda(temp.min_temperatura),
+        celda_hora(temp.hora),
+        celda(temp.area_de_trabajo),
+        celda_fecha(temp.fecha_creacion, FORMATO_FECHA_HORA),
+        celda_fecha(temp.fecha_actualizacion, FORMATO_FECHA_HORA),
+    ]
+
+def _fila_humedad(hum):
+    return [
+        celda(hum.id),
+        celda(hum.humedad),
+        celda(hum.max_humedad),
+        celda(hum.min_humedad),
+        celda_hora(hum.hora),
+        celda(hum.area_de_trabajo),
+        celda_fecha(hum.fecha_creacion, FORMATO_FECHA_HORA),
+        celda_fecha(hum.fecha_actualizacion, FORMATO_FECHA_HORA),
+    ]
+
+def _fila_vida(vida):
+    return [
+        celda(vida.id),
+        celda(vida.especie),
+        celda(vida.cepa),
+        celda_defecto(celda_fecha(vida.fecha_inicio_bandejas)),
+        celda_defecto(celda_fecha(vida.fecha_pupacion)),
+        celda(vida.numero_bandejas_antes_trabajo),
+        celda(vida.pupas_vivas),
+        celda(vida.pupas_muertas),
+        celda(vida.total_pupas_vivas_y_muertas),
+        celda(vida.larvas_muertas),
+        celda(vida.bandejas_divididas),
+        celda(vida.bandejas_existentes_despues_trabajo),
+        celda(vida.am_pm_pupas_vivas),
+        celda(vida.am_pm_pupas_muertas),
+        celda(vida.am_pm_larvas_muertas),
+        celda(vida.tiempo_bandeja),
+        celda_fecha(vida.fecha_creacion, FORMATO_FECHA_HORA),
+        celda_fecha(vida.fecha_actualizacion, FORMATO_FECHA_HORA),
+    ]
+
+def _fila_mortalidad_pupas(mort):
+    return [
+        celda(mort.id),
+        celda(mort.cepa),
+        celda(mort.cantidad),
+        celda(mort.fecha_creacion),
+        celda(mort.fecha_actualizacion),
+    ]
+
+def _fila_registrotemperaturaagua(registro):
+    return [
+        celda(registro.id),
+        celda_fecha(registro.fecha),
+        celda(registro.especie),
+        celda(registro.cepa),
+        celda_fecha(registro.fecha_bandeja),
+        celda_defecto(registro.temp_730am),
+        celda_defecto(registro.temp_max_730am),
+        celda_defecto(registro.temp_min_730am),
+        celda_defecto(registro.temp_1200md),
+        celda_defecto(registro.temp_max_1200md),
+        celda_defecto(registro.temp_min_1200md),
+        celda_defecto(registro.temp_1500pm),
+        celda_defecto(registro.temp_max_1500pm),
+        celda_defecto(registro.temp_min_1500pm),
+        celda_fecha(registro.fecha_creacion, FORMATO_FECHA_HORA),
+        celda_fecha(registro.fecha_actualizacion, FORMATO_FECHA_HORA),
+    ]
+
+
+TEMPERATURA = Tabla(
+    listas.TEMPERATURA,
+    filtros.TEMPERATURA,
+    columnas=['id', 'temperatura', 'max_temperatura', 'min_temperatura', 'hora',
+              'area_de_trabajo', 'fecha_creacion', 'fecha_actualizacion', 'obs', None],
+    busqueda=['area_de_trabajo', 'obs'],
+    fila=_fila_temperatura,
+    prefijo_url='temperatura',
+)
+
+HUMEDAD = Tabla(
+    listas.HUMEDAD,
+    filtros.HUMEDAD,
+    columnas=['id', 'humedad', 'max_humedad', 'min_humedad', 'hora',
+              'area_de_trabajo', 'fecha_creacion', 'fecha_actualizacion', 'obs', None],
+    busqueda=['area_de_trabajo', 'obs'],
+    fila=_fila_humedad,
+    prefijo_url='humedad',
+)
+
+VIDA = Tabla(
+    listas.VIDA,
+    filtros.VIDA,
+    columnas=['id', 'especie', 'cepa', 'fecha_inicio_bandejas', 'fecha_pupacion',
+              'numero_bandejas_antes_trabajo', 'pupas_vivas', 'pupas_muertas',
+              'total_pupas_vivas_y_muertas', 'larvas_muertas', 'bandejas_divididas',
+              'bandejas_existentes_despues_trabajo', 'am_pm_pupas_vivas',
+              'am_pm_pupas_muertas', 'am_pm_larvas_muertas', 'tiempo_bandeja',
+              'fecha_creacion', 'fecha_actualizacion', 'obs', None],
+    busqueda=['especie', 'cepa', 'tiempo_bandeja', 'obs'],
+    fila=_fila_vida,
+    prefijo_url='vida',
+)
+
+MORTALIDAD_PUPAS = Tabla(
+    listas.MORTALIDAD_PUPAS,
+    filtros.MORTALIDAD_PUPAS,
+    columnas=['id', 'cepa', 'cantidad', 'fecha_creacion', 'fecha_actualizacion', 'obs', None],
+    busqueda=['cepa', 'obs'],
+    fila=_fila_mortalidad_pupas,
+    prefijo_url='mortalidad_pupas',
+)
+
+REGISTRO_TEMPERATURA_AGUA = Tabla(
+    listas.REGISTRO_TEMPERATURA_AGUA,
+    filtros.REGISTRO_TEMPERATURA_AGUA,
+    columnas=['id', 'fecha', 'especie', 'cepa', 'fecha_bandeja',
+              'temp_730am', 'temp_max_730am', 'temp_min_730am',
+              'temp_1200md', 'temp_max_1200md', 'temp_min_1200md',
+              'temp_1500pm', 'temp_max_1500pm', 'temp_min_1500pm',
+              'fecha_creacion', 'fecha_actualizacion', 'observaciones', None],
+    busqueda=['especie', 'cepa', 'observaciones'],
+    fila=_fila_registrotemperaturaagua,
+    prefijo_url='registrotemperaturaagua',
+)
+
+
+# --- Lectura de parámetros de DataTables ---
+
+def _entero(valor, defecto):
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        return defecto
+
+def _orden(params, tabla):
+    """Traduce ``order[0][column]``/``order[0][dir]`` a argumentos de ``order_by``."""
+    indice = _entero(params.get('order[0][column]'), None)
+    if indice is None or not 0 <= indice < len(tabla.columnas) or tabla.columnas[indice] is None:
+        return ORDEN_POR_DEFECTO
+    signo = '-' if params.get('order[0][dir]') == 'desc' else ''
+    campo = tabla.columnas[indice]
+    # Se añade el id para que el orden sea estable entre páginas
+    return (f'{signo}{campo}', f'{signo}id') if campo != 'id' else (f'{signo}id',)
+
+def _busqueda(termino, tabla):
+    filtro = Q()
+    for campo in tabla.busqueda:
+        filtro |= Q(**{f'{campo}__icontains': termino})
+    # Solo dígitos ASCII (isdigit acepta también '²' y otros que int no lee) y
+    # dentro del rango del id (BigAutoField)
+    if termino.isascii() and termino.isdecimal() and int(termino) <= ID_MAXIMO:
+        filtro |= Q(pk=int(termino))
+    return filtro
+
+
+class Pedido:
+    """Los parámetros de una petición de DataTables, ya validados."""
+
+    def __init__(self, params, tabla):
+        self.tabla = tabla
+        self.draw = _entero(params.get('draw'), 0)
+        self.inicio = max(_entero(params.get('start'), 0), 0)
+        self.longitud = _entero(params.get('length'), LONGITUD_PAGINA)
+        if not 0 < self.longitud <= LONGITUD_MAXIMA:
+            self.longitud = LONGITUD_MAXIMA
+        self.termino = params.get('search[value]', '').strip()
+        self.orden = _orden(params, tabla)
+        self.cursor = params.get('cursor') if self.orden == ORDEN_POR_DEFECTO else None
+        self.direccion = ANTERIOR if params.get('direccion') == ANTERIOR else SIGUIENTE
+
+    def filtrados(self, queryset):
+        """Los registros que coinciden con la búsqueda, o ``None`` si no se buscó nada."""
+        return queryset.filter(_busqueda(self.termino, self.tabla)) if self.termino else None
+
+    def rango(self, queryset):
+        """Las filas de la página pedida por posición (LIMIT/OFFSET)."""
+        return queryset.order_by(*self.orden)[self.inicio:self.inicio + self.longitud]
+
+    def json(self, total, filtrados, filas):
+        siguiente = anterior = None
+        # Cursores de la primera y última fila; solo con el orden por defecto
+        if self.orden == ORDEN_POR_DEFECTO and filas:
+            siguiente = codificar_cursor(filas[-1])
+            anterior = codificar_cursor(filas[0])
+        return JsonResponse({
+            'draw': self.draw,
+            'recordsTotal': total,
+            'recordsFiltered': filtrados,
+            'data': [self.tabla.serializar(obj) for obj in filas],
+            'siguiente': siguiente,
+            'anterior': anterior,
+        })
+
+
+async def arespuesta(request, tabla):
+    """
+    Devuelve la página pedida por DataTables en el formato que espera ``ajax``.
+    """
+    pedido = Pedido(request.GET, tabla)
+    try:
+        queryset = tabla.queryset(request.GET)
+    except FiltroInvalido as e:
+        return HttpResponseBadRequest(str(e))
+    total = filtrados = await queryset.acount()
+    if (busqueda := pedido.filtrados(queryset)) is not None:
+        queryset = busqueda
+        filtrados = await queryset.acount()
+
+    if pedido.cursor:
+        try:
+            filas = (await queryset.apagina(pedido.cursor, pedido.direccion, pedido.longitud)).objetos
+        except CursorInvalido as e:
+            return HttpResponseBadRequest(str(e))
+    else:
+        filas = [obj async for obj in pedido.rango(queryset)]
+    return pedido.json(total, filtrados, filas)
@@ -0,0 +1,29 @@
+"""
+Almacenamiento de los archivos estáticos.
+
+``collectstatic`` copia a ``STATIC_ROOT`` cada archivo con el hash de su
+contenido en el nombre (``js/tablas.3f2a9c1b.js``), corrige las referencias
+entre ellos (``url(...)`` del CSS, mapas de fuentes) y guarda junto a cada uno
+su versión comprimida con brotli y con gzip. ``{% static %}`` devuelve el
+nombre con hash y ``ArchivosEstaticosMiddleware`` (WhiteNoise) los sirve
+comprimidos según ``Accept-Encoding`` y con ``Cache-Control: immutable`` por
+diez años: un cambio en el archivo cambia su nombre y el navegador pide el
+nuevo; mientras tanto no vuelve a pedirlo.
+
+Sin ``collectstatic`` (pruebas, ``runserver``) no hay manifiesto y
+``{% static %}`` devuelve el nombre tal cual, en lugar de fallar. Con el
+manifiesto, un archivo que no está en él (una librería de ``static/vendor/``
+que falta en el repositorio) es un error: ``{% static %}`` lanza
+``ValueError`` y la página que lo enlaza falla, en lugar de mostrarse sin él
+(``EstaticosTests`` muestra las páginas después de ``collectstatic``).
+"""
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+
+class ArchivosConHash(CompressedManifestStaticFilesStorage):
+    """``CompressedManifestStaticFilesStorage`` que funciona aún sin ``collectstatic``."""
+
+    def stored_name(self, name):
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
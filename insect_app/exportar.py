@@ -0,0 +1,170 @@
+"""
+Exportación de los registros a CSV y XLSX para los reportes mensuales.
+
+Las filas se leen por lotes con la paginación por clave
+(``RegistroQuerySet.recorrer_valores``) y se escriben a medida que llegan, así
+que la memoria del worker no depende del número de registros:
+
+* CSV: ``StreamingHttpResponse`` que envía una línea por fila.
+* XLSX: XlsxWriter en modo ``constant_memory`` sobre un archivo temporal, que
+  luego se envía por partes con ``FileResponse``.
+
+Los encabezados de las columnas son los ``labels`` de los formularios de
+``forms.py``.
+
+Se exportan los registros que cumplen los filtros de la URL, los mismos de
+las listas (``desde``, ``hasta``, ``area``, ... ver ``filtros.py``).
+"""
+import csv
+import datetime
+import tempfile
+from decimal import Decimal
+
+import xlsxwriter
+from asgiref.sync import sync_to_async
+from django.http import FileResponse, HttpResponseBadRequest, StreamingHttpResponse
+
+from . import filtros
+from .filtros import FiltroInvalido
+from .forms import TemperaturaForm, HumedadForm, VidaForm, MortalidadPupasForm, RegistroTemperaturaAguaForm
+
+TAMANO_LOTE = 2000
+FORMATOS = ('csv', 'xlsx')
+
+# Encabezados de las columnas que no están en los formularios
+ENCABEZADOS_FIJOS = {
+    'id': 'ID',
+    'fecha_creacion': 'Fecha creación',
+    'fecha_actualizacion': 'Fecha actualización',
+}
+
+
+class Exportacion:
+    """
+    Columnas, filtros y nombre de archivo de la exportación de un modelo.
+    Las columnas siguen el orden del formulario, entre el id y los timestamps.
+    """
+
+    def __init__(self, formulario, nombre, filtros):
+        self.modelo = formulario._meta.model
+        self.nombre = nombre
+        self.filtros = filtros
+        self.campos = ['id', *formulario.base_fields, 'fecha_creacion', 'fecha_actualizacion']
+        etiquetas = formulario._meta.labels or {}
+        self.encabezados = [
+            ENCABEZADOS_FIJOS.get(campo) or etiquetas.get(campo)
+            or str(self.modelo._meta.get_field(campo).verbose_name).capitalize()
+            for campo in self.campos
+        ]
+
+    def queryset(self, params):
+        """Aplica los filtros de la URL. Lanza ``FiltroInvalido`` si alguno no es válido."""
+        return self.modelo.objects.filter(self.filtros.condicion(params))
+
+    def filas(self, queryset):
+        return queryset.recorrer_valores(*self.campos, tamano=TAMANO_LOTE)
+
+    def afilas(self, queryset):
+        return queryset.arecorrer_valores(*self.campos, tamano=TAMANO_LOTE)
+
+    def nombre_archivo(self, formato):
+        return f'{self.nombre}_{datetime.date.today():%Y%m%d}.{formato}'
+
+
+TEMPERATURA = Exportacion(TemperaturaForm, 'temperaturas', filtros.TEMPERATURA)
+HUMEDAD = Exportacion(HumedadForm, 'humedades', filtros.HUMEDAD)
+VIDA = Exportacion(VidaForm, 'vidas', filtros.VIDA)
+MORTALIDAD_PUPAS = Exportacion(MortalidadPupasForm, 'mortalidad_pupas', filtros.MORTALIDAD_PUPAS)
+REGISTRO_TEMPERATURA_AGUA = Exportacion(
+    RegistroTemperaturaAguaForm, 'temperatura_agua', filtros.REGISTRO_TEMPERATURA_AGUA,
+)
+
+
+# --- CSV ---
+
+class _Eco:
+    """Objeto tipo archivo que devuelve lo que se le escribe, para usar csv.writer sin buffer."""
+
+    def write(self, valor):
+        return valor
+
+def _texto_csv(valor):
+    if valor is None:
+        return ''
+    if isinstance(valor, datetime.datetime):
+        return valor.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(valor, datetime.time):
+        return valor.strftime('%H:%M')
+    return str(valor)
+
+async def _alineas_csv(exportacion, queryset):
+    escritor = csv.writer(_Eco())
+    # BOM para que Excel reconozca el UTF-8 (tildes y eñes)
+    yield '\ufeff' + escritor.writerow(exportacion.encabezados)
+    async for fila in exportacion.afilas(queryset):
+        yield escritor.writerow([_texto_csv(valor) for valor in fila])
+
+
+# --- XLSX ---
+
+def _archivo_xlsx(exportacion, queryset):
+    """Escribe el libro en un archivo temporal y lo devuelve listo para leer."""
+    archivo = tempfile.TemporaryFile()
+    libro = xlsxwriter.Workbook(archivo, {'constant_memory': True})
+    hoja = libro.add_worksheet(exportacion.nombre[:31])
+    formatos = {
+        datetime.datetime: libro.add_format({'num_format': 'dd/mm/yyyy hh:mm'}),
+        datetime.date: libro.add_format({'num_format': 'dd/mm/yyyy'}),
+        datetime.time: libro.add_format({'num_format': 'hh:mm'}),
+    }
+    negrita = libro.add_format({'bold': True})
+
+    hoja.write_row(0, 0, exportacion.encabezados, negrita)
+    # En modo constant_memory las filas deben escribirse en orden, una sola vez
+    for numero, fila in enumerate(exportacion.filas(queryset), start=1):
+        for columna, valor in enumerate(fila):
+            if valor is None:
+                continue
+            if isinstance(valor, Decimal):
+                hoja.write_number(numero, columna, float(valor))
+            elif type(valor) in formatos:
+                hoja.write_datetime(numero, columna, valor, formatos[type(valor)])
+            else:
+                hoja.write(numero, columna, valor)
+    libro.close()
+    archivo.seek(0)
+    return archivo
+
+
+def _pedido(request, exportacion):
+    """``(formato, queryset)`` pedidos en la URL. Lanza ``FiltroInvalido`` si alguno no es válido."""
+    formato = request.GET.get('formato', 'csv')
+    if formato not in FORMATOS:
+        raise FiltroInvalido(f"Formato no soportado: {formato}")
+    return formato, exportacion.queryset(request.GET)
+
+
+def _respuesta_csv(lineas, nombre):
+    response = StreamingHttpResponse(lineas, content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{nombre}"'
+    return response
+
+
+async def arespuesta(request, exportacion):
+    """
+    Devuelve la exportación en el formato pedido con ``?formato=csv`` (por
+    defecto) o ``?formato=xlsx``. El CSV se envía desde un generador asíncrono
+    que lee las filas por lotes (``arecorrer_valores``: cada lote de una vez en
+    el hilo del ORM) y el XLSX, que XlsxWriter escribe de forma síncrona, se
+    arma en un hilo aparte.
+    """
+    try:
+        formato, queryset = _pedido(request, exportacion)
+    except FiltroInvalido as e:
+        return HttpResponseBadRequest(str(e))
+
+    nombre = exportacion.nombre_archivo(formato)
+    if formato == 'xlsx':
+        archivo = await sync_to_async(_archivo_xlsx)(exportacion, queryset)
+        return FileResponse(archivo, as_attachment=True, filename=nombre)
+    return _respuesta_csv(_alineas_csv(exportacion, queryset), nombre)
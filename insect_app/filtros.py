@@ -0,0 +1,134 @@
+"""
+Filtros de la URL para las listas, sus endpoints de DataTables y las exportaciones.
+
+Parámetros (todos opcionales; los vacíos se ignoran):
+
+* ``desde`` / ``hasta``: rango de fechas ``AAAA-MM-DD`` (ambos inclusive) sobre
+  ``fecha_creacion``, o sobre ``fecha`` en los registros de temperatura del agua.
+* ``area``: área de trabajo (Temperatura y Humedad).
+* ``especie`` y ``cepa``: en los modelos que tienen esos campos.
+* ``hora``: franja ``HH:MM-HH:MM`` (ambas inclusive; si la primera es mayor,
+  cruza la medianoche) o una hora exacta ``HH:MM`` (Temperatura y Humedad).
+
+Cada modelo solo admite los filtros de ``Filtros`` y cada uno de esos campos
+encabeza un índice del modelo (ver ``Meta.indexes`` e ``IndicesTests``), así
+que la consulta se resuelve con un rango del índice: "últimos 7 días en el
+Área Fase Adulta" lee solo esas filas. Un parámetro que el modelo no admite,
+un valor mal escrito o una ``hora`` sin otro filtro (no tiene índice: sola
+obligaría a recorrer la tabla completa) lanzan ``FiltroInvalido``, que las
+vistas responden con 400. Los demás parámetros de la URL (los de DataTables,
+``formato``, ...) no son filtros y no se tocan.
+"""
+import datetime
+
+from django.db.models import Q
+from django.utils.http import urlencode
+
+from .models import Temperatura, Humedad, Vida, Mortalidad_pupas, RegistroTemperaturaAgua
+
+# Parámetros de filtro de todas las listas; cada modelo admite algunos
+PARAMETROS = ('desde', 'hasta', 'area', 'especie', 'cepa', 'hora')
+
+
+class FiltroInvalido(ValueError):
+    """Un parámetro de filtro de la URL no tiene un valor válido."""
+
+
+class Filtros:
+    """
+    Los filtros que admite la lista de ``modelo``: el rango de fechas sobre
+    ``campo_fecha``, la igualdad en ``campos`` (parámetro de la URL -> campo del
+    modelo) y, si ``hora`` es verdadero, la franja sobre el campo ``hora``.
+    """
+
+    def __init__(self, modelo, campo_fecha='fecha_creacion', campos=None, hora=False):
+        self.modelo = modelo
+        self.campo_fecha = campo_fecha
+        self.campos = campos or {}
+        self.hora = hora
+        self.parametros = {'desde', 'hasta', *self.campos, *(['hora'] if hora else [])}
+
+    def valores(self, params):
+        """Los filtros presentes en ``params`` (parámetro -> texto), sin los vacíos."""
+        valores = {}
+        for parametro in PARAMETROS:
+            valor = params.get(parametro, '').strip()
+            if not valor:
+                continue
+            if parametro not in self.parametros:
+                raise FiltroInvalido(f"Esta lista no admite el filtro '{parametro}'.")
+            valores[parametro] = valor
+        return valores
+
+    def fechas(self, params):
+        """El rango ``(desde, hasta)`` de ``params`` como fechas (``None`` si falta). Lanza ``FiltroInvalido`` si no es válido."""
+        valores = self.valores(params)
+        desde = _fecha(valores, 'desde')
+        hasta = _fecha(valores, 'hasta')
+        if desde and hasta and desde > hasta:
+            raise FiltroInvalido("La fecha 'desde' es posterior a 'hasta'.")
+        return desde, hasta
+
+    def condicion(self, params):
+        """El ``Q`` de los filtros de la URL. Lanza ``FiltroInvalido`` si alguno no es válido."""
+        valores = self.valores(params)
+        condicion = Q()
+        desde, hasta = self.fechas(params)
+        if desde:
+            condicion &= Q(**{f'{self.campo_fecha}__gte': desde})
+        if hasta:
+            # Sobre un DateTimeField se usa "< día siguiente" para no perder las horas del último día
+            if self.campo_fecha == 'fecha_creacion':
+                # Hasta el 9999-12-31 no hay día siguiente ni fecha posterior: no hay límite
+                if hasta < datetime.date.max:
+                    condicion &= Q(**{f'{self.campo_fecha}__lt': hasta + datetime.timedelta(days=1)})
+            else:
+                condicion &= Q(**{f'{self.campo_fecha}__lte': hasta})
+        for parametro, campo in self.campos.items():
+            if parametro in valores:
+                condicion &= Q(**{campo: valores[parametro]})
+        if 'hora' in valores:
+            if len(valores) == 1:
+                raise FiltroInvalido("El filtro 'hora' necesita también un rango de fechas u otro filtro.")
+            condicion &= _franja(valores['hora'])
+        return condicion
+
+    def consulta(self, params):
+        """Los filtros de ``params`` como query string, para los enlaces de la página (exportar, datos)."""
+        return urlencode(self.valores(params))
+
+
+def _fecha(valores, nombre):
+    if nombre not in valores:
+        return None
+    try:
+        return datetime.date.fromisoformat(valores[nombre])
+    except ValueError as e:
+        raise FiltroInvalido(f"El parámetro '{nombre}' debe tener el formato AAAA-MM-DD.") from e
+
+def _hora(texto):
+    try:
+        hora = datetime.time.fromisoformat(texto.strip())
+    except ValueError as e:
+        raise FiltroInvalido("El parámetro 'hora' debe tener el formato HH:MM o HH:MM-HH:MM.") from e
+    # Con USE_TZ = False no se aceptan horas con zona horaria (07:30+05:00)
+    if hora.tzinfo is not None:
+        raise FiltroInvalido("El parámetro 'hora' no admite zona horaria.")
+    return hora
+
+def _franja(valor):
+    if '-' not in valor:
+        return Q(hora=_hora(valor))
+    inicio, _, fin = valor.partition('-')
+    inicio, fin = _hora(inicio), _hora(fin)
+    if inicio <= fin:
+        return Q(hora__gte=inicio, hora__lte=fin)
+    # Franja nocturna (22:00-06:00)
+    return Q(hora__gte=inicio) | Q(hora__lte=fin)
+
+
+TEMPERATURA = Filtros(Temperatura, campos={'area': 'area_de_trabajo'}, hora=True)
+HUMEDAD = Filtros(Humedad, campos={'area': 'area_de_trabajo'}, hora=True)
+VIDA = Filtros(Vida, campos={'especie': 'especie', 'cepa': 'cepa'})
+MORTALIDAD_PUPAS = Filtros(Mortalidad_pupas, campos={'cepa': 'cepa'})
+REGISTRO_TEMPERATURA_AGUA = Filtros(RegistroTemperaturaAgua, campo_fecha='fecha', campos={'especie': 'especie', 'cepa': 'cepa'})
@@ -0,0 +1,401 @@
+"""
+Importación del volcado SQL del sistema anterior (``bd_insecta.sql``).
+
+El volcado se lee por bloques con ``volcado.filas``, sin cargarlo entero en
+memoria: cada fila de un ``INSERT INTO ... VALUES`` se entrega como
+``(tabla, valores)``, con los valores ya tipados (``int``, ``Decimal``, ``str``
+o ``None``), en cuanto se lee. ``Importador`` convierte cada fila al modelo de
+Django que le corresponde (``TABLAS``), la acumula en un lote por modelo y
+guarda cada lote con ``bulk_create`` dentro de una transacción, así que la
+memoria depende del tamaño del lote y no del tamaño del volcado. Los registros
+quedan asociados a su id en el volcado, así que la importación se puede repetir
+o reanudar sin duplicar datos (ver ``Importador``).
+
+Se usa desde ``manage.py importar_volcado``.
+"""
+import hashlib
+from collections import Counter
+from datetime import datetime, time
+from decimal import Decimal, InvalidOperation
+
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+
+from . import cache_listas, resumenes, volcado
+from .models import (
+    Temperatura, Humedad, Vida, Mortalidad_pupas, RegistroTemperaturaAgua, PuntoDeControlImportacion,
+)
+
+TAMANO_LOTE = 1000
+
+# Mapeo de IDs de cepas a nombres de texto
+CEPA_MAPPING = {
+    1: 'Agua Clara',
+    2: 'Bajo Chiquito',
+    3: 'Yaviza',
+    4: 'Quebrada Peña',
+    5: 'Marragantí',
+    6: 'Rockefeller',
+    7: '24 de Diciembre',
+    8: 'New Orleans',
+}
+
+# Mapeo de IDs de especies a nombres de texto
+SPECIE_MAPPING = {
+    1: 'Anopheles albimanus',
+    3: 'Aedes aegypti',
+}
+
+
+# FUNCIÓN AUXILIAR PARA PARSEAR CADENAS DE HORA
+def parse_time_string(time_str):
+    """
+    Convierte una cadena de hora (ej. '7:30 am', '12:00 md', '15:00 pm') a un objeto datetime.time.
+    Intenta varios formatos comunes para mayor robustez. Si falla, devuelve time(0,0).
+    """
+    if time_str is None:
+        return time(0, 0) # Default to midnight if None
+
+    original_time_str = time_str.strip()
+
+    # Las horas numéricas (ej. '93', '29') no son un formato de hora válido
+    if original_time_str.isdigit():
+        return time(0, 0)
+
+    # Manejo específico para 'md' (mediodía) - convertir a '12:00 pm' para un parseo consistente
+    if 'md' in original_time_str.lower():
+        time_str_for_parse = original_time_str.lower().replace(' md', ' pm')
+        try:
+            parsed_time = datetime.strptime(time_str_for_parse, '%I:%M %p').time()
+            return parsed_time
+        except ValueError:
+            pass # Continue with other formats if this fails
+
+    # For AM/PM, the %p directive expects 'AM' or 'PM' (uppercase)
+    time_str_upper_ampm = original_time_str.replace(' am', ' AM').replace(' pm', ' PM').replace('am', 'AM').replace('pm', 'PM')
+
+    formats_to_try = [
+        '%I:%M %p',  # E.g., '7:30 AM', '03:00 PM', '12:00 PM'
+        '%I:%M%p',   # E.g., '7:30AM', '03:00PM' (no space)
+        '%H:%M',     # E.g., '15:00', '07:30' (24-hour format)
+        '%H:%M:%S',  # E.g., '07:30:00' (if seconds are present)
+    ]
+
+    for fmt in formats_to_try:
+        try:
+            str_to_parse = time_str_upper_ampm if '%p' in fmt else original_time_str
+            parsed_time = datetime.strptime(str_to_parse, fmt).time()
+            return parsed_time
+        except ValueError:
+            continue # If a format fails, try the next one
+
+    return time(0, 0) # Fallback to midnight if parsing fails
+
+
+# --- Conversión de las filas del volcado a los campos de los modelos ---
+
+def _fecha_hora(valor):
+    return datetime.strptime(valor, '%Y-%m-%d %H:%M:%S') if valor is not None else timezone.now()
+
+def _fecha(valor):
+    return datetime.strptime(valor, '%Y-%m-%d').date() if valor is not None else None
+
+def _decimal(valor, defecto=None):
+    return Decimal(valor) if valor is not None else defecto
+
+def _entero(valor):
+    return int(valor) if valor is not None else 0
+
+def _texto(valor):
+    return valor if valor is not None else ''
+
+def _nombre(mapeo, valor, desconocido):
+    identificador = int(valor) if valor is not None else None
+    if identificador is None:
+        return ''
+    return mapeo.get(identificador, f"{desconocido} ({identificador})")
+
+def _bandejas_divididas(valor):
+    # En el sistema anterior es texto ('no', 'yes' o un número); un valor no numérico se toma como 0
+    if valor is None or str(valor).lower() == 'no':
+        return 0
+    if str(valor).lower() == 'yes':
+        return 1
+    try:
+        return int(valor)
+    except ValueError:
+        return 0
+
+
+def temperatura(v):
+    # id, temperature, max_temperature, min_temperature, hour, work_area, observations, user_id, created_at, updated_at
+    return {
+        'temperatura': _decimal(v[1], Decimal('0.0')),
+        'max_temperatura': _decimal(v[2], Decimal('0.0')),
+        'min_temperatura': _decimal(v[3], Decimal('0.0')),
+        'hora': parse_time_string(v[4]),
+        'area_de_trabajo': v[5],
+        'obs': _texto(v[6]),
+        'fecha_creacion': _fecha_hora(v[8]),
+        'fecha_actualizacion': _fecha_hora(v[9]),
+    }
+
+def humedad(v):
+    # id, humidity, max_humidity, min_humidity, hour, work_area, observations, user_id, created_at, updated_at
+    return {
+        'humedad': _decimal(v[1], Decimal('0.0')),
+        'max_humedad': _decimal(v[2], Decimal('0.0')),
+        'min_humedad': _decimal(v[3], Decimal('0.0')),
+        'hora': parse_time_string(v[4]),
+        'area_de_trabajo': v[5],
+        'obs': _texto(v[6]),
+        'fecha_creacion': _fecha_hora(v[8]),
+        'fecha_actualizacion': _fecha_hora(v[9]),
+    }
+
+def vida(v):
+    # id, specie_id, strain_id, tray_start_date, pupating_date, number_of_trays_fbw, live_pupae,
+    # am_pm_live_pupae, dead_pupae, am_pm_dead_pupae, total_live_and_dead_pupae, dead_larvae,
+    # am_pm_dead_larvae, divided_trays, tray_time, existing_trays_after_work_is_done,
+    # observations, user_id, created_at, updated_at
+    pupas_vivas = _entero(v[6])
+    pupas_muertas = _entero(v[8])
+    return {
+        'especie': _nombre(SPECIE_MAPPING, v[1], 'Especie Desconocida'),
+        'cepa': _nombre(CEPA_MAPPING, v[2], 'Cepa Desconocida'),
+        'fecha_inicio_bandejas': _fecha(v[3]),
+        'fecha_pupacion': _fecha(v[4]),
+        'numero_bandejas_antes_trabajo': _entero(v[5]),
+        'pupas_vivas': pupas_vivas,
+        'am_pm_pupas_vivas': _texto(v[7]),
+        'pupas_muertas': pupas_muertas,
+        'am_pm_pupas_muertas': _texto(v[9]),
+        # bulk_create no llama a Vida.save(), que es donde se calcula el total
+        'total_pupas_vivas_y_muertas': pupas_vivas + pupas_muertas,
+        'larvas_muertas': _entero(v[11]),
+        'am_pm_larvas_muertas': _texto(v[12]),
+        'bandejas_divididas': _bandejas_divididas(v[13]),
+        'tiempo_bandeja': _texto(v[14]),
+        'bandejas_existentes_despues_trabajo': _entero(v[15]),
+        'obs': _texto(v[16]),
+        'fecha_creacion': _fecha_hora(v[18]),
+        'fecha_actualizacion': _fecha_hora(v[19]),
+    }
+
+def mortalidad_pupas(v):
+    # id, strain_id, quantity, observations, user_id, created_at, updated_at
+    return {
+        'cepa': _nombre(CEPA_MAPPING, v[1], 'Cepa Desconocida'),
+        'cantidad': _entero(v[2]),
+        'obs': _texto(v[3]),
+        'fecha_creacion': _fecha_hora(v[5]),
+        'fecha_actualizacion': _fecha_hora(v[6]),
+    }
+
+def registro_temperatura_agua(v):
+    # id, date, specie_id, strain_id, tray_date, temp_730am, temp_max_730am, temp_min_730am,
+    # temp_1200md, temp_max_1200md, temp_min_1200md, temp_1500pm, temp_max_1500pm,
+    # temp_min_1500pm, observations, user_id, created_at, updated_at
+    return {
+        'fecha': _fecha(v[1]),
+        'especie': _nombre(SPECIE_MAPPING, v[2], 'Especie Desconocida'),
+        'cepa': _nombre(CEPA_MAPPING, v[3], 'Cepa Desconocida'),
+        'fecha_bandeja': _fecha(v[4]),
+        'temp_730am': _decimal(v[5]),
+        'temp_max_730am': _decimal(v[6]),
+        'temp_min_730am': _decimal(v[7]),
+        'temp_1200md': _decimal(v[8]),
+        'temp_max_1200md': _decimal(v[9]),
+        'temp_min_1200md': _decimal(v[10]),
+        'temp_1500pm': _decimal(v[11]),
+        'temp_max_1500pm': _decimal(v[12]),
+        'temp_min_1500pm': _decimal(v[13]),
+        'observaciones': _texto(v[14]),
+    }
+
+
+# Tabla del volcado -> (modelo, conversión de la fila)
+TABLAS = {
+    'environmental_temperatures': (Temperatura, temperatura),
+    'humidities': (Humedad, humedad),
+    'lives': (Vida, vida),
+    'pupa_mortality_in_breeders': (Mortalidad_pupas, mortalidad_pupas),
+    'tray_water_temperatures': (RegistroTemperaturaAgua, registro_temperatura_agua),
+}
+
+ERRORES_DE_CONVERSION = (ValueError, TypeError, IndexError, InvalidOperation)
+
+
+# --- Lectura del volcado ---
+
+def filas(archivo):
+    """Genera ``(tabla, valores)`` por cada fila de las tablas de ``TABLAS`` en el volcado."""
+    return volcado.filas(archivo, tablas=TABLAS)
+
+
+# --- Guardado por lotes ---
+
+def huella(ruta):
+    """sha256 del contenido del volcado, para reconocerlo al reanudar una importación."""
+    with open(ruta, 'rb') as archivo:
+        return hashlib.file_digest(archivo, 'sha256').hexdigest()
+
+def _cambio(actualizacion, guardada):
+    # Sin updated_at en alguno de los dos lados no se puede saber: se actualiza
+    return actualizacion is None or guardada is None or actualizacion > guardada
+
+
+class Importador:
+    """
+    Acumula las filas convertidas por modelo y las guarda por lotes de
+    ``tamano_lote``, una transacción por lote.
+
+    Cada registro guarda el id de su fila en el volcado (``id_anterior``) y el
+    lote se escribe con ``bulk_create(update_conflicts=True)`` sobre esa
+    columna: las filas nuevas se insertan, las que ya estaban se actualizan si
+    su ``updated_at`` es posterior al importado la última vez
+    (``actualizacion_anterior``) y las demás no se tocan. Importar dos veces el
+    mismo volcado no duplica nada.
+
+    Con ``volcado`` (la ``huella`` del archivo) se guarda un
+    ``PuntoDeControlImportacion`` por tabla en la transacción de cada lote, y las
+    filas que una ejecución anterior ya procesó se saltan sin convertirlas.
+    ``inicio`` distingue los puntos de control de cada sentencia cuando el
+    volcado se importa por partes (``importacion_paralela``).
+
+    ``avisar(mensaje)`` recibe cada fila que no se pudo convertir o guardar;
+    los contadores de ``CONTADORES`` cuentan las filas por tabla del volcado.
+    Con ``actualizar_resumenes=False`` no se tocan los resúmenes (quien lo use
+    debe reconstruirlos al final).
+    """
+
+    CONTADORES = ('leidas', 'reanudadas', 'creados', 'actualizados', 'sin_cambios', 'errores')
+
+    def __init__(self, tamano_lote=TAMANO_LOTE, avisar=None, actualizar_resumenes=True, volcado=None, inicio=0):
+        self.tamano_lote = tamano_lote
+        self.avisar = avisar or (lambda mensaje: None)
+        self.actualizar_resumenes = actualizar_resumenes
+        self.volcado = volcado
+        self.inicio = inicio
+        self.pendientes = {tabla: [] for tabla in TABLAS}
+        for nombre in self.CONTADORES:
+            setattr(self, nombre, Counter())
+        # Filas de cada tabla ya procesadas (en esta ejecución o en una anterior)
+        self.puntos = Counter()
+        if volcado is not None:
+            self.puntos.update(dict(
+                PuntoDeControlImportacion.objects.filter(volcado=volcado, inicio=inicio).values_list('tabla', 'filas')
+            ))
+        self.campos = {}
+        for modelo, _ in TABLAS.values():
+            self.campos[modelo] = [
+                campo.name for campo in modelo._meta.concrete_fields
+                if not campo.primary_key and campo.name != 'id_anterior'
+            ]
+
+    def contadores(self):
+        """Los contadores por nombre (ver ``CONTADORES``)."""
+        return {nombre: getattr(self, nombre) for nombre in self.CONTADORES}
+
+    def agregar(self, tabla, valores):
+        """Convierte una fila y guarda el lote de su tabla si ya está lleno."""
+        self.leidas[tabla] += 1
+        if self.leidas[tabla] <= self.puntos[tabla]:
+            self.reanudadas[tabla] += 1
+            return
+        modelo, convertir = TABLAS[tabla]
+        try:
+            objeto = modelo(**convertir(valores))
+            # updated_at es la última columna en todas las tablas del volcado
+            objeto.id_anterior = valores[0]
+            objeto.actualizacion_anterior = _fecha_hora(valores[-1]) if valores[-1] is not None else None
+        except ERRORES_DE_CONVERSION as e:
+            self.errores[tabla] += 1
+            self.avisar(f"Error al convertir la fila de {tabla} (ID SQL: {valores[0]}): {e} - Datos: {valores}")
+            return
+        pendientes = self.pendientes[tabla]
+        pendientes.append((valores[0], objeto))
+        if len(pendientes) >= self.tamano_lote:
+            self.guardar(tabla)
+
+    def guardar(self, tabla):
+        """Guarda el lote pendiente de ``tabla`` y su punto de control."""
+        pendientes = self.pendientes[tabla]
+        if not pendientes and (self.volcado is None or self.leidas[tabla] == self.puntos[tabla]):
+            return
+        self.pendientes[tabla] = []
+        modelo, _ = TABLAS[tabla]
+        try:
+            with transaction.atomic():
+                resultado = self._guardar_lote(modelo, [objeto for _, objeto in pendientes])
+                self._marcar(tabla)
+        except DatabaseError:
+            # Algún valor no cabe en su columna: se repite el lote fila por fila para saber cuál
+            resultado = self._guardar_uno_por_uno(tabla, modelo, pendientes)
+        creados, actualizados, sin_cambios = resultado
+        self.creados[tabla] += creados
+        self.actualizados[tabla] += actualizados
+        self.sin_cambios[tabla] += sin_cambios
+        self.puntos[tabla] = self.leidas[tabla]
+
+    def _guardar_lote(self, modelo, objetos):
+        """Inserta o actualiza ``objetos``; devuelve cuántos se crearon, actualizaron y saltaron."""
+        # Si el volcado repite un id, vale la última fila
+        objetos = {objeto.id_anterior: objeto for objeto in objetos}
+        existentes = {
+            id_anterior: (actualizacion, pk)
+            for id_anterior, actualizacion, pk in modelo.objects.filter(id_anterior__in=objetos)
+            .values_list('id_anterior', 'actualizacion_anterior', 'pk')
+        }
+        nuevos = [objeto for id_anterior, objeto in objetos.items() if id_anterior not in existentes]
+        cambiados = [
+            objeto for id_anterior, objeto in objetos.items()
+            if id_anterior in existentes and _cambio(objeto.actualizacion_anterior, existentes[id_anterior][0])
+        ]
+        con_resumenes = self.actualizar_resumenes and modelo in resumenes.LECTURAS
+        anteriores = []
+        if con_resumenes:
+            anteriores = [resumenes.lectura_guardada(modelo, existentes[obj.id_anterior][1]) for obj in cambiados]
+        if nuevos or cambiados:
+            # MySQL no admite indicar la columna del conflicto (usa ON DUPLICATE KEY UPDATE)
+            con_columna = connection.features.supports_update_conflicts_with_target
+            modelo.objects.bulk_create(
+                nuevos + cambiados,
+                update_conflicts=True,
+                unique_fields=['id_anterior'] if con_columna else None,
+                update_fields=self.campos[modelo],
+            )
+            cache_listas.invalidar(modelo)
+        # bulk_create no envía señales: los resúmenes se actualizan aquí, por grupo
+        if con_resumenes:
+            resumenes.sumar_lote(resumenes.lectura(obj) for obj in nuevos)
+            for anterior, objeto in zip(anteriores, cambiados):
+                resumenes.actualizar(anterior, resumenes.lectura(objeto))
+        return len(nuevos), len(cambiados), len(objetos) - len(nuevos) - len(cambiados)
+
+    def _guardar_uno_por_uno(self, tabla, modelo, pendientes):
+        totales = [0, 0, 0]
+        for id_sql, objeto in pendientes:
+            try:
+                with transaction.atomic():
+                    resultado = self._guardar_lote(modelo, [objeto])
+            except DatabaseError as e:
+                self.errores[tabla] += 1
+                self.avisar(f"Error al insertar la fila de {tabla} (ID SQL: {id_sql}): {e}")
+            else:
+                totales = [total + cantidad for total, cantidad in zip(totales, resultado)]
+        with transaction.atomic():
+            self._marcar(tabla)
+        return totales
+
+    def _marcar(self, tabla):
+        if self.volcado is not None:
+            PuntoDeControlImportacion.objects.update_or_create(
+                volcado=self.volcado, tabla=tabla, inicio=self.inicio,
+                defaults={'filas': self.leidas[tabla]},
+            )
+
+    def terminar(self):
+        """Guarda todo lo que quede pendiente."""
+        for tabla in TABLAS:
+            self.guardar(tabla)
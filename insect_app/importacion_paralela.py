@@ -0,0 +1,147 @@
+"""
+Importación del volcado SQL repartida entre varios procesos.
+
+``secciones`` divide el volcado en rangos de bytes, uno por sentencia
+``INSERT`` de las tablas que se importan. Cada sección se envía a un
+``ProcessPoolExecutor``: el proceso de trabajo la lee, la convierte (``Decimal``,
+``strptime``, ``parse_time_string``) y la guarda con ``importacion.Importador``
+por su propia conexión a la base de datos. El proceso principal solo recorre el
+archivo para buscar dónde empieza cada sentencia y suma los resultados.
+
+Cada sección guarda sus propios puntos de control (``PuntoDeControlImportacion``
+con el byte donde empieza la sentencia), así que una importación en paralelo
+interrumpida se reanuda con el mismo número de procesos o con cualquier otro
+mayor que uno.
+
+Los resúmenes de Temperatura y Humedad no se actualizan desde los procesos de
+trabajo (varios procesos sumando a los mismos grupos se bloquearían entre sí);
+se reconstruyen una vez al final con ``resumenes.reconstruir``.
+
+Este módulo no importa los modelos al cargarse, para que los procesos de trabajo
+puedan importarlo antes de ``django.setup()`` (métodos de arranque ``spawn`` y
+``forkserver``).
+"""
+import codecs
+import re
+from collections import Counter, namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.db import connections
+
+Seccion = namedtuple('Seccion', 'tabla inicio fin')
+
+_INSERT = re.compile(rb'INSERT\s+(?:IGNORE\s+)?INTO\s+`([^`]+)`')
+
+
+def secciones(ruta, tablas):
+    """
+    Rangos ``[inicio, fin)`` de bytes del volcado con cada sentencia INSERT de
+    ``tablas``. Se buscan las líneas que empiezan con ``INSERT``: mysqldump y
+    phpMyAdmin escriben los saltos de línea de las cadenas como ``\\n``, así que
+    una línea del volcado nunca empieza dentro de una cadena.
+    """
+    inicios = []
+    posicion = 0
+    with open(ruta, 'rb') as archivo:
+        for linea in archivo:
+            if linea.startswith(b'INSERT'):
+                insert = _INSERT.match(linea)
+                inicios.append((posicion, insert.group(1).decode() if insert else None))
+            posicion += len(linea)
+    finales = [inicio for inicio, _ in inicios[1:]] + [posicion]
+    return [
+        Seccion(tabla, inicio, fin)
+        for (inicio, tabla), fin in zip(inicios, finales)
+        if tabla in tablas
+    ]
+
+
+class _TextoDeSeccion:
+    """Archivo de texto de solo lectura sobre los bytes ``[inicio, fin)`` de ``archivo``."""
+
+    def __init__(self, archivo, inicio, fin):
+        archivo.seek(inicio)
+        self.archivo = archivo
+        self.restantes = fin - inicio
+        self.decodificador = codecs.getincrementaldecoder('utf-8')()
+
+    def read(self, tamano):
+        while True:
+            datos = self.archivo.read(min(tamano, self.restantes))
+            self.restantes -= len(datos)
+            texto = self.decodificador.decode(datos, final=not datos)
+            # Un bloque puede terminar a mitad de un carácter: se sigue leyendo
+            if texto or not datos:
+                return texto
+
+
+def iniciar_trabajador(base_de_datos):
+    """
+    Prepara un proceso de trabajo: inicializa Django y apunta la conexión a la
+    misma base de datos que el proceso principal (que puede ser la de pruebas).
+    """
+    django.setup()
+    conexion = connections['default']
+    conexion.settings_dict['NAME'] = base_de_datos
+    if conexion.vendor == 'sqlite':
+        # Cada lote lee antes de escribir: con transacciones diferidas, SQLite no
+        # espera al pasar de lectura a escritura y falla con "database is locked"
+        conexion.settings_dict['OPTIONS'] = {**conexion.settings_dict['OPTIONS'], 'transaction_mode': 'IMMEDIATE'}
+
+
+def importar_seccion(ruta, seccion, tamano_lote, volcado=None):
+    """
+    Importa una sección del volcado en el proceso de trabajo, con sus propios
+    puntos de control. Devuelve ``(seccion, contadores, avisos)``.
+    """
+    from .importacion import Importador, filas
+
+    avisos = []
+    importador = Importador(
+        tamano_lote, avisar=avisos.append, actualizar_resumenes=False, volcado=volcado, inicio=seccion.inicio,
+    )
+    with open(ruta, 'rb') as archivo:
+        for tabla, valores in filas(_TextoDeSeccion(archivo, seccion.inicio, seccion.fin)):
+            importador.agregar(tabla, valores)
+    importador.terminar()
+    return seccion, importador.contadores(), avisos
+
+
+def importar(ruta, trabajadores, tamano_lote, al_terminar_seccion=None, volcado=None):
+    """
+    Importa el volcado con ``trabajadores`` procesos y reconstruye los
+    resúmenes. Devuelve ``(contadores, avisos)``, con los contadores de
+    ``Importador`` sumados por tabla. ``al_terminar_seccion(seccion, hechas,
+    total)`` se llama al completar cada sección, en el proceso principal.
+    """
+    from . import resumenes
+    from .importacion import TABLAS, Importador
+
+    pendientes = secciones(ruta, TABLAS)
+    contadores = {nombre: Counter() for nombre in Importador.CONTADORES}
+    avisos = []
+    # Los procesos de trabajo no deben heredar las conexiones abiertas del principal
+    connections.close_all()
+    base_de_datos = connections['default'].settings_dict['NAME']
+    with ProcessPoolExecutor(trabajadores, initializer=iniciar_trabajador, initargs=(base_de_datos,)) as procesos:
+        futuros = [procesos.submit(importar_seccion, ruta, seccion, tamano_lote, volcado) for seccion in pendientes]
+        try:
+            for hechas, futuro in enumerate(as_completed(futuros), start=1):
+                seccion, contadores_seccion, avisos_seccion = futuro.result()
+                for nombre, contador in contadores_seccion.items():
+                    contadores[nombre].update(contador)
+                avisos.extend(avisos_seccion)
+                if al_terminar_seccion:
+                    al_terminar_seccion(seccion, hechas, len(futuros))
+        except BaseException:
+            for futuro in futuros:
+                futuro.cancel()
+            raise
+
+    if any(
+        contadores['creados'][tabla] or contadores['actualizados'][tabla]
+        for tabla, (modelo, _) in TABLAS.items() if modelo in resumenes.LECTURAS
+    ):
+        resumenes.reconstruir()
+    return contadores, avisos
@@ -0,0 +1,199 @@
+"""
+Ingesta masiva de lecturas de Temperatura y Humedad desde los registradores.
+
+Los registradores envían lotes de miles de lecturas en JSON o CSV a
+``/temperaturas/ingesta/`` o ``/humedades/ingesta/``:
+
+* JSON (``Content-Type: application/json``): una lista de objetos, o un objeto
+  con la lista en la clave ``lecturas``.
+* CSV (``Content-Type: text/csv``): la primera fila trae los nombres de los
+  campos.
+
+Cada lectura usa los nombres de campo del formulario (``temperatura``,
+``max_temperatura``, ``min_temperatura``, ``hora``, ``area_de_trabajo``, ``obs``;
+o los de humedad) y, opcionalmente, ``fecha_creacion`` con la fecha y hora de la
+medición; si falta se usa la hora de llegada.
+
+Cada valor se valida con los mismos campos de ``TemperaturaForm`` /
+``HumedadForm`` (``field.clean``), sin construir un formulario por fila. Si hay
+algún error no se guarda nada y se responde 400 con los errores por fila; si
+todo es válido se guardan todas las lecturas con ``bulk_create`` en una sola
+transacción, se actualizan los resúmenes por grupo y se revisan las alertas
+(``alertas.revisar_lote``).
+
+La autenticación es HTTP Basic con un usuario de Django que tenga el permiso
+``add_temperatura`` / ``add_humedad``.
+"""
+import base64
+import binascii
+import csv
+import datetime
+import io
+import json
+
+from django import forms
+from django.contrib.auth import authenticate
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.http import HttpResponse, JsonResponse
+from django.utils import timezone
+
+from . import alertas, cache_listas, resumenes
+from .forms import TemperaturaForm, HumedadForm
+
+TAMANO_LOTE = 2000
+# Se limita por el tamaño del cuerpo (DATA_UPLOAD_MAX_MEMORY_SIZE) y por filas
+MAXIMO_FILAS = 50000
+
+# Misma interpretación de fechas que los formularios de Django
+CAMPO_FECHA = forms.DateTimeField(required=False)
+
+# Conversión directa de los textos ISO (el formato de los registradores). Evita
+# el strptime con cada formato de entrada de la localización, que es lo más caro
+# de validar miles de filas; los textos en otros formatos siguen yendo a clean().
+CONVERSIONES_ISO = {
+    forms.TimeField: datetime.time.fromisoformat,
+    forms.DateTimeField: datetime.datetime.fromisoformat,
+}
+
+
+def _desde_iso(valor, convertir):
+    if valor is None:
+        return valor
+    if not isinstance(valor, str):
+        # Un número u otro valor de JSON ("hora": 730): como texto, clean() lo
+        # rechaza como error de la fila en lugar de fallar con .strip()
+        return str(valor)
+    try:
+        convertido = convertir(valor.strip())
+    except ValueError:
+        return valor
+    # Con USE_TZ = False no se aceptan horas con zona horaria
+    return valor if convertido.tzinfo is not None else convertido
+
+
+class Ingesta:
+    """Campos y modelo de un tipo de lectura, tomados de su formulario."""
+
+    def __init__(self, formulario):
+        self.modelo = formulario._meta.model
+        self.campos = formulario.base_fields
+        self.conversiones = {
+            nombre: CONVERSIONES_ISO[type(campo)]
+            for nombre, campo in self.campos.items() if type(campo) in CONVERSIONES_ISO
+        }
+        self.permiso = f'{self.modelo._meta.app_label}.add_{self.modelo._meta.model_name}'
+
+    def validar(self, filas):
+        """
+        Devuelve ``(objetos, errores)``. ``errores`` es una lista de
+        ``{"fila": i, "errores": {campo: [mensajes]}}`` con ``i`` desde 0.
+        """
+        ahora = timezone.now()
+        campos = self.campos.items()
+        conversiones = self.conversiones.items()
+        convertir_fecha = CONVERSIONES_ISO[forms.DateTimeField]
+        objetos = []
+        errores = []
+        for numero, fila in enumerate(filas):
+            if not isinstance(fila, dict):
+                errores.append({'fila': numero, 'errores': {'__all__': ["Cada lectura debe ser un objeto."]}})
+                continue
+            if conversiones:
+                fila = {**fila, **{nombre: _desde_iso(fila.get(nombre), convertir) for nombre, convertir in conversiones}}
+            limpios = {}
+            errores_fila = {}
+            for nombre, campo in campos:
+                try:
+                    limpios[nombre] = campo.clean(fila.get(nombre))
+                except ValidationError as e:
+                    errores_fila[nombre] = e.messages
+            try:
+                fecha = _desde_iso(fila.get('fecha_creacion'), convertir_fecha)
+                limpios['fecha_creacion'] = CAMPO_FECHA.clean(fecha) or ahora
+            except ValidationError as e:
+                errores_fila['fecha_creacion'] = e.messages
+            if errores_fila:
+                errores.append({'fila': numero, 'errores': errores_fila})
+            elif not errores:
+                # Una vez que hay errores solo se siguen validando filas para informarlos
+                objetos.append(self.modelo(**limpios))
+        return objetos, errores
+
+    def guardar(self, objetos):
+        with transaction.atomic():
+            creados = self.modelo.objects.bulk_create(objetos, batch_size=TAMANO_LOTE)
+            # bulk_create no envía señales: los resúmenes se actualizan aquí, por grupo
+            resumenes.sumar_lote(resumenes.lectura(obj) for obj in creados)
+            alertas.revisar_lote(creados)
+            cache_listas.invalidar(self.modelo)
+        return len(creados)
+
+
+TEMPERATURA = Ingesta(TemperaturaForm)
+HUMEDAD = Ingesta(HumedadForm)
+
+
+class DatosInvalidos(ValueError):
+    """El cuerpo de la petición no se pudo interpretar."""
+
+
+def _leer_filas(request):
+    tipo = request.content_type
+    try:
+        if tipo == 'application/json':
+            datos = json.loads(request.body)
+            if isinstance(datos, dict):
+                datos = datos.get('lecturas')
+            if not isinstance(datos, list):
+                raise DatosInvalidos("Se esperaba una lista de lecturas.")
+            return datos
+        if tipo in ('text/csv', 'text/plain'):
+            texto = request.body.decode(request.encoding or 'utf-8-sig')
+            return [
+                {clave: (valor if valor != '' else None) for clave, valor in fila.items()}
+                for fila in csv.DictReader(io.StringIO(texto))
+            ]
+    except (ValueError, UnicodeDecodeError, csv.Error) as e:
+        raise DatosInvalidos(f"No se pudo leer el cuerpo de la petición: {e}") from e
+    raise DatosInvalidos(f"Tipo de contenido no soportado: {tipo}. Use application/json o text/csv.")
+
+
+def _usuario_basic(request):
+    """Usuario de las credenciales HTTP Basic, o None."""
+    cabecera = request.META.get('HTTP_AUTHORIZATION', '')
+    esquema, _, credenciales = cabecera.partition(' ')
+    if esquema.lower() != 'basic':
+        return None
+    try:
+        usuario, _, clave = base64.b64decode(credenciales).decode().partition(':')
+    except (binascii.Error, UnicodeDecodeError):
+        return None
+    return authenticate(request, username=usuario, password=clave)
+
+
+def respuesta(request, ingesta):
+    """
+    Procesa un lote. Respuestas: 201 con ``{"creados": n}``; 400 con
+    ``{"errores": [...]}``; 401/403 si faltan credenciales o permisos.
+    """
+    usuario = _usuario_basic(request)
+    if usuario is None:
+        response = HttpResponse("Se requieren credenciales válidas.", status=401)
+        response['WWW-Authenticate'] = 'Basic realm="insectario"'
+        return response
+    if not usuario.has_perm(ingesta.permiso):
+        return HttpResponse("El usuario no tiene permiso para cargar estas lecturas.", status=403)
+
+    try:
+        filas = _leer_filas(request)
+    except DatosInvalidos as e:
+        return JsonResponse({'errores': [{'fila': None, 'errores': {'__all__': [str(e)]}}]}, status=400)
+    if len(filas) > MAXIMO_FILAS:
+        mensaje = f"El lote tiene {len(filas)} lecturas; el máximo es {MAXIMO_FILAS}."
+        return JsonResponse({'errores': [{'fila': None, 'errores': {'__all__': [mensaje]}}]}, status=400)
+
+    objetos, errores = ingesta.validar(filas)
+    if errores:
+        return JsonResponse({'creados': 0, 'errores': errores}, status=400)
+    return JsonResponse({'creados': ingesta.guardar(objetos), 'errores': []}, status=201)
@@ -0,0 +1,108 @@
+"""
+Consultas de las listas: solo las columnas que se muestran, sin instancias del modelo.
+
+Las listas (``*_list.html``) y las páginas de DataTables (``datatables.py``)
+muestran unas pocas columnas de cada registro. ``Lista.queryset()`` pide
+exactamente esas con ``values_list`` y devuelve cada fila como una tupla con
+nombre (``__slots__`` vacío, sin ``__dict__``), que se usa en las plantillas y en
+``paginacion.py`` igual que una instancia: ``temp.hora``, ``temp.pk``, ...
+No se leen ``id_anterior`` ni ``actualizacion_anterior``, y del texto de las
+observaciones solo los primeros ``OBSERVACIONES_VISIBLES`` caracteres. Si el
+texto es más largo, la fila lo indica (``observaciones_larga``); la celda
+muestra el comienzo y un enlace "ver más" que lo pide completo a
+``<modelo>_observaciones`` (``aobservaciones``), ver ``static/js/tablas.js``.
+"""
+from collections import namedtuple
+from operator import itemgetter
+
+from django.db.models.functions import Left, Length
+from django.db.models.lookups import GreaterThan
+from django.db.models.query import ValuesListIterable
+from django.http import Http404, JsonResponse
+
+from .models import Temperatura, Humedad, Vida, Mortalidad_pupas, RegistroTemperaturaAgua
+
+# Caracteres de las observaciones que se leen con cada fila
+OBSERVACIONES_VISIBLES = 120
+
+
+class FilasIterable(ValuesListIterable):
+    """Las filas de ``values_list`` como instancias de ``clase`` (una tupla con nombre)."""
+    clase = None
+
+    def __iter__(self):
+        nueva = tuple.__new__
+        clase = self.clase
+        for fila in super().__iter__():
+            yield nueva(clase, fila)
+
+
+def _clase_fila(nombre, campos):
+    base = namedtuple(nombre, campos)
+    return type(nombre, (base,), {'__slots__': (), 'pk': property(itemgetter(campos.index('id')))})
+
+
+class Lista:
+    """
+    Las columnas que muestra la lista de ``modelo``: ``campos`` (en cualquier
+    orden; deben incluir ``id`` y ``fecha_creacion`` para la paginación) y el
+    campo de texto ``observaciones``, del que se lee solo el comienzo.
+    """
+
+    def __init__(self, modelo, campos, observaciones='obs'):
+        self.modelo = modelo
+        self.campos = campos
+        self.observaciones = observaciones
+        self.fila = _clase_fila(
+            f'Fila{modelo.__name__}', [*campos, observaciones, 'observaciones_larga'],
+        )
+        self._iterable = type(f'Filas{modelo.__name__}', (FilasIterable,), {'clase': self.fila})
+
+    def queryset(self):
+        """Todos los registros, como filas de ``self.fila``; admite ``filter``, ``pagina``, ``order_by``, ..."""
+        queryset = self.modelo.objects.annotate(
+            observaciones_inicio=Left(self.observaciones, OBSERVACIONES_VISIBLES),
+            observaciones_larga=GreaterThan(Length(self.observaciones), OBSERVACIONES_VISIBLES),
+        ).values_list(*self.campos, 'observaciones_inicio', 'observaciones_larga')
+        queryset._iterable_class = self._iterable
+        return queryset
+
+
+TEMPERATURA = Lista(Temperatura, [
+    'id', 'temperatura', 'max_temperatura', 'min_temperatura', 'hora',
+    'area_de_trabajo', 'fecha_creacion', 'fecha_actualizacion',
+])
+
+HUMEDAD = Lista(Humedad, [
+    'id', 'humedad', 'max_humedad', 'min_humedad', 'hora',
+    'area_de_trabajo', 'fecha_creacion', 'fecha_actualizacion',
+])
+
+VIDA = Lista(Vida, [
+    'id', 'especie', 'cepa', 'fecha_inicio_bandejas', 'fecha_pupacion',
+    'numero_bandejas_antes_trabajo', 'pupas_vivas', 'pupas_muertas',
+    'total_pupas_vivas_y_muertas', 'larvas_muertas', 'bandejas_divididas',
+    'bandejas_existentes_despues_trabajo', 'am_pm_pupas_vivas',
+    'am_pm_pupas_muertas', 'am_pm_larvas_muertas', 'tiempo_bandeja',
+    'fecha_creacion', 'fecha_actualizacion',
+])
+
+MORTALIDAD_PUPAS = Lista(Mortalidad_pupas, [
+    'id', 'cepa', 'cantidad', 'fecha_creacion', 'fecha_actualizacion',
+])
+
+REGISTRO_TEMPERATURA_AGUA = Lista(RegistroTemperaturaAgua, [
+    'id', 'fecha', 'especie', 'cepa', 'fecha_bandeja',
+    'temp_730am', 'temp_max_730am', 'temp_min_730am',
+    'temp_1200md', 'temp_max_1200md', 'temp_min_1200md',
+    'temp_1500pm', 'temp_max_1500pm', 'temp_min_1500pm',
+    'fecha_creacion', 'fecha_actualizacion',
+], observaciones='observaciones')
+
+
+async def aobservaciones(request, lista, pk):
+    """El texto completo de las observaciones del registro ``pk``, en JSON (el enlace "ver más")."""
+    fila = await lista.modelo.objects.filter(pk=pk).values_list(lista.observaciones).afirst()
+    if fila is None:
+        raise Http404("No existe el registro.")
+    return JsonResponse({'observaciones': fila[0] or ''})
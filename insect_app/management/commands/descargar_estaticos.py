@@ -0,0 +1,81 @@
+"""
+Descarga a ``insect_app/static/vendor/`` las versiones fijadas en ``ARCHIVOS``
+de las librerías de la interfaz, para subirlas al repositorio.
+
+Las páginas no cargan nada de un CDN: Bootstrap, jQuery, DataTables y
+bootstrap-icons se sirven desde ``static/vendor/`` con el resto de los archivos
+estáticos (nombre con hash, comprimidos y con caché permanente; ver
+``insect_app/estaticos.py``), y esos archivos son parte del repositorio: ni la
+imagen de Docker ni ``collectstatic`` descargan nada. Este comando se ejecuta a
+mano, en una copia de trabajo con acceso a internet, al agregar una librería o
+cambiar su versión (con ``--todos``); después se suben los archivos nuevos.
+Los que ya existen no se vuelven a descargar.
+"""
+import urllib.request
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+VENDOR = Path(__file__).resolve().parents[2] / 'static' / 'vendor'
+
+# Ruta en static/vendor/ -> URL de la versión fijada
+ARCHIVOS = {
+    'bootstrap-5.3.0/css/bootstrap.min.css':
+        'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css',
+    'bootstrap-5.3.0/css/bootstrap.min.css.map':
+        'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css.map',
+    'bootstrap-5.3.0/js/bootstrap.min.js':
+        'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.min.js',
+    'bootstrap-5.3.0/js/bootstrap.min.js.map':
+        'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.min.js.map',
+    'popper-2.11.8/popper.min.js':
+        'https://cdn.jsdelivr.net/npm/@popperjs/core@2.11.8/dist/umd/popper.min.js',
+    'popper-2.11.8/popper.min.js.map':
+        'https://cdn.jsdelivr.net/npm/@popperjs/core@2.11.8/dist/umd/popper.min.js.map',
+    'jquery-3.7.1/jquery.min.js':
+        'https://code.jquery.com/jquery-3.7.1.min.js',
+    'datatables-2.3.8/js/dataTables.min.js':
+        'https://cdn.datatables.net/2.3.8/js/dataTables.min.js',
+    'datatables-2.3.8/js/dataTables.bootstrap5.min.js':
+        'https://cdn.datatables.net/2.3.8/js/dataTables.bootstrap5.min.js',
+    'datatables-2.3.8/css/dataTables.bootstrap5.min.css':
+        'https://cdn.datatables.net/2.3.8/css/dataTables.bootstrap5.min.css',
+    'bootstrap-icons-1.11.3/font/bootstrap-icons.css':
+        'https://cdn.jsdelivr.net/npm/bootstrap-icons@1.11.3/font/bootstrap-icons.css',
+    'bootstrap-icons-1.11.3/font/fonts/bootstrap-icons.woff2':
+        'https://cdn.jsdelivr.net/npm/bootstrap-icons@1.11.3/font/fonts/bootstrap-icons.woff2',
+    'bootstrap-icons-1.11.3/font/fonts/bootstrap-icons.woff':
+        'https://cdn.jsdelivr.net/npm/bootstrap-icons@1.11.3/font/fonts/bootstrap-icons.woff',
+}
+
+
+class Command(BaseCommand):
+    help = "Descarga a static/vendor/ las librerías de la interfaz (Bootstrap, DataTables, ...) que falten."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--todos', action='store_true',
+            help="Descarga también los archivos que ya existen (para actualizarlos).",
+        )
+        parser.add_argument('--espera', type=float, default=30, help="Segundos de espera por archivo.")
+
+    def handle(self, *args, **options):
+        descargados = 0
+        for ruta, url in ARCHIVOS.items():
+            destino = VENDOR / ruta
+            if destino.exists() and not options['todos']:
+                continue
+            try:
+                with urllib.request.urlopen(url, timeout=options['espera']) as respuesta:
+                    contenido = respuesta.read()
+            except OSError as e:
+                raise CommandError(f"No se pudo descargar {url}: {e}")
+            destino.parent.mkdir(parents=True, exist_ok=True)
+            destino.write_bytes(contenido)
+            descargados += 1
+            self.stdout.write(f"{ruta} ({len(contenido):,} bytes)")
+        self.stdout.write(self.style.SUCCESS(
+            f"{descargados} archivos descargados; {len(ARCHIVOS) - descargados} ya estaban en static/vendor/."
+        ))
+        if descargados:
+            self.stdout.write("Agregue los archivos nuevos de insect_app/static/vendor/ al repositorio.")
@@ -0,0 +1,38 @@
+"""
+Entrega por correo las alertas pendientes de la bandeja de salida (``SalidaAlerta``).
+
+Se ejecuta aparte de los workers web, una vez (cron) o con ``--continuo`` como
+un proceso más (servicio ``alertas`` de docker-compose.yml, que se activa con
+``--profile alertas`` y ``ALERTAS_DESTINATARIOS``). Usa un solo proceso: dos a
+la vez podrían enviar las mismas alertas.
+"""
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from insect_app import alertas
+
+
+class Command(BaseCommand):
+    help = "Envía por correo las alertas pendientes a ALERTAS_DESTINATARIOS."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=200, help="Alertas por correo.")
+        parser.add_argument('--continuo', action='store_true', help="Sigue revisando la bandeja de salida.")
+        parser.add_argument('--intervalo', type=float, default=30, help="Segundos entre revisiones con --continuo.")
+
+    def handle(self, *args, **options):
+        if not settings.ALERTAS_DESTINATARIOS:
+            raise CommandError("No hay destinatarios: configure ALERTAS_DESTINATARIOS.")
+        if options['lote'] < 1:
+            raise CommandError("--lote debe ser mayor que cero.")
+        while True:
+            entregadas, fallidas = alertas.entregar(options['lote'])
+            if entregadas or fallidas:
+                self.stdout.write(f"{entregadas} alertas entregadas, {fallidas} con error.")
+            if not options['continuo']:
+                break
+            # Sin esperar mientras quede una bandeja llena por vaciar
+            if entregadas < options['lote']:
+                time.sleep(options['intervalo'])
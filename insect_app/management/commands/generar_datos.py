@@ -0,0 +1,74 @@
+import datetime
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from insect_app import cache_listas, resumenes
+from insect_app.sinteticos import Generador, dias_habiles, insertar
+
+TAMANO_LOTE = 5000
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera registros sintéticos de los cinco modelos para pruebas de escala, con el "
+        "ritmo diario del volcado (lecturas a las 7:30, 12:00 y 15:00 en las dos áreas de "
+        "trabajo) y las especies y cepas de los formularios. La misma semilla produce los "
+        "mismos datos. Los registros se agregan a los que ya existan."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=3650, help="Días a generar (por defecto 3650, diez años).")
+        parser.add_argument(
+            '--desde', type=datetime.date.fromisoformat, default=datetime.date(2015, 1, 1),
+            help="Primer día, AAAA-MM-DD (por defecto 2015-01-01).",
+        )
+        parser.add_argument(
+            '--sitios', type=int, default=1,
+            help="Sitios que registran cada día; multiplica las filas (por defecto 1).",
+        )
+        parser.add_argument('--semilla', type=int, default=1928, help="Semilla de los números aleatorios.")
+        parser.add_argument(
+            '--lote', type=int, default=TAMANO_LOTE,
+            help=f"Filas por INSERT (executemany) (por defecto {TAMANO_LOTE}).",
+        )
+        parser.add_argument(
+            '--dias-por-bloque', type=int, default=60,
+            help="Días que se generan y se guardan en cada transacción (por defecto 60).",
+        )
+
+    def handle(self, *args, **options):
+        for opcion in ('dias', 'sitios', 'lote', 'dias_por_bloque'):
+            if options[opcion] < 1:
+                raise CommandError(f"--{opcion.replace('_', '-')} debe ser mayor que cero.")
+
+        inicio = time.perf_counter()
+        generador = Generador(options['semilla'], options['sitios'])
+        fechas = dias_habiles(options['desde'], options['dias'])
+        creados = Counter()
+        for desde in range(0, len(fechas), options['dias_por_bloque']):
+            bloque = generador.bloque(fechas[desde:desde + options['dias_por_bloque']])
+            with transaction.atomic():
+                for filas in bloque:
+                    insertar(filas, options['lote'])
+                    creados[filas.modelo] += len(filas.filas)
+            if options['verbosity'] > 1:
+                self.stdout.write(f"{fechas[min(desde + options['dias_por_bloque'], len(fechas)) - 1]}: {sum(creados.values())} filas")
+
+        segundos_insercion = time.perf_counter() - inicio
+
+        # Las filas se insertan sin pasar por las señales: resúmenes y caché de las listas
+        resumenes.reconstruir()
+        for modelo in creados:
+            cache_listas.invalidar(modelo)
+
+        segundos = time.perf_counter() - inicio
+        for modelo, cantidad in creados.items():
+            self.stdout.write(f"{modelo.__name__}: {cantidad} registros.")
+        total = sum(creados.values())
+        self.stdout.write(self.style.SUCCESS(
+            f"Se generaron {total} registros en {segundos_insercion:.1f} s ({total / segundos_insercion * 60:,.0f} filas/min) "
+            f"y se reconstruyeron los resúmenes en {segundos - segundos_insercion:.1f} s."
+        ))
@@ -0,0 +1,104 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from insect_app import importacion_paralela
+from insect_app.importacion import TABLAS, TAMANO_LOTE, Importador, filas, huella
+from insect_app.models import PuntoDeControlImportacion
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa los registros del volcado SQL del sistema anterior (bd_insecta.sql) "
+        "leyéndolo por partes y guardándolo por lotes. Las filas ya importadas se "
+        "actualizan si cambiaron (según su updated_at) en lugar de duplicarse, y una "
+        "importación interrumpida continúa desde el último lote guardado."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo', nargs='?', default='bd_insecta.sql', help="Ruta del volcado SQL.")
+        parser.add_argument(
+            '--lote', type=int, default=TAMANO_LOTE,
+            help=f"Filas por bulk_create y por transacción (por defecto {TAMANO_LOTE}).",
+        )
+        parser.add_argument(
+            '--progreso', type=int, default=10000,
+            help="Informa el avance cada este número de filas leídas (0 para no informar).",
+        )
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help=(
+                "Procesos que leen, convierten y guardan el volcado en paralelo, una sentencia "
+                "INSERT por vez y cada uno con su conexión (por defecto 1, sin procesos aparte)."
+            ),
+        )
+        parser.add_argument(
+            '--reiniciar', action='store_true',
+            help="Descarta los puntos de control de este volcado y lo vuelve a procesar completo.",
+        )
+
+    def handle(self, *args, **options):
+        if options['lote'] < 1:
+            raise CommandError("--lote debe ser mayor que cero.")
+        if options['workers'] < 1:
+            raise CommandError("--workers debe ser mayor que cero.")
+
+        inicio = time.perf_counter()
+        try:
+            volcado = huella(options['archivo'])
+        except OSError as e:
+            raise CommandError(f"No se pudo abrir el volcado: {e}") from e
+        if options['reiniciar']:
+            PuntoDeControlImportacion.objects.filter(volcado=volcado).delete()
+        if options['workers'] == 1:
+            contadores = self.importar(options['archivo'], options['lote'], options['progreso'], inicio, volcado)
+        else:
+            contadores = self.importar_en_paralelo(options['archivo'], options['lote'], options['workers'], volcado)
+        segundos = time.perf_counter() - inicio
+        leidas = sum(contadores['leidas'].values())
+        errores = contadores['errores']
+
+        reanudadas = sum(contadores['reanudadas'].values())
+        if reanudadas:
+            self.stdout.write(
+                f"Se saltaron {reanudadas} filas ya procesadas en una ejecución anterior "
+                "(--reiniciar para volver a procesarlas)."
+            )
+        for tabla, (modelo, _) in TABLAS.items():
+            self.stdout.write(
+                f"{modelo.__name__}: {contadores['creados'][tabla]} registros insertados, "
+                f"{contadores['actualizados'][tabla]} actualizados, "
+                f"{contadores['sin_cambios'][tabla]} sin cambios, {errores[tabla]} errores."
+            )
+        estilo = self.style.WARNING if sum(errores.values()) else self.style.SUCCESS
+        self.stdout.write(estilo(
+            f"Se leyeron {leidas} filas en {segundos:.1f} s ({leidas / segundos:,.0f} filas/s)."
+        ))
+
+    def importar(self, ruta, tamano_lote, cada, inicio, volcado):
+        importador = Importador(tamano_lote, avisar=self.stderr.write, volcado=volcado)
+        leidas = 0
+        try:
+            archivo = open(ruta, encoding='utf-8')
+        except OSError as e:
+            raise CommandError(f"No se pudo abrir el volcado: {e}") from e
+        with archivo:
+            for tabla, valores in filas(archivo):
+                importador.agregar(tabla, valores)
+                leidas += 1
+                if cada and leidas % cada == 0:
+                    self.stdout.write(f"  {leidas} filas leídas, {leidas / (time.perf_counter() - inicio):,.0f} filas/s")
+        importador.terminar()
+        return importador.contadores()
+
+    def importar_en_paralelo(self, ruta, tamano_lote, trabajadores, volcado):
+        def informar(seccion, hechas, total):
+            self.stdout.write(f"  {hechas}/{total} sentencias importadas ({seccion.tabla})")
+
+        try:
+            contadores, avisos = importacion_paralela.importar(ruta, trabajadores, tamano_lote, informar, volcado)
+        except OSError as e:
+            raise CommandError(f"No se pudo abrir el volcado: {e}") from e
+        for aviso in avisos:
+            self.stderr.write(aviso)
+        return contadores
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from insect_app import resumenes
+from insect_app.models import ResumenDiario, ResumenHorario
+
+
+class Command(BaseCommand):
+    help = "Recalcula desde cero los resúmenes diarios y horarios de Temperatura y Humedad."
+
+    def handle(self, *args, **options):
+        creados = resumenes.reconstruir()
+        self.stdout.write(self.style.SUCCESS(
+            f"Se crearon {creados[ResumenDiario]} resúmenes diarios "
+            f"y {creados[ResumenHorario]} resúmenes horarios."
+        ))
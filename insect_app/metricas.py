@@ -0,0 +1,240 @@
+"""
+Métricas de las peticiones en formato Prometheus (``/metrics``).
+
+``MetricasMiddleware`` mide cada petición y la registra con el nombre de su
+vista (``request.resolver_match.view_name``) y su método (los que no son
+estándar, como ``FOOBAR``, cuentan como ``otro``: no crean una serie nueva):
+
+* duración total de la petición
+* número de consultas a la base de datos y tiempo que tomaron (cada conexión,
+  al abrirse, recibe una envoltura de ``execute`` que las suma a la medición
+  de la petición en curso; ver ``medir_conexion``)
+* tamaño de la respuesta (en las respuestas por partes, como las exportaciones,
+  se cuenta a medida que se envía)
+* tiempo de render de las plantillas (con el motor ``PlantillasDjango``, ver
+  ``TEMPLATES`` en settings.py)
+
+y el estado del pool de conexiones a la base de datos (``conexiones.py``).
+
+Gunicorn corre varios procesos: si la variable de entorno
+``PROMETHEUS_MULTIPROC_DIR`` apunta a un directorio, cada proceso escribe ahí
+sus valores y ``/metrics`` los suma todos (modo multiproceso de
+``prometheus_client``; gunicorn define la variable y vacía el directorio al
+arrancar, ver ``gunicorn.conf.py``). Sin la variable (``runserver``, los
+comandos de manage.py) se usa el registro del proceso.
+
+``/metrics`` responde a Prometheus con ``Authorization: Bearer <METRICAS_TOKEN>``
+o a un usuario ``is_staff`` con sesión iniciada.
+"""
+import contextvars
+import hmac
+import os
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpResponse
+from django.template.backends.django import DjangoTemplates
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client import multiprocess
+
+ETIQUETAS = ['vista', 'metodo']
+# Métodos que se etiquetan por su nombre; cualquier otro (lo envía el cliente) es 'otro'
+METODOS = frozenset({'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS', 'TRACE', 'CONNECT'})
+
+DURACION = Histogram(
+    'insectario_peticion_segundos', "Duración de las peticiones.", ETIQUETAS,
+)
+RESPUESTAS = Counter(
+    'insectario_respuestas', "Respuestas por código de estado.", ETIQUETAS + ['estado'],
+)
+CONSULTAS = Histogram(
+    'insectario_peticion_consultas', "Consultas a la base de datos por petición.", ETIQUETAS,
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 200, 500),
+)
+TIEMPO_BD = Histogram(
+    'insectario_peticion_bd_segundos', "Tiempo en la base de datos por petición.", ETIQUETAS,
+)
+TAMANO = Histogram(
+    'insectario_respuesta_bytes', "Tamaño del cuerpo de las respuestas.", ETIQUETAS,
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864),
+)
+PLANTILLAS = Histogram(
+    'insectario_plantilla_segundos', "Tiempo de render de las plantillas por petición.", ETIQUETAS,
+)
+CACHE_LISTAS = Counter(
+    'insectario_cache_listas', "Páginas de lista servidas desde la caché (acierto) o generadas (fallo).",
+    ['modelo', 'resultado'],
+)
+
+BD_CONEXIONES = Gauge(
+    'insectario_bd_conexiones', "Conexiones del pool en uso y libres.", ['estado'], multiprocess_mode='livesum',
+)
+BD_ESPERA = Histogram(
+    'insectario_bd_espera_segundos', "Espera por una conexión del pool.",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10),
+)
+BD_EVENTOS = Counter(
+    'insectario_bd_conexiones_eventos', "Conexiones del pool creadas, reutilizadas, descartadas y esperas agotadas.",
+    ['evento'],
+)
+
+# Medición de la petición en curso (la leen las consultas y las plantillas). Es
+# una variable de contexto: sync_to_async la pasa al hilo donde corre el ORM de
+# las vistas asíncronas, que usa sus propias conexiones
+_actual = contextvars.ContextVar('medicion', default=None)
+
+
+class _Medicion:
+    def __init__(self):
+        self.consultas = 0
+        self.bd = 0.0
+        self.plantillas = 0.0
+
+    def consulta(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.consultas += 1
+            self.bd += time.perf_counter() - inicio
+
+
+class MetricasMiddleware:
+    """Registra las métricas de cada petición (debe ir primero en ``MIDDLEWARE``)."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.asincrono = iscoroutinefunction(get_response)
+        if self.asincrono:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.asincrono:
+            return self.__acall__(request)
+        medicion = _Medicion()
+        token = _actual.set(medicion)
+        inicio = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _actual.reset(token)
+        return self.registrar(request, response, medicion, time.perf_counter() - inicio)
+
+    async def __acall__(self, request):
+        medicion = _Medicion()
+        token = _actual.set(medicion)
+        inicio = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _actual.reset(token)
+        return self.registrar(request, response, medicion, time.perf_counter() - inicio)
+
+    def registrar(self, request, response, medicion, duracion):
+        coincidencia = request.resolver_match
+        metodo = request.method if request.method in METODOS else 'otro'
+        etiquetas = (coincidencia.view_name if coincidencia else 'sin_ruta', metodo)
+        DURACION.labels(*etiquetas).observe(duracion)
+        RESPUESTAS.labels(*etiquetas, response.status_code).inc()
+        CONSULTAS.labels(*etiquetas).observe(medicion.consultas)
+        TIEMPO_BD.labels(*etiquetas).observe(medicion.bd)
+        PLANTILLAS.labels(*etiquetas).observe(medicion.plantillas)
+        if not response.streaming:
+            TAMANO.labels(*etiquetas).observe(len(response.content))
+        elif response.is_async:
+            response.streaming_content = _acontar_bytes(response.streaming_content, TAMANO.labels(*etiquetas))
+        else:
+            response.streaming_content = _contar_bytes(response.streaming_content, TAMANO.labels(*etiquetas))
+        return response
+
+
+def _consulta(execute, sql, params, many, context):
+    medicion = _actual.get()
+    if medicion is None:
+        return execute(sql, params, many, context)
+    return medicion.consulta(execute, sql, params, many, context)
+
+def medir_conexion(conexion):
+    """
+    Agrega a ``conexion`` (una sola vez) la envoltura que cuenta sus consultas en
+    la petición en curso. Se llama al abrirse cada conexión (señal
+    ``connection_created``), en el hilo que la va a usar.
+    """
+    if _consulta not in conexion.execute_wrappers:
+        conexion.execute_wrappers.append(_consulta)
+
+
+def _contar_bytes(partes, histograma):
+    total = 0
+    try:
+        for parte in partes:
+            total += len(parte)
+            yield parte
+    finally:
+        histograma.observe(total)
+
+
+async def _acontar_bytes(partes, histograma):
+    total = 0
+    try:
+        async for parte in partes:
+            total += len(parte)
+            yield parte
+    finally:
+        histograma.observe(total)
+
+
+# --- Tiempo de render de las plantillas ---
+
+class PlantillasDjango(DjangoTemplates):
+    """El motor de plantillas de Django, midiendo el tiempo de cada render para las métricas."""
+
+    def from_string(self, template_code):
+        return _PlantillaMedida(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return _PlantillaMedida(super().get_template(template_name))
+
+
+class _PlantillaMedida:
+    def __init__(self, plantilla):
+        self.plantilla = plantilla
+
+    def __getattr__(self, nombre):
+        return getattr(self.plantilla, nombre)
+
+    def render(self, context=None, request=None):
+        inicio = time.perf_counter()
+        try:
+            return self.plantilla.render(context, request)
+        finally:
+            medicion = _actual.get()
+            if medicion is not None:
+                medicion.plantillas += time.perf_counter() - inicio
+
+
+# --- Endpoint ---
+
+def _autorizado(request):
+    token = getattr(settings, 'METRICAS_TOKEN', '')
+    esquema, _, credencial = request.META.get('HTTP_AUTHORIZATION', '').partition(' ')
+    if token and esquema.lower() == 'bearer' and hmac.compare_digest(credencial.encode(), token.encode()):
+        return True
+    return request.user.is_authenticated and request.user.is_staff
+
+
+def respuesta(request):
+    """Las métricas en el formato de texto de Prometheus; 401 sin credenciales válidas."""
+    if not _autorizado(request):
+        response = HttpResponse("Se requieren credenciales válidas.", status=401)
+        response['WWW-Authenticate'] = 'Bearer realm="insectario"'
+        return response
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registro = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registro)
+    else:
+        registro = REGISTRY
+    return HttpResponse(generate_latest(registro), content_type=CONTENT_TYPE_LATEST)
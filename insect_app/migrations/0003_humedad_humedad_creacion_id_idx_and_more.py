@@ -0,0 +1,49 @@
+# Generated by Django 5.2.4 on 2026-10-18 06:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('insect_app', '0002_alter_humedad_fecha_actualizacion_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='humedad',
+            index=models.Index(fields=['fecha_creacion', 'id'], name='humedad_creacion_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='humedad',
+            index=models.Index(fields=['area_de_trabajo', 'fecha_creacion'], name='humedad_area_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mortalidad_pupas',
+            index=models.Index(fields=['fecha_creacion', 'id'], name='mortalidad_creacion_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mortalidad_pupas',
+            index=models.Index(fields=['cepa', 'fecha_creacion'], name='mortalidad_cepa_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='registrotemperaturaagua',
+            index=models.Index(fields=['fecha_creacion', 'id'], name='tempagua_creacion_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='registrotemperaturaagua',
+            index=models.Index(fields=['especie', 'cepa', 'fecha'], name='tempagua_especie_cepa_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='temperatura',
+            index=models.Index(fields=['fecha_creacion', 'id'], name='temperatura_creacion_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='temperatura',
+            index=models.Index(fields=['area_de_trabajo', 'fecha_creacion'], name='temperatura_area_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vida',
+            index=models.Index(fields=['fecha_creacion', 'id'], name='vida_creacion_id_idx'),
+        ),
+    ]
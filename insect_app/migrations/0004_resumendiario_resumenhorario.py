@@ -0,0 +1,50 @@
+# Generated by Django 5.2.4 on 2026-10-18 06:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('insect_app', '0003_humedad_humedad_creacion_id_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenDiario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('variable', models.CharField(choices=[('temperatura', 'Temperatura'), ('humedad', 'Humedad')], max_length=20)),
+                ('area_de_trabajo', models.CharField(max_length=20)),
+                ('dia', models.DateField()),
+                ('cantidad', models.PositiveIntegerField(default=0)),
+                ('suma', models.DecimalField(decimal_places=1, default=0, max_digits=12)),
+                ('minimo', models.DecimalField(decimal_places=1, max_digits=5, null=True)),
+                ('maximo', models.DecimalField(decimal_places=1, max_digits=5, null=True)),
+            ],
+            options={
+                'verbose_name': 'Resumen Diario',
+                'verbose_name_plural': 'Resúmenes Diarios',
+                'constraints': [models.UniqueConstraint(fields=('variable', 'area_de_trabajo', 'dia'), name='resumen_diario_unico')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ResumenHorario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('variable', models.CharField(choices=[('temperatura', 'Temperatura'), ('humedad', 'Humedad')], max_length=20)),
+                ('area_de_trabajo', models.CharField(max_length=20)),
+                ('dia', models.DateField()),
+                ('cantidad', models.PositiveIntegerField(default=0)),
+                ('suma', models.DecimalField(decimal_places=1, default=0, max_digits=12)),
+                ('minimo', models.DecimalField(decimal_places=1, max_digits=5, null=True)),
+                ('maximo', models.DecimalField(decimal_places=1, max_digits=5, null=True)),
+                ('hora', models.PositiveSmallIntegerField()),
+            ],
+            options={
+                'verbose_name': 'Resumen Horario',
+                'verbose_name_plural': 'Resúmenes Horarios',
+                'constraints': [models.UniqueConstraint(fields=('variable', 'area_de_trabajo', 'dia', 'hora'), name='resumen_horario_unico')],
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.4 on 2026-10-18 06:58
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('insect_app', '0004_resumendiario_resumenhorario'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='humedad',
+            name='fecha_creacion',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='mortalidad_pupas',
+            name='fecha_creacion',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='registrotemperaturaagua',
+            name='fecha_creacion',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='temperatura',
+            name='fecha_creacion',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='vida',
+            name='fecha_creacion',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 5.2.4 on 2026-10-18 07:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('insect_app', '0005_alter_humedad_fecha_creacion_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='humedad',
+            name='actualizacion_anterior',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='humedad',
+            name='id_anterior',
+            field=models.PositiveBigIntegerField(blank=True, editable=False, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='mortalidad_pupas',
+            name='actualizacion_anterior',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='mortalidad_pupas',
+            name='id_anterior',
+            field=models.PositiveBigIntegerField(blank=True, editable=False, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='registrotemperaturaagua',
+            name='actualizacion_anterior',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='registrotemperaturaagua',
+            name='id_anterior',
+            field=models.PositiveBigIntegerField(blank=True, editable=False, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='temperatura',
+            name='actualizacion_anterior',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='temperatura',
+            name='id_anterior',
+            field=models.PositiveBigIntegerField(blank=True, editable=False, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='vida',
+            name='actualizacion_anterior',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='vida',
+            name='id_anterior',
+            field=models.PositiveBigIntegerField(blank=True, editable=False, null=True, unique=True),
+        ),
+        migrations.CreateModel(
+            name='PuntoDeControlImportacion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('volcado', models.CharField(max_length=64)),
+                ('tabla', models.CharField(max_length=64)),
+                ('inicio', models.PositiveBigIntegerField(default=0)),
+                ('filas', models.PositiveBigIntegerField(default=0)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Punto de Control de Importación',
+                'verbose_name_plural': 'Puntos de Control de Importación',
+                'constraints': [models.UniqueConstraint(fields=('volcado', 'tabla', 'inicio'), name='punto_de_control_unico')],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.4 on 2026-10-18 07:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('insect_app', '0006_importacion_reanudable'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='humedad',
+            index=models.Index(fields=['fecha_actualizacion'], name='humedad_actualizacion_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mortalidad_pupas',
+            index=models.Index(fields=['fecha_actualizacion'], name='mortalidad_actualizacion_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='registrotemperaturaagua',
+            index=models.Index(fields=['fecha_actualizacion'], name='tempagua_actualizacion_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='temperatura',
+            index=models.Index(fields=['fecha_actualizacion'], name='temperatura_actualizacion_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vida',
+            index=models.Index(fields=['fecha_actualizacion'], name='vida_actualizacion_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('insect_app', '0007_humedad_humedad_actualizacion_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='registrotemperaturaagua',
+            index=models.Index(fields=['cepa', 'fecha'], name='tempagua_cepa_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='registrotemperaturaagua',
+            index=models.Index(fields=['fecha'], name='tempagua_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vida',
+            index=models.Index(fields=['especie', 'cepa', 'fecha_creacion'], name='vida_especie_cepa_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vida',
+            index=models.Index(fields=['cepa', 'fecha_creacion'], name='vida_cepa_fecha_idx'),
+        ),
+    ]
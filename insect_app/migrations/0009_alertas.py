@@ -0,0 +1,73 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:43
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('insect_app', '0008_indices_filtros'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReglaAlerta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('variable', models.CharField(choices=[('temperatura', 'Temperatura'), ('humedad', 'Humedad'), ('temperatura_agua', 'Temperatura del agua')], max_length=20)),
+                ('area_de_trabajo', models.CharField(blank=True, max_length=20)),
+                ('especie', models.CharField(blank=True, max_length=50)),
+                ('cepa', models.CharField(blank=True, max_length=50)),
+                ('franja', models.CharField(blank=True, choices=[('730am', '7:30 AM'), ('1200md', '12:00 MD'), ('1500pm', '15:00 PM')], max_length=6)),
+                ('minimo', models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True)),
+                ('maximo', models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True)),
+                ('activa', models.BooleanField(default=True)),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Regla de Alerta',
+                'verbose_name_plural': 'Reglas de Alerta',
+            },
+        ),
+        migrations.CreateModel(
+            name='Alerta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('registro', models.PositiveBigIntegerField()),
+                ('franja', models.CharField(blank=True, max_length=6)),
+                ('valor', models.DecimalField(decimal_places=2, max_digits=5)),
+                ('limite', models.DecimalField(decimal_places=2, max_digits=5)),
+                ('fecha', models.DateTimeField(default=django.utils.timezone.now)),
+                ('regla', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='alertas', to='insect_app.reglaalerta')),
+            ],
+            options={
+                'verbose_name': 'Alerta',
+                'verbose_name_plural': 'Alertas',
+            },
+        ),
+        migrations.CreateModel(
+            name='SalidaAlerta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('intentos', models.PositiveSmallIntegerField(default=0)),
+                ('entregada', models.DateTimeField(blank=True, null=True)),
+                ('error', models.TextField(blank=True)),
+                ('alerta', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='salida', to='insect_app.alerta')),
+            ],
+            options={
+                'verbose_name': 'Salida de Alerta',
+                'verbose_name_plural': 'Salidas de Alerta',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='alerta',
+            constraint=models.UniqueConstraint(fields=('regla', 'registro', 'franja'), name='alerta_unica'),
+        ),
+        migrations.AddIndex(
+            model_name='salidaalerta',
+            index=models.Index(fields=['entregada', 'id'], name='salida_pendiente_idx'),
+        ),
+    ]
@@ -1,5 +1,8 @@
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import User # Importa el modelo de usuario predeterminado de Django
+from .paginacion import RegistroQuerySet # Paginación por clave sobre (fecha_creacion, id)
 # Create your models here.    
 
 class Temperatura(models.Model):
@@ -11,9 +14,27 @@ class Temperatura(models.Model):
     obs = models.TextField(blank=True)
 
     # Añadimos los campos de fecha de creación y actualización
-    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    # (fecha_creacion usa default y no auto_now_add para que las cargas masivas puedan conservar la fecha de la lectura)
+    fecha_creacion = models.DateTimeField(default=timezone.now, editable=False)
     fecha_actualizacion = models.DateTimeField(auto_now=True)
 
+    # Id y updated_at de la fila en el sistema anterior, solo en los registros importados
+    # de bd_insecta.sql (fecha_actualizacion usa auto_now y no conserva la fecha del volcado)
+    id_anterior = models.PositiveBigIntegerField(null=True, blank=True, unique=True, editable=False)
+    actualizacion_anterior = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = RegistroQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Listas ordenadas por fecha de creación y paginación por clave
+            models.Index(fields=['fecha_creacion', 'id'], name='temperatura_creacion_id_idx'),
+            # Validador de las respuestas condicionales: MAX(fecha_actualizacion) sin leer las filas
+            models.Index(fields=['fecha_actualizacion'], name='temperatura_actualizacion_idx'),
+            # Consultas por área de trabajo y rango de fechas
+            models.Index(fields=['area_de_trabajo', 'fecha_creacion'], name='temperatura_area_fecha_idx'),
+        ]
+
     def __str__(self):
         return f"Temperatura {self.temperatura} a las {self.hora}"
 
@@ -26,9 +47,25 @@ class Humedad(models.Model):
     obs = models.TextField(blank=True)
 
     # Añadimos los campos de fecha de creación y actualización
-    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    # (fecha_creacion usa default y no auto_now_add para que las cargas masivas puedan conservar la fecha de la lectura)
+    fecha_creacion = models.DateTimeField(default=timezone.now, editable=False)
     fecha_actualizacion = models.DateTimeField(auto_now=True)
 
+    # Id y updated_at de la fila en el sistema anterior, solo en los registros importados
+    # de bd_insecta.sql (fecha_actualizacion usa auto_now y no conserva la fecha del volcado)
+    id_anterior = models.PositiveBigIntegerField(null=True, blank=True, unique=True, editable=False)
+    actualizacion_anterior = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = RegistroQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['fecha_creacion', 'id'], name='humedad_creacion_id_idx'),
+            # Validador de las respuestas condicionales: MAX(fecha_actualizacion) sin leer las filas
+            models.Index(fields=['fecha_actualizacion'], name='humedad_actualizacion_idx'),
+            models.Index(fields=['area_de_trabajo', 'fecha_creacion'], name='humedad_area_fecha_idx'),
+        ]
+
     def __str__(self):
         return f"Humedad {self.humedad} a las {self.hora}"
 
@@ -92,10 +129,27 @@ class Vida(models.Model):
     obs = models.TextField(blank=True)
 
 
-    # Campos de timestamp (Django los maneja automáticamente con auto_now_add y auto_now)
-    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    # Campos de timestamp (fecha_creacion toma la fecha actual si no se indica otra; fecha_actualizacion usa auto_now)
+    fecha_creacion = models.DateTimeField(default=timezone.now, editable=False)
     fecha_actualizacion = models.DateTimeField(auto_now=True)
 
+    # Id y updated_at de la fila en el sistema anterior, solo en los registros importados
+    # de bd_insecta.sql (fecha_actualizacion usa auto_now y no conserva la fecha del volcado)
+    id_anterior = models.PositiveBigIntegerField(null=True, blank=True, unique=True, editable=False)
+    actualizacion_anterior = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = RegistroQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['fecha_creacion', 'id'], name='vida_creacion_id_idx'),
+            # Validador de las respuestas condicionales: MAX(fecha_actualizacion) sin leer las filas
+            models.Index(fields=['fecha_actualizacion'], name='vida_actualizacion_idx'),
+            # Filtros de la lista por especie y cepa en un rango de fechas (ver filtros.py)
+            models.Index(fields=['especie', 'cepa', 'fecha_creacion'], name='vida_especie_cepa_idx'),
+            models.Index(fields=['cepa', 'fecha_creacion'], name='vida_cepa_fecha_idx'),
+        ]
+
     def __str__(self):
         """
         Método de representación de cadena para el objeto Live.
@@ -128,10 +182,26 @@ class Mortalidad_pupas(models.Model):
     obs = models.TextField(blank=True)
 
 
-    # Campos de timestamp (Django los maneja automáticamente con auto_now_add y auto_now)
-    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    # Campos de timestamp (fecha_creacion toma la fecha actual si no se indica otra; fecha_actualizacion usa auto_now)
+    fecha_creacion = models.DateTimeField(default=timezone.now, editable=False)
     fecha_actualizacion = models.DateTimeField(auto_now=True)
 
+    # Id y updated_at de la fila en el sistema anterior, solo en los registros importados
+    # de bd_insecta.sql (fecha_actualizacion usa auto_now y no conserva la fecha del volcado)
+    id_anterior = models.PositiveBigIntegerField(null=True, blank=True, unique=True, editable=False)
+    actualizacion_anterior = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = RegistroQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['fecha_creacion', 'id'], name='mortalidad_creacion_id_idx'),
+            # Validador de las respuestas condicionales: MAX(fecha_actualizacion) sin leer las filas
+            models.Index(fields=['fecha_actualizacion'], name='mortalidad_actualizacion_idx'),
+            # Consultas de mortalidad por cepa ordenadas por fecha
+            models.Index(fields=['cepa', 'fecha_creacion'], name='mortalidad_cepa_fecha_idx'),
+        ]
+
 
     def __str__(self):
         """
@@ -223,14 +293,218 @@ class RegistroTemperaturaAgua(models.Model):
     )
     
 
-    # Campos de timestamp para auditoría
-    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    # Campos de timestamp para auditoría (fecha_creacion toma la fecha actual si no se indica otra)
+    fecha_creacion = models.DateTimeField(default=timezone.now, editable=False)
     fecha_actualizacion = models.DateTimeField(auto_now=True)
 
+    # Id y updated_at de la fila en el sistema anterior, solo en los registros importados
+    # de bd_insecta.sql (fecha_actualizacion usa auto_now y no conserva la fecha del volcado)
+    id_anterior = models.PositiveBigIntegerField(null=True, blank=True, unique=True, editable=False)
+    actualizacion_anterior = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = RegistroQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Registro de Temperatura del Agua"
         verbose_name_plural = "Registros de Temperatura del Agua"
         ordering = ['-fecha', 'especie', 'cepa'] # Ordenar por fecha descendente, luego especie y cepa
+        indexes = [
+            models.Index(fields=['fecha_creacion', 'id'], name='tempagua_creacion_id_idx'),
+            # Validador de las respuestas condicionales: MAX(fecha_actualizacion) sin leer las filas
+            models.Index(fields=['fecha_actualizacion'], name='tempagua_actualizacion_idx'),
+            # Consultas por especie y cepa en un rango de fechas
+            models.Index(fields=['especie', 'cepa', 'fecha'], name='tempagua_especie_cepa_idx'),
+            # Filtros de la lista por cepa o solo por rango de fechas (ver filtros.py)
+            models.Index(fields=['cepa', 'fecha'], name='tempagua_cepa_fecha_idx'),
+            models.Index(fields=['fecha'], name='tempagua_fecha_idx'),
+        ]
+
+    def __str__(self):
+        return f"Registro {self.fecha} - {self.especie} ({self.cepa})"
+
+# --- Resúmenes de Temperatura y Humedad ---
+# Se mantienen al crear, actualizar o eliminar lecturas (ver signals.py y resumenes.py)
+# y se reconstruyen con `python manage.py reconstruir_resumenes`.
+
+VARIABLES_RESUMEN = [
+    ('temperatura', 'Temperatura'),
+    ('humedad', 'Humedad'),
+]
+
+class ResumenBase(models.Model):
+    """
+    Campos comunes de los resúmenes: cantidad de lecturas, suma, mínimo y máximo
+    del valor registrado (temperatura o humedad).
+    """
+    variable = models.CharField(max_length=20, choices=VARIABLES_RESUMEN)
+    area_de_trabajo = models.CharField(max_length=20)
+    dia = models.DateField()
+
+    cantidad = models.PositiveIntegerField(default=0)
+    suma = models.DecimalField(max_digits=12, decimal_places=1, default=0)
+    minimo = models.DecimalField(max_digits=5, decimal_places=1, null=True)
+    maximo = models.DecimalField(max_digits=5, decimal_places=1, null=True)
+
+    class Meta:
+        abstract = True
+
+    @property
+    def promedio(self):
+        return self.suma / self.cantidad if self.cantidad else None
+
+class ResumenDiario(ResumenBase):
+    """
+    Resumen por variable, área de trabajo y día.
+    """
+    class Meta:
+        verbose_name = "Resumen Diario"
+        verbose_name_plural = "Resúmenes Diarios"
+        constraints = [
+            models.UniqueConstraint(fields=['variable', 'area_de_trabajo', 'dia'], name='resumen_diario_unico'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_variable_display()} {self.area_de_trabajo} {self.dia}"
+
+class ResumenHorario(ResumenBase):
+    """
+    Resumen por variable, área de trabajo, día y hora (0-23) de la lectura.
+    """
+    hora = models.PositiveSmallIntegerField()
+
+    class Meta:
+        verbose_name = "Resumen Horario"
+        verbose_name_plural = "Resúmenes Horarios"
+        constraints = [
+            models.UniqueConstraint(fields=['variable', 'area_de_trabajo', 'dia', 'hora'], name='resumen_horario_unico'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_variable_display()} {self.area_de_trabajo} {self.dia} {self.hora}:00"
+
+# --- Importación del volcado del sistema anterior ---
+
+class PuntoDeControlImportacion(models.Model):
+    """
+    Filas de una tabla del volcado ya procesadas por ``manage.py importar_volcado``.
+    Se guarda en la misma transacción que cada lote, así que una importación
+    interrumpida puede continuar desde el último lote guardado.
+    """
+    # Huella (sha256) del contenido del volcado: otro volcado empieza desde cero
+    volcado = models.CharField(max_length=64)
+    tabla = models.CharField(max_length=64)
+    # Byte donde empieza la parte del volcado que se procesó (0 para el volcado completo;
+    # con --workers, el de cada sentencia INSERT)
+    inicio = models.PositiveBigIntegerField(default=0)
+    filas = models.PositiveBigIntegerField(default=0)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Punto de Control de Importación"
+        verbose_name_plural = "Puntos de Control de Importación"
+        constraints = [
+            models.UniqueConstraint(fields=['volcado', 'tabla', 'inicio'], name='punto_de_control_unico'),
+        ]
+
+    def __str__(self):
+        return f"{self.tabla} ({self.volcado[:12]}): {self.filas} filas"
+
+# --- Alertas por umbrales ---
+# Cada lectura que se guarda se compara con las reglas activas (ver alertas.py);
+# las que quedan fuera de rango se registran en Alerta y en SalidaAlerta, de donde
+# las envía `python manage.py enviar_alertas`.
+
+VARIABLES_ALERTA = [
+    ('temperatura', 'Temperatura'),
+    ('humedad', 'Humedad'),
+    ('temperatura_agua', 'Temperatura del agua'),
+]
+
+FRANJAS_AGUA = [
+    ('730am', '7:30 AM'),
+    ('1200md', '12:00 MD'),
+    ('1500pm', '15:00 PM'),
+]
+
+class ReglaAlerta(models.Model):
+    """
+    Umbral de una variable: se alerta cuando una lectura queda por debajo de
+    ``minimo`` o por encima de ``maximo``. Se aplica a las lecturas del área de
+    trabajo (Temperatura y Humedad) o de la especie, cepa y franja horaria
+    (temperatura del agua) indicadas; un campo vacío abarca todas.
+    """
+    variable = models.CharField(max_length=20, choices=VARIABLES_ALERTA)
+    area_de_trabajo = models.CharField(max_length=20, blank=True)
+    especie = models.CharField(max_length=50, blank=True)
+    cepa = models.CharField(max_length=50, blank=True)
+    franja = models.CharField(max_length=6, choices=FRANJAS_AGUA, blank=True)
+    minimo = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
+    maximo = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
+    activa = models.BooleanField(default=True)
+
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Regla de Alerta"
+        verbose_name_plural = "Reglas de Alerta"
+
+    def clean(self):
+        if self.minimo is None and self.maximo is None:
+            raise ValidationError("Indique un mínimo, un máximo o ambos.")
+        if self.minimo is not None and self.maximo is not None and self.minimo > self.maximo:
+            raise ValidationError("El mínimo no puede ser mayor que el máximo.")
+        if self.variable == 'temperatura_agua':
+            if self.area_de_trabajo:
+                raise ValidationError({'area_de_trabajo': "La temperatura del agua se filtra por especie y cepa."})
+        elif self.especie or self.cepa or self.franja:
+            raise ValidationError("La temperatura y la humedad se filtran solo por área de trabajo.")
+
+    def __str__(self):
+        alcance = ' '.join(filter(None, [self.area_de_trabajo, self.especie, self.cepa, self.get_franja_display()]))
+        return f"{self.get_variable_display()} {alcance or 'todas'}: {self.minimo} a {self.maximo}"
+
+class Alerta(models.Model):
+    """
+    Una lectura fuera del umbral de una regla: el id del registro (del modelo de
+    ``regla.variable``), la franja en la temperatura del agua, el valor y el
+    límite que se superó. Una sola por regla, registro y franja.
+    """
+    regla = models.ForeignKey(ReglaAlerta, on_delete=models.CASCADE, related_name='alertas')
+    registro = models.PositiveBigIntegerField()
+    franja = models.CharField(max_length=6, blank=True)
+    valor = models.DecimalField(max_digits=5, decimal_places=2)
+    limite = models.DecimalField(max_digits=5, decimal_places=2)
+    fecha = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Alerta"
+        verbose_name_plural = "Alertas"
+        constraints = [
+            models.UniqueConstraint(fields=['regla', 'registro', 'franja'], name='alerta_unica'),
+        ]
+
+    def __str__(self):
+        sentido = "por encima de" if self.valor > self.limite else "por debajo de"
+        return f"{self.regla.get_variable_display()} {self.valor} {sentido} {self.limite} (registro {self.registro})"
+
+class SalidaAlerta(models.Model):
+    """
+    Bandeja de salida: una fila por alerta, escrita en la misma transacción, que
+    ``enviar_alertas`` entrega y marca con ``entregada``.
+    """
+    alerta = models.OneToOneField(Alerta, on_delete=models.CASCADE, related_name='salida')
+    intentos = models.PositiveSmallIntegerField(default=0)
+    entregada = models.DateTimeField(null=True, blank=True)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        verbose_name = "Salida de Alerta"
+        verbose_name_plural = "Salidas de Alerta"
+        indexes = [
+            # Pendientes en orden de llegada
+            models.Index(fields=['entregada', 'id'], name='salida_pendiente_idx'),
+        ]
 
     def __str__(self):
-        return f"Registro {self.fecha} - {self.especie} ({self.cepa})"
\ No newline at end of file
+        return f"Alerta {self.alerta_id}: {'entregada' if self.entregada else 'pendiente'}"
@@ -0,0 +1,172 @@
+"""
+Paginación por clave (keyset / seek) sobre ``(fecha_creacion, id)``.
+
+En lugar de ``OFFSET``, cada página se pide a partir de un cursor que apunta al
+último (o primer) registro de la página anterior. La consulta resultante es un
+rango sobre ``(fecha_creacion, id)``, así que la página N cuesta lo mismo que la
+página 1 sin importar cuántos registros haya antes.
+
+El cursor es opaco para el cliente: una cadena base64 con la fecha de creación y
+el id del registro.
+"""
+import base64
+import binascii
+from datetime import datetime
+
+from django.db import models
+from django.db.models import Q
+
+SIGUIENTE = 'siguiente' # Registros más antiguos que el cursor
+ANTERIOR = 'anterior' # Registros más recientes que el cursor
+
+TAMANO_POR_DEFECTO = 25
+TAMANO_LOTE = 2000
+
+
+class CursorInvalido(ValueError):
+    """El cursor recibido no tiene el formato esperado."""
+
+
+def codificar_cursor(obj):
+    """Devuelve el cursor que apunta al registro ``obj``."""
+    valor = f'{obj.fecha_creacion.isoformat()}|{obj.pk}'
+    return base64.urlsafe_b64encode(valor.encode()).decode().rstrip('=')
+
+def decodificar_cursor(cursor):
+    """Devuelve la tupla ``(fecha_creacion, id)`` contenida en el cursor."""
+    try:
+        relleno = '=' * (-len(cursor) % 4)
+        fecha, pk = base64.urlsafe_b64decode(cursor + relleno).decode().split('|')
+        return datetime.fromisoformat(fecha), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise CursorInvalido(f"Cursor inválido: {cursor!r}") from e
+
+
+class Pagina:
+    """
+    Una página de registros, del más reciente al más antiguo, con los cursores
+    para pedir la página siguiente y la anterior (``None`` si no hay más).
+    """
+
+    def __init__(self, objetos, siguiente=None, anterior=None):
+        self.objetos = objetos
+        self.siguiente = siguiente
+        self.anterior = anterior
+
+    def __iter__(self):
+        return iter(self.objetos)
+
+    def __len__(self):
+        return len(self.objetos)
+
+
+def _armar_pagina(filas, cursor, inversa, tamano):
+    if inversa:
+        hay_anterior = len(filas) > tamano
+        filas = filas[:tamano][::-1]
+        hay_siguiente = True
+    else:
+        hay_siguiente = len(filas) > tamano
+        filas = filas[:tamano]
+        hay_anterior = bool(cursor)
+
+    if not filas:
+        return Pagina([])
+    return Pagina(
+        filas,
+        siguiente=codificar_cursor(filas[-1]) if hay_siguiente else None,
+        anterior=codificar_cursor(filas[0]) if hay_anterior else None,
+    )
+
+
+class RegistroQuerySet(models.QuerySet):
+    """
+    QuerySet compartido por los modelos de registros del insectario.
+    Añade la paginación por clave sobre ``(fecha_creacion, id)``.
+    """
+
+    def despues_de(self, cursor):
+        """Registros más antiguos que el cursor."""
+        return self._despues_de_clave(*decodificar_cursor(cursor))
+
+    def _despues_de_clave(self, fecha, pk):
+        # El primer término acota el rango del índice (fecha_creacion, id)
+        return self.filter(Q(fecha_creacion__lte=fecha), Q(fecha_creacion__lt=fecha) | Q(pk__lt=pk))
+
+    def antes_de(self, cursor):
+        """Registros más recientes que el cursor."""
+        fecha, pk = decodificar_cursor(cursor)
+        return self.filter(Q(fecha_creacion__gte=fecha), Q(fecha_creacion__gt=fecha) | Q(pk__gt=pk))
+
+    def _consulta_pagina(self, cursor, direccion, tamano):
+        """La consulta de ``pagina`` y si trae las filas en orden inverso (hacia la anterior)."""
+        if cursor and direccion == ANTERIOR:
+            return self.antes_de(cursor).order_by('fecha_creacion', 'pk')[:tamano + 1], True
+        queryset = self.despues_de(cursor) if cursor else self
+        return queryset.order_by('-fecha_creacion', '-pk')[:tamano + 1], False
+
+    def pagina(self, cursor=None, direccion=SIGUIENTE, tamano=TAMANO_POR_DEFECTO):
+        """
+        Devuelve la página de ``tamano`` registros a partir de ``cursor``.
+        Sin cursor devuelve la primera página (los registros más recientes).
+        Se pide un registro de más para saber si hay otra página sin usar COUNT.
+        """
+        consulta, inversa = self._consulta_pagina(cursor, direccion, tamano)
+        return _armar_pagina(list(consulta), cursor, inversa, tamano)
+
+    async def apagina(self, cursor=None, direccion=SIGUIENTE, tamano=TAMANO_POR_DEFECTO):
+        """Como ``pagina``, para las vistas asíncronas."""
+        consulta, inversa = self._consulta_pagina(cursor, direccion, tamano)
+        return _armar_pagina([obj async for obj in consulta], cursor, inversa, tamano)
+
+    def recorrer(self, tamano=TAMANO_LOTE):
+        """
+        Itera todos los registros, del más reciente al más antiguo, pidiéndolos
+        por lotes de ``tamano`` con la paginación por clave.
+        """
+        cursor = None
+        while True:
+            pagina = self.pagina(cursor, tamano=tamano)
+            yield from pagina
+            if pagina.siguiente is None:
+                return
+            cursor = pagina.siguiente
+
+    def recorrer_valores(self, *campos, tamano=TAMANO_LOTE):
+        """
+        Como ``recorrer`` pero devuelve tuplas con los ``campos`` pedidos, sin
+        construir instancias del modelo. Cada lote es una consulta independiente
+        acotada por clave, así que la memoria no depende del total de filas (el
+        driver de MariaDB carga en memoria el resultado completo de cada consulta,
+        por eso no basta con ``iterator()`` sobre una sola consulta).
+        """
+        columnas = (*campos, 'fecha_creacion', 'pk')
+        queryset = self.order_by('-fecha_creacion', '-pk').values_list(*columnas)
+        lote = queryset[:tamano]
+        while True:
+            filas = 0
+            for fila in lote.iterator(chunk_size=tamano):
+                filas += 1
+                ultima = fila
+                yield fila[:len(campos)]
+            if filas < tamano:
+                return
+            lote = queryset._despues_de_clave(*ultima[-2:])[:tamano]
+
+    async def arecorrer_valores(self, *campos, tamano=TAMANO_LOTE):
+        """
+        Como ``recorrer_valores``, para las vistas asíncronas. Cada lote se lee
+        de una vez en el hilo del ORM (``aiterator`` de Django abre el cursor de
+        ``values_list`` fuera de ese hilo) y el bucle de eventos queda libre
+        entre lotes.
+        """
+        columnas = (*campos, 'fecha_creacion', 'pk')
+        queryset = self.order_by('-fecha_creacion', '-pk').values_list(*columnas)
+        lote = queryset[:tamano]
+        while True:
+            filas = [fila async for fila in lote]
+            for fila in filas:
+                yield fila[:len(campos)]
+            if len(filas) < tamano:
+                return
+            lote = queryset._despues_de_clave(*filas[-1][-2:])[:tamano]
@@ -0,0 +1,251 @@
+"""
+Mantenimiento incremental de los resúmenes de Temperatura y Humedad.
+
+Cada lectura suma su valor a dos filas de resumen: la del día
+(``ResumenDiario``) y la de la hora (``ResumenHorario``) de su área de trabajo.
+Al crear una lectura basta con sumar; al actualizarla o eliminarla se resta su
+valor anterior y, si era el mínimo o el máximo del grupo, el grupo se recalcula
+a partir de las lecturas de ese día (unas pocas filas, por el índice
+``(area_de_trabajo, fecha_creacion)``).
+
+Las estadísticas diarias y móviles de ``analitica.py`` (``analitica.diario`` y
+``analitica.movil``) leen solo los resúmenes (``consultar``), así que su costo
+depende del número de días y no del número de lecturas.
+
+Las cargas masivas (``bulk_create``, ``QuerySet.update``/``delete``) no pasan por
+las señales; después de ellas hay que ejecutar ``manage.py reconstruir_resumenes``.
+"""
+from collections import namedtuple
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DecimalField, F, Max, Min, Sum, Value
+from django.db.models.functions import ExtractHour, Greatest, Least, TruncDate
+
+from .models import Temperatura, Humedad, ResumenDiario, ResumenHorario
+
+# Modelo de lectura -> (variable del resumen, campo con el valor)
+LECTURAS = {
+    Temperatura: ('temperatura', 'temperatura'),
+    Humedad: ('humedad', 'humedad'),
+}
+MODELOS_POR_VARIABLE = {variable: modelo for modelo, (variable, _) in LECTURAS.items()}
+
+TAMANO_LOTE = 1000
+
+Lectura = namedtuple('Lectura', 'variable area_de_trabajo dia hora valor')
+
+
+def lectura(obj):
+    """Datos de ``obj`` que afectan a los resúmenes, o ``None`` si no tiene valor."""
+    variable, campo = LECTURAS[type(obj)]
+    valor = getattr(obj, campo)
+    if valor is None or obj.fecha_creacion is None or obj.hora is None:
+        return None
+    return Lectura(variable, obj.area_de_trabajo, obj.fecha_creacion.date(), obj.hora.hour, Decimal(valor))
+
+def lectura_guardada(modelo, pk):
+    """Como ``lectura`` pero con los valores que hay en la base de datos para ``pk``."""
+    variable, campo = LECTURAS[modelo]
+    fila = modelo.objects.filter(pk=pk).values_list(campo, 'area_de_trabajo', 'fecha_creacion', 'hora').first()
+    if fila is None or None in fila:
+        return None
+    valor, area, fecha_creacion, hora = fila
+    return Lectura(variable, area, fecha_creacion.date(), hora.hour, valor)
+
+
+def _grupos(lec):
+    """Las dos filas de resumen (modelo, clave) a las que aporta una lectura."""
+    clave = {'variable': lec.variable, 'area_de_trabajo': lec.area_de_trabajo, 'dia': lec.dia}
+    return ((ResumenDiario, clave), (ResumenHorario, {**clave, 'hora': lec.hora}))
+
+
+def _decimal_sql(valor, max_digits=5):
+    return Value(valor, output_field=DecimalField(max_digits=max_digits, decimal_places=1))
+
+def _sumar(modelo, clave, valor, cantidad=1, suma=None, minimo=None, maximo=None):
+    """
+    Suma al grupo una lectura (``valor``) o, en las cargas por lotes, un bloque
+    de lecturas ya agregado (``cantidad``, ``suma``, ``minimo``, ``maximo``).
+    """
+    suma = valor if suma is None else suma
+    minimo = valor if minimo is None else minimo
+    maximo = valor if maximo is None else maximo
+    actualizadas = modelo.objects.filter(**clave).update(
+        cantidad=F('cantidad') + cantidad,
+        suma=F('suma') + _decimal_sql(suma, max_digits=12),
+        minimo=Least('minimo', _decimal_sql(minimo)),
+        maximo=Greatest('maximo', _decimal_sql(maximo)),
+    )
+    if actualizadas:
+        return
+    try:
+        with transaction.atomic():
+            modelo.objects.create(**clave, cantidad=cantidad, suma=suma, minimo=minimo, maximo=maximo)
+    except IntegrityError:
+        # Otra petición creó la fila entre el UPDATE y el INSERT
+        _sumar(modelo, clave, valor, cantidad, suma, minimo, maximo)
+
+def _restar(modelo, clave, valor):
+    """Resta el valor del grupo. Devuelve True si el grupo se recalculó desde las lecturas."""
+    fila = modelo.objects.select_for_update().filter(**clave).first()
+    if fila is None:
+        return False
+    if fila.cantidad <= 1:
+        fila.delete()
+    elif valor in (fila.minimo, fila.maximo):
+        # No se puede saber el nuevo mínimo/máximo sin mirar las lecturas del grupo
+        _recalcular(modelo, clave)
+        return True
+    else:
+        modelo.objects.filter(pk=fila.pk).update(cantidad=F('cantidad') - 1, suma=F('suma') - valor)
+    return False
+
+def _recalcular(modelo, clave):
+    lecturas = MODELOS_POR_VARIABLE[clave['variable']]
+    _, campo = LECTURAS[lecturas]
+    inicio = datetime.combine(clave['dia'], time.min)
+    queryset = lecturas.objects.filter(
+        area_de_trabajo=clave['area_de_trabajo'],
+        fecha_creacion__gte=inicio,
+        fecha_creacion__lt=inicio + timedelta(days=1),
+    ).exclude(**{campo: None})
+    if 'hora' in clave:
+        queryset = queryset.filter(hora__hour=clave['hora'])
+    totales = queryset.aggregate(cantidad=Count(campo), suma=Sum(campo), minimo=Min(campo), maximo=Max(campo))
+    if totales['cantidad']:
+        modelo.objects.filter(**clave).update(**totales)
+    else:
+        modelo.objects.filter(**clave).delete()
+
+
+def _identificador(modelo, clave):
+    return modelo, tuple(sorted(clave.items()))
+
+def sumar(lec, omitir=()):
+    """Suma la lectura a sus grupos, salvo a los de ``omitir`` (ver ``actualizar``)."""
+    with transaction.atomic():
+        for modelo, clave in _grupos(lec):
+            if _identificador(modelo, clave) not in omitir:
+                _sumar(modelo, clave, lec.valor)
+
+def sumar_lote(lecturas):
+    """
+    Suma muchas lecturas nuevas (p. ej. tras un ``bulk_create``) agrupándolas
+    primero en memoria: una actualización por grupo que ya existe y un solo
+    ``bulk_create`` para los grupos nuevos, en lugar de dos consultas por lectura.
+    """
+    grupos = {}
+    for lec in lecturas:
+        if lec is None:
+            continue
+        for modelo, clave in _grupos(lec):
+            identificador = _identificador(modelo, clave)
+            if identificador not in grupos:
+                grupos[identificador] = [modelo, clave, 0, Decimal(0), lec.valor, lec.valor]
+            grupo = grupos[identificador]
+            grupo[2] += 1
+            grupo[3] += lec.valor
+            grupo[4] = min(grupo[4], lec.valor)
+            grupo[5] = max(grupo[5], lec.valor)
+    if not grupos:
+        return
+    with transaction.atomic():
+        existentes = _existentes(grupos.values())
+        nuevos = [grupo for identificador, grupo in grupos.items() if identificador not in existentes]
+        for identificador in existentes & grupos.keys():
+            modelo, clave, cantidad, suma, minimo, maximo = grupos[identificador]
+            _sumar(modelo, clave, None, cantidad, suma, minimo, maximo)
+        try:
+            with transaction.atomic():
+                for modelo in (ResumenDiario, ResumenHorario):
+                    modelo.objects.bulk_create([
+                        modelo(**clave, cantidad=cantidad, suma=suma, minimo=minimo, maximo=maximo)
+                        for modelo_grupo, clave, cantidad, suma, minimo, maximo in nuevos
+                        if modelo_grupo is modelo
+                    ], batch_size=TAMANO_LOTE)
+        except IntegrityError:
+            # Otra petición creó alguno de los grupos: se suman uno por uno
+            for modelo, clave, cantidad, suma, minimo, maximo in nuevos:
+                _sumar(modelo, clave, None, cantidad, suma, minimo, maximo)
+
+def _existentes(grupos):
+    """Identificadores de los ``grupos`` que ya tienen fila de resumen (una consulta por modelo)."""
+    existentes = set()
+    for modelo in (ResumenDiario, ResumenHorario):
+        claves = [clave for modelo_grupo, clave, *_ in grupos if modelo_grupo is modelo]
+        if not claves:
+            continue
+        campos = sorted(claves[0])
+        filas = modelo.objects.filter(
+            variable__in={clave['variable'] for clave in claves},
+            dia__range=(min(clave['dia'] for clave in claves), max(clave['dia'] for clave in claves)),
+        ).values_list(*campos)
+        existentes.update((modelo, tuple(zip(campos, fila))) for fila in filas)
+    return existentes
+
+def retirar(lec):
+    """Resta la lectura de sus grupos y devuelve los que se recalcularon."""
+    recalculados = set()
+    with transaction.atomic():
+        for modelo, clave in _grupos(lec):
+            if _restar(modelo, clave, lec.valor):
+                recalculados.add(_identificador(modelo, clave))
+    return recalculados
+
+def actualizar(anterior, nueva):
+    """Aplica a los resúmenes el cambio de una lectura (cualquiera puede ser ``None``)."""
+    if anterior == nueva:
+        return
+    recalculados = retirar(anterior) if anterior is not None else set()
+    if nueva is not None:
+        # Un grupo recalculado después de guardar ya incluye el valor nuevo
+        sumar(nueva, omitir=recalculados)
+
+
+def reconstruir():
+    """
+    Vuelve a calcular todos los resúmenes a partir de las lecturas, con una
+    consulta agrupada por variable y nivel.
+    """
+    creados = {ResumenDiario: 0, ResumenHorario: 0}
+    with transaction.atomic():
+        ResumenDiario.objects.all().delete()
+        ResumenHorario.objects.all().delete()
+        for modelo, (variable, campo) in LECTURAS.items():
+            base = modelo.objects.exclude(**{campo: None}).annotate(dia=TruncDate('fecha_creacion'))
+            agregados = {
+                'cantidad': Count(campo), 'suma': Sum(campo), 'minimo': Min(campo), 'maximo': Max(campo),
+            }
+            diarios = base.values('area_de_trabajo', 'dia').annotate(**agregados).order_by()
+            creados[ResumenDiario] += len(ResumenDiario.objects.bulk_create(
+                (ResumenDiario(variable=variable, **fila) for fila in diarios.iterator()),
+                batch_size=TAMANO_LOTE,
+            ))
+            horarios = (
+                base.annotate(hora_del_dia=ExtractHour('hora'))
+                .values('area_de_trabajo', 'dia', 'hora_del_dia').annotate(**agregados).order_by()
+            )
+            creados[ResumenHorario] += len(ResumenHorario.objects.bulk_create(
+                (ResumenHorario(variable=variable, hora=fila.pop('hora_del_dia'), **fila) for fila in horarios.iterator()),
+                batch_size=TAMANO_LOTE,
+            ))
+    return creados
+
+
+def consultar(modelo, variable, area_de_trabajo=None, desde=None, hasta=None):
+    """
+    Resúmenes (``ResumenDiario`` o ``ResumenHorario``) de una variable, opcionalmente
+    filtrados por área y rango de días, ordenados cronológicamente. Nunca
+    consulta las lecturas; lo usa ``analitica.diario``.
+    """
+    queryset = modelo.objects.filter(variable=variable)
+    if area_de_trabajo:
+        queryset = queryset.filter(area_de_trabajo=area_de_trabajo)
+    if desde:
+        queryset = queryset.filter(dia__gte=desde)
+    if hasta:
+        queryset = queryset.filter(dia__lte=hasta)
+    orden = ['dia', 'hora'] if modelo is ResumenHorario else ['dia']
+    return queryset.order_by(*orden, 'area_de_trabajo')
@@ -0,0 +1,92 @@
+"""
+Señales de los modelos de la aplicación (se conectan en InsectAppConfig.ready).
+"""
+from django.conf import settings
+from django.contrib.auth.signals import user_logged_out
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import alertas, cache_listas, metricas, resumenes, usuarios
+from .models import Temperatura, Humedad, Vida, Mortalidad_pupas, RegistroTemperaturaAgua, ReglaAlerta
+
+
+# --- Resúmenes de Temperatura y Humedad ---
+
+@receiver(pre_save, sender=Temperatura)
+@receiver(pre_save, sender=Humedad)
+def guardar_lectura_anterior(sender, instance, raw=False, **kwargs):
+    """Recuerda los valores guardados de la lectura para poder restarlos después."""
+    if raw:
+        return
+    instance._lectura_anterior = resumenes.lectura_guardada(sender, instance.pk) if instance.pk else None
+
+@receiver(post_save, sender=Temperatura)
+@receiver(post_save, sender=Humedad)
+def actualizar_resumenes(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    resumenes.actualizar(getattr(instance, '_lectura_anterior', None), resumenes.lectura(instance))
+
+@receiver(post_delete, sender=Temperatura)
+@receiver(post_delete, sender=Humedad)
+def retirar_de_resumenes(sender, instance, **kwargs):
+    lectura = resumenes.lectura(instance)
+    if lectura is not None:
+        resumenes.retirar(lectura)
+
+
+# --- Caché de las páginas de lista ---
+
+@receiver(post_save, sender=Temperatura)
+@receiver(post_save, sender=Humedad)
+@receiver(post_save, sender=Vida)
+@receiver(post_save, sender=Mortalidad_pupas)
+@receiver(post_save, sender=RegistroTemperaturaAgua)
+@receiver(post_delete, sender=Temperatura)
+@receiver(post_delete, sender=Humedad)
+@receiver(post_delete, sender=Vida)
+@receiver(post_delete, sender=Mortalidad_pupas)
+@receiver(post_delete, sender=RegistroTemperaturaAgua)
+def invalidar_listas(sender, **kwargs):
+    cache_listas.invalidar(sender)
+
+
+# --- Alertas por umbrales (ver alertas.py) ---
+
+@receiver(post_save, sender=Temperatura)
+@receiver(post_save, sender=Humedad)
+@receiver(post_save, sender=RegistroTemperaturaAgua)
+def revisar_alertas(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    alertas.revisar(instance, creada=created)
+
+@receiver(post_save, sender=ReglaAlerta)
+@receiver(post_delete, sender=ReglaAlerta)
+def olvidar_reglas(sender, **kwargs):
+    # Ya, para las lecturas de esta transacción, y otra vez al confirmarla, por si
+    # otro hilo volvió a leer las reglas anteriores mientras tanto
+    alertas.olvidar_reglas()
+    transaction.on_commit(alertas.olvidar_reglas)
+
+
+# --- Usuarios guardados en cada proceso (ver usuarios.py) ---
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def olvidar_usuario(sender, instance, **kwargs):
+    usuarios.invalidar(instance.pk)
+
+@receiver(user_logged_out)
+def olvidar_usuario_al_salir(sender, request, user, **kwargs):
+    if user is not None:
+        usuarios.olvidar(user.pk)
+
+
+# --- Consultas de cada petición en /metrics (ver metricas.py) ---
+
+@receiver(connection_created)
+def medir_consultas(sender, connection, **kwargs):
+    metricas.medir_conexion(connection)
@@ -0,0 +1,258 @@
+"""
+Datos sintéticos para las pruebas de escala (``manage.py generar_datos``).
+
+Sigue el ritmo del volcado del sistema anterior (``bd_insecta.sql``): cada día
+hábil hay una lectura de Temperatura y otra de Humedad a las 7:30, 12:00 y
+15:00 en cada área de trabajo, con el máximo y el mínimo del día repetidos en
+las tres; y algunos registros de Vida, Mortalidad_pupas y
+RegistroTemperaturaAgua con las especies y cepas de ``forms.py``. Cada sitio
+repite el día con valores propios (los modelos no tienen un campo de sitio, así
+que los sitios solo multiplican las filas).
+
+Los valores se generan con NumPy por bloques de días, a partir de un
+``numpy.random.Generator`` con semilla: la misma semilla produce los mismos
+datos. Cada bloque sale como filas de valores (tuplas en el orden de
+``Filas.campos``, con los decimales tomados de tablas de ``Decimal``
+precalculadas) que ``insertar`` guarda con ``executemany``, sin construir una
+instancia del modelo ni preparar cada valor con su campo como ``bulk_create``:
+en millones de filas, esa preparación era la mayor parte del tiempo.
+"""
+import datetime
+import itertools
+from collections import namedtuple
+from decimal import Decimal
+
+import numpy as np
+from django.db import connection
+from django.utils import timezone
+
+from .forms import AM_PM, AREA_DE_TRABAJO, CEPAS, ESPECIES
+from .models import Temperatura, Humedad, Vida, Mortalidad_pupas, RegistroTemperaturaAgua
+
+AREAS = [valor for valor, _ in AREA_DE_TRABAJO if valor]
+LISTA_CEPAS = [valor for valor, _ in CEPAS if valor]
+LISTA_ESPECIES = [valor for valor, _ in ESPECIES if valor]
+LISTA_AM_PM = [valor for valor, _ in AM_PM if valor]
+TIEMPOS_BANDEJA = ['5 min', '10 min', '20 min', '30 min']
+
+# Horas de las lecturas diarias y minutos desde la medianoche
+HORAS = [datetime.time(7, 30), datetime.time(12, 0), datetime.time(15, 0)]
+MINUTOS_HORAS = np.array([7 * 60 + 30, 12 * 60, 15 * 60])
+
+# Decimal de cada valor en décimas (0,0 a 100,0) y en centésimas (0,00 a 50,00)
+DECIMAS = np.array([Decimal(f'{i // 10}.{i % 10}') for i in range(1001)], dtype=object)
+CENTESIMAS = np.array([Decimal(f'{i // 100}.{i % 100:02d}') for i in range(5001)], dtype=object)
+
+# Filas de un modelo: nombres de los campos y una tupla de valores por registro
+Filas = namedtuple('Filas', 'modelo campos filas')
+
+
+class Perfil:
+    """
+    Cómo varía una lectura (Temperatura o Humedad): valor medio a cada hora y en
+    cada área, amplitud de la variación anual, dispersión, márgenes del máximo y
+    el mínimo del día sobre las lecturas, límites y si se registra en enteros.
+    """
+
+    def __init__(self, campos, por_hora, por_area, anual, dispersion, margen_maximo, margen_minimo, limites, enteros):
+        self.campos = campos
+        self.por_hora = np.array(por_hora)
+        self.por_area = np.array(por_area)
+        self.anual = anual
+        self.dispersion = dispersion
+        self.margen_maximo = margen_maximo
+        self.margen_minimo = margen_minimo
+        self.limites = limites
+        self.enteros = enteros
+
+
+# Valores aproximados a los del volcado (áreas en el orden de AREAS: Inmadura, Adulta)
+PERFILES = {
+    Temperatura: Perfil(
+        ('temperatura', 'max_temperatura', 'min_temperatura'), por_hora=(26.0, 29.0, 29.5), por_area=(-0.8, 0.0),
+        anual=1.2, dispersion=0.6, margen_maximo=(0.3, 4.0), margen_minimo=(0.5, 2.5), limites=(15, 45), enteros=False,
+    ),
+    Humedad: Perfil(
+        ('humedad', 'max_humedad', 'min_humedad'), por_hora=(80, 72, 70), por_area=(-4, 3),
+        anual=6, dispersion=5, margen_maximo=(3, 12), margen_minimo=(5, 15), limites=(20, 100), enteros=True,
+    ),
+}
+
+
+def dias_habiles(desde, dias):
+    """Los días hábiles (lunes a viernes) entre ``desde`` y ``dias`` días después."""
+    inicio = np.datetime64(desde, 'D')
+    fechas = np.arange(inicio, inicio + dias)
+    return fechas[np.is_busday(fechas)]
+
+
+def _fechas_horas(fechas, segundos):
+    """``datetime`` de cada fecha (``datetime64[D]``) más ``segundos`` desde la medianoche."""
+    return (fechas.astype('datetime64[s]') + segundos.astype('timedelta64[s]')).tolist()
+
+
+def _decimas(valores):
+    return DECIMAS[np.clip(np.rint(valores * 10), 0, len(DECIMAS) - 1).astype(np.int64)]
+
+
+def _centesimas(valores):
+    return CENTESIMAS[np.clip(np.rint(valores * 100), 0, len(CENTESIMAS) - 1).astype(np.int64)]
+
+
+def _elegir(opciones, indices):
+    return np.array(opciones, dtype=object)[indices].tolist()
+
+
+def _filas(modelo, columnas):
+    """
+    ``Filas`` de ``modelo`` a partir de ``{campo: lista de valores}``, con las
+    observaciones vacías y la fecha de actualización (que ``auto_now`` no pone
+    fuera de ``save``/``bulk_create``) en la hora actual.
+    """
+    cantidad = len(next(iter(columnas.values())))
+    campo_obs = 'observaciones' if modelo is RegistroTemperaturaAgua else 'obs'
+    columnas = {**columnas, campo_obs: itertools.repeat('', cantidad), 'fecha_actualizacion': itertools.repeat(timezone.now(), cantidad)}
+    return Filas(modelo, list(columnas), list(zip(*columnas.values())))
+
+
+def insertar(filas, tamano_lote):
+    """Guarda ``filas`` con ``executemany``, de ``tamano_lote`` filas por llamada."""
+    opciones = filas.modelo._meta
+    columnas = ', '.join(connection.ops.quote_name(opciones.get_field(campo).column) for campo in filas.campos)
+    sql = (
+        f"INSERT INTO {connection.ops.quote_name(opciones.db_table)} ({columnas}) "
+        f"VALUES ({', '.join(['%s'] * len(filas.campos))})"
+    )
+    with connection.cursor() as cursor:
+        for desde in range(0, len(filas.filas), tamano_lote):
+            cursor.executemany(sql, filas.filas[desde:desde + tamano_lote])
+
+
+class Generador:
+    """Genera los registros de ``sitios`` sitios, un bloque de días a la vez."""
+
+    def __init__(self, semilla, sitios=1):
+        self.aleatorio = np.random.default_rng(semilla)
+        self.sitios = sitios
+
+    def _por_dia(self, fechas, media):
+        """Repite cada fecha según una cantidad de Poisson por día y sitio."""
+        cantidades = self.aleatorio.poisson(media, size=len(fechas) * self.sitios)
+        return np.repeat(np.repeat(fechas, self.sitios), cantidades)
+
+    def _a_lo_largo_del_dia(self, fechas, desde_hora=8, horas=8):
+        segundos = desde_hora * 3600 + self.aleatorio.integers(0, horas * 3600, size=len(fechas))
+        return _fechas_horas(fechas, segundos)
+
+    def _opciones(self, opciones, cantidad, p=None):
+        return _elegir(opciones, self.aleatorio.choice(len(opciones), size=cantidad, p=p))
+
+    def lecturas(self, modelo, fechas):
+        """Lecturas de Temperatura o Humedad: tres por día, sitio y área."""
+        perfil = PERFILES[modelo]
+        forma = (len(fechas), self.sitios, len(AREAS), len(HORAS))
+        dia_del_anio = (fechas - fechas.astype('datetime64[Y]')).astype(np.int64)
+        estacion = perfil.anual * np.sin(2 * np.pi * (dia_del_anio - 80) / 365.25)
+
+        # Media de la hora y el área, variación anual, un desvío propio de cada día y el ruido de cada lectura
+        valores = (
+            perfil.por_hora[None, None, None, :]
+            + perfil.por_area[None, None, :, None]
+            + estacion[:, None, None, None]
+            + self.aleatorio.normal(0, perfil.dispersion / 2, size=forma[:3])[..., None]
+            + self.aleatorio.normal(0, perfil.dispersion / 2, size=forma)
+        )
+        maximos = valores.max(axis=-1, keepdims=True) + self.aleatorio.uniform(*perfil.margen_maximo, size=forma[:3] + (1,))
+        minimos = valores.min(axis=-1, keepdims=True) - self.aleatorio.uniform(*perfil.margen_minimo, size=forma[:3] + (1,))
+        columnas = [np.clip(v, *perfil.limites) for v in (valores, maximos, minimos)]
+        if perfil.enteros:
+            columnas = [np.rint(v) for v in columnas]
+
+        # Se anotan con algunos minutos de retraso sobre la hora de la lectura
+        segundos = (
+            MINUTOS_HORAS[None, None, None, :] * 60
+            + np.minimum(self.aleatorio.exponential(20 * 60, size=forma), 90 * 60).astype(np.int64)
+        ).ravel()
+        dias = np.broadcast_to(fechas[:, None, None, None], forma).ravel()
+        areas = np.broadcast_to(np.arange(len(AREAS))[None, None, :, None], forma).ravel()
+        horas = np.broadcast_to(np.arange(len(HORAS)), forma).ravel()
+
+        # En el orden en que se anotan, para que los ids sigan a las fechas
+        orden = np.argsort(dias.astype('datetime64[s]') + segundos.astype('timedelta64[s]'), kind='stable')
+        campo, campo_maximo, campo_minimo = perfil.campos
+        return _filas(modelo, {
+            campo: _decimas(np.broadcast_to(columnas[0], forma).ravel()[orden]).tolist(),
+            campo_maximo: _decimas(np.broadcast_to(columnas[1], forma).ravel()[orden]).tolist(),
+            campo_minimo: _decimas(np.broadcast_to(columnas[2], forma).ravel()[orden]).tolist(),
+            # Las horas ya convertidas para la base de datos (sqlite3 no convierte ``time``)
+            'hora': _elegir([connection.ops.adapt_timefield_value(hora) for hora in HORAS], horas[orden]),
+            'area_de_trabajo': _elegir(AREAS, areas[orden]),
+            'fecha_creacion': _fechas_horas(dias[orden], segundos[orden]),
+        })
+
+    def vidas(self, fechas, media=0.6):
+        """Conteos de pupas y larvas al revisar las bandejas (pocas veces por semana)."""
+        dias = self._por_dia(fechas, media)
+        n = len(dias)
+        antes = self.aleatorio.integers(0, 5, size=n)
+        divididas = self.aleatorio.integers(0, 3, size=n)
+        vivas = self.aleatorio.poisson(60, size=n)
+        muertas = self.aleatorio.poisson(2, size=n)
+        return _filas(Vida, {
+            'especie': self._opciones(LISTA_ESPECIES, n),
+            'cepa': self._opciones(LISTA_CEPAS, n),
+            'fecha_inicio_bandejas': (dias - self.aleatorio.integers(6, 10, size=n).astype('timedelta64[D]')).tolist(),
+            'fecha_pupacion': dias.tolist(),
+            'numero_bandejas_antes_trabajo': antes.tolist(),
+            'pupas_vivas': vivas.tolist(),
+            'pupas_muertas': muertas.tolist(),
+            'total_pupas_vivas_y_muertas': (vivas + muertas).tolist(),
+            'larvas_muertas': self.aleatorio.poisson(1, size=n).tolist(),
+            'bandejas_divididas': divididas.tolist(),
+            'bandejas_existentes_despues_trabajo': (antes + divididas).tolist(),
+            'am_pm_pupas_vivas': self._opciones(LISTA_AM_PM, n, p=[0.85, 0.15]),
+            'am_pm_pupas_muertas': self._opciones(LISTA_AM_PM, n, p=[0.85, 0.15]),
+            'am_pm_larvas_muertas': self._opciones(LISTA_AM_PM, n, p=[0.85, 0.15]),
+            'tiempo_bandeja': self._opciones(TIEMPOS_BANDEJA, n),
+            'fecha_creacion': self._a_lo_largo_del_dia(dias),
+        })
+
+    def mortalidades(self, fechas, media=0.3):
+        """Pupas muertas en los criaderos, por cepa."""
+        dias = self._por_dia(fechas, media)
+        n = len(dias)
+        return _filas(Mortalidad_pupas, {
+            'cepa': self._opciones(LISTA_CEPAS, n),
+            'cantidad': self.aleatorio.poisson(8, size=n).tolist(),
+            'fecha_creacion': self._a_lo_largo_del_dia(dias),
+        })
+
+    def temperaturas_agua(self, fechas, media=1.0):
+        """Temperatura del agua de las bandejas a las 7:30, 12:00 y 15:00."""
+        dias = self._por_dia(fechas, media)
+        n = len(dias)
+        valores = np.array([25.5, 28.0, 27.0])[:, None] + self.aleatorio.normal(0, 0.8, size=(3, n))
+        maximos = valores + self.aleatorio.uniform(0, 1.5, size=(3, n))
+        minimos = valores - self.aleatorio.uniform(0, 1.5, size=(3, n))
+        columnas = {
+            'fecha': dias.tolist(),
+            'especie': self._opciones(LISTA_ESPECIES, n),
+            'cepa': self._opciones(LISTA_CEPAS, n),
+            'fecha_bandeja': (dias - self.aleatorio.integers(0, 10, size=n).astype('timedelta64[D]')).tolist(),
+        }
+        for i, hora in enumerate(('730am', '1200md', '1500pm')):
+            columnas[f'temp_{hora}'] = _centesimas(valores[i]).tolist()
+            columnas[f'temp_max_{hora}'] = _centesimas(maximos[i]).tolist()
+            columnas[f'temp_min_{hora}'] = _centesimas(minimos[i]).tolist()
+        columnas['fecha_creacion'] = self._a_lo_largo_del_dia(dias)
+        return _filas(RegistroTemperaturaAgua, columnas)
+
+    def bloque(self, fechas):
+        """Las ``Filas`` de cada modelo para ``fechas``."""
+        return [
+            self.lecturas(Temperatura, fechas),
+            self.lecturas(Humedad, fechas),
+            self.vidas(fechas),
+            self.mortalidades(fechas),
+            self.temperaturas_agua(fechas),
+        ]
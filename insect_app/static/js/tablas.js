@@ -0,0 +1,102 @@
+/*
+ * Utilidades compartidas por las tablas DataTables de las listas.
+ */
+
+/*
+ * Opción `ajax` para DataTables en modo serverSide que usa la paginación por
+ * clave del servidor. Cada respuesta trae el cursor de su primera y su última
+ * fila; si la siguiente petición es justo la página contigua (mismo tamaño,
+ * misma búsqueda y orden por defecto) se envía el cursor en lugar de depender
+ * solo de `start`, y el servidor evita el OFFSET.
+ *
+ * `siguienteInicial` es el cursor de la primera página, que ya viene en el HTML.
+ */
+function ajaxPorCursor(url, siguienteInicial, longitudInicial) {
+  var ultima = {
+    inicio: 0,
+    longitud: longitudInicial,
+    busqueda: "",
+    ordenada: false,
+    siguiente: siguienteInicial,
+    anterior: null,
+  };
+  var pedida = null;
+
+  return {
+    url: url,
+    data: function (d) {
+      pedida = {
+        inicio: d.start,
+        longitud: d.length,
+        busqueda: d.search.value,
+        ordenada: d.order.length > 0,
+      };
+      if (
+        !pedida.ordenada &&
+        !ultima.ordenada &&
+        pedida.busqueda === ultima.busqueda &&
+        pedida.longitud === ultima.longitud
+      ) {
+        if (d.start === ultima.inicio + ultima.longitud && ultima.siguiente) {
+          d.cursor = ultima.siguiente;
+        } else if (d.start === ultima.inicio - ultima.longitud && ultima.anterior) {
+          d.cursor = ultima.anterior;
+          d.direccion = "anterior";
+        }
+      }
+    },
+    dataSrc: function (json) {
+      ultima = pedida;
+      ultima.siguiente = json.siguiente;
+      ultima.anterior = json.anterior;
+      return json.data;
+    },
+  };
+}
+
+/*
+ * Enlace "ver más" de las observaciones largas: las filas traen solo el
+ * comienzo del texto y el completo se pide al hacer clic (ver listas.py).
+ */
+$(document).on("click", "a.ver-observaciones", function (e) {
+  e.preventDefault();
+  var enlace = $(this);
+  $.getJSON(enlace.attr("href"), function (json) {
+    enlace.parent().text(json.observaciones);
+  });
+});
+
+/*
+ * Textos en español de las tablas (opción `language` de DataTables).
+ */
+var idioma_espanol = {
+  sProcessing: "Procesando...",
+  sLengthMenu: "Mostrar _MENU_ registros",
+  sZeroRecords: "No se encontraron resultados",
+  sEmptyTable: "Ningún dato disponible en esta tabla",
+  sInfo:
+    "Mostrando registros del _START_ al _END_ de un total de _TOTAL_ registros",
+  sInfoEmpty: "Mostrando registros del 0 al 0 de un total de 0 registros",
+  sInfoFiltered: "(filtrado de un total de _MAX_ registros)",
+  sInfoPostFix: "",
+  sSearch: "Buscar:",
+  sUrl: "",
+  sInfoThousands: ",",
+  sLoadingRecords: "Cargando...",
+  oPaginate: {
+    sFirst: "Primero",
+    sLast: "Último",
+    sNext: "Siguiente",
+    sPrevious: "Anterior",
+  },
+  oAria: {
+    sSortAscending: ": Activar para ordenar la columna de manera ascendente",
+    sSortDescending:
+      ": Activar para ordenar la columna de manera descendente",
+  },
+  buttons: {
+    copy: "Copiar",
+    print: "Imprimir",
+    colvis: "Visibilidad",
+  },
+};
@@ -1,3 +1,1661 @@
-from django.test import TestCase
+import base64
+import datetime
+import io
+import json
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock, skipUnless
+
+import numpy
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.contrib.auth.models import Permission, User
+from django.core import mail
+from django.core.cache import caches
+from django.core.exceptions import ValidationError
+from django.core.management import CommandError, call_command
+from django.test import AsyncClient, Client, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection, connections
+from django.urls import reverse
+from prometheus_client import REGISTRY, generate_latest
+
+from . import alertas, analitica, cache_listas, claves, conexiones, datatables, exportar, filtros, forms, importacion_paralela, ingesta, listas, resumenes, usuarios, views, volcado
+from .datatables import ORDEN_POR_DEFECTO
+from .importacion import Importador
+from .models import (Temperatura, Humedad, Vida, Mortalidad_pupas, RegistroTemperaturaAgua, ResumenDiario, ResumenHorario,
+                     ReglaAlerta, Alerta, SalidaAlerta)
+from .paginacion import ANTERIOR, CursorInvalido, codificar_cursor
 
 # Create your tests here.
+
+
+class IndicesTests(TestCase):
+    """
+    Comprueba con EXPLAIN que las consultas de las listas y de los filtros
+    habituales usan los índices declarados en Meta.indexes.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.temperatura = Temperatura.objects.create(hora=datetime.time(7, 30), area_de_trabajo='Área Fase Adulta')
+
+    def assertUsaIndice(self, queryset, indice):
+        plan = queryset.explain()
+        self.assertIn(indice, plan, f"La consulta no usa {indice}:\n{queryset.query}\n{plan}")
+
+    def test_listas_ordenadas_por_fecha_de_creacion(self):
+        casos = [
+            (Temperatura, 'temperatura_creacion_id_idx'),
+            (Humedad, 'humedad_creacion_id_idx'),
+            (Vida, 'vida_creacion_id_idx'),
+            (Mortalidad_pupas, 'mortalidad_creacion_id_idx'),
+            (RegistroTemperaturaAgua, 'tempagua_creacion_id_idx'),
+        ]
+        for modelo, indice in casos:
+            with self.subTest(modelo=modelo.__name__):
+                self.assertUsaIndice(modelo.objects.order_by(*ORDEN_POR_DEFECTO)[:5], indice)
+
+    def test_paginacion_por_clave(self):
+        cursor = codificar_cursor(self.temperatura)
+        self.assertUsaIndice(
+            Temperatura.objects.despues_de(cursor).order_by('-fecha_creacion', '-pk')[:26],
+            'temperatura_creacion_id_idx',
+        )
+        self.assertUsaIndice(
+            Temperatura.objects.antes_de(cursor).order_by('fecha_creacion', 'pk')[:26],
+            'temperatura_creacion_id_idx',
+        )
+
+    def test_area_de_trabajo_y_fecha(self):
+        desde = datetime.datetime(2024, 1, 1)
+        self.assertUsaIndice(
+            Temperatura.objects.filter(area_de_trabajo='Área Fase Adulta', fecha_creacion__gte=desde),
+            'temperatura_area_fecha_idx',
+        )
+        self.assertUsaIndice(
+            Humedad.objects.filter(area_de_trabajo='Área Fase Adulta', fecha_creacion__gte=desde),
+            'humedad_area_fecha_idx',
+        )
+
+    def test_especie_cepa_y_fecha(self):
+        self.assertUsaIndice(
+            RegistroTemperaturaAgua.objects.filter(
+                especie='Aedes aegypti', cepa='Rockefeller', fecha__gte=datetime.date(2024, 1, 1),
+            ),
+            'tempagua_especie_cepa_idx',
+        )
+
+    def test_mortalidad_por_cepa(self):
+        self.assertUsaIndice(
+            Mortalidad_pupas.objects.filter(cepa='Rockefeller').order_by('-fecha_creacion'),
+            'mortalidad_cepa_fecha_idx',
+        )
+
+    def test_filtros_de_las_listas(self):
+        casos = [
+            (filtros.TEMPERATURA, {'desde': '2024-01-01', 'hasta': '2024-01-07'}, 'temperatura_creacion_id_idx'),
+            (filtros.TEMPERATURA, {'desde': '2024-01-01', 'area': 'Área Fase Adulta'}, 'temperatura_area_fecha_idx'),
+            (filtros.TEMPERATURA, {'area': 'Área Fase Adulta', 'hora': '22:00-06:00'}, 'temperatura_area_fecha_idx'),
+            (filtros.HUMEDAD, {'hasta': '2024-01-07', 'hora': '07:30'}, 'humedad_creacion_id_idx'),
+            (filtros.HUMEDAD, {'area': 'Área Fase Inmadura'}, 'humedad_area_fecha_idx'),
+            (filtros.VIDA, {'desde': '2024-01-01'}, 'vida_creacion_id_idx'),
+            (filtros.VIDA, {'especie': 'Aedes aegypti', 'cepa': 'Rockefeller'}, 'vida_especie_cepa_idx'),
+            (filtros.VIDA, {'cepa': 'Rockefeller', 'desde': '2024-01-01'}, 'vida_cepa_fecha_idx'),
+            (filtros.MORTALIDAD_PUPAS, {'cepa': 'Yaviza', 'hasta': '2024-01-07'}, 'mortalidad_cepa_fecha_idx'),
+            (filtros.REGISTRO_TEMPERATURA_AGUA, {'desde': '2024-01-01'}, 'tempagua_fecha_idx'),
+            (filtros.REGISTRO_TEMPERATURA_AGUA, {'cepa': 'Yaviza'}, 'tempagua_cepa_fecha_idx'),
+            (filtros.REGISTRO_TEMPERATURA_AGUA, {'especie': 'Aedes aegypti', 'desde': '2024-01-01'}, 'tempagua_especie_cepa_idx'),
+        ]
+        for filtro, params, indice in casos:
+            with self.subTest(modelo=filtro.modelo.__name__, params=params):
+                self.assertUsaIndice(filtro.modelo.objects.filter(filtro.condicion(params)), indice)
+
+
+# Caracteres con los que se arman las cadenas aleatorias: los que tienen
+# significado en SQL (comillas, escapes, separadores, comentarios) y algunos normales
+CARACTERES_SQL = "'\"\\(),;\n\r\t\0\x1a%_-#/*` aZ9ñé"
+
+
+def literal_sql(valor, aleatorio):
+    """Escribe ``valor`` como lo haría mysqldump, variando entre las formas equivalentes."""
+    if valor is None:
+        return aleatorio.choice(['NULL', 'null'])
+    if isinstance(valor, (int, Decimal)):
+        return str(valor)
+    comilla = aleatorio.choice('\'"')
+    partes = []
+    for caracter in valor:
+        if caracter == '\\':
+            partes.append('\\\\')
+        elif caracter == comilla:
+            partes.append(aleatorio.choice(['\\' + comilla, comilla * 2]))
+        elif caracter in '\'"':
+            partes.append(aleatorio.choice([caracter, '\\' + caracter]))
+        elif caracter in '\0\n\r\t\x1a':
+            escapes = {'\0': '\\0', '\n': '\\n', '\r': '\\r', '\t': '\\t', '\x1a': '\\Z'}
+            partes.append(aleatorio.choice([caracter, escapes[caracter]]))
+        else:
+            partes.append(caracter)
+    return comilla + ''.join(partes) + comilla
+
+
+def valor_aleatorio(aleatorio):
+    tipo = aleatorio.randrange(4)
+    if tipo == 0:
+        return None
+    if tipo == 1:
+        return aleatorio.randint(-10**12, 10**12)
+    if tipo == 2:
+        return Decimal(f"{aleatorio.randint(-9999, 9999)}.{aleatorio.randint(0, 99):02d}")
+    return ''.join(aleatorio.choice(CARACTERES_SQL) for _ in range(aleatorio.randint(0, 30)))
+
+
+def volcado_aleatorio(aleatorio):
+    """Devuelve ``(texto, filas esperadas)`` de un volcado con varias sentencias INSERT."""
+    partes = ["-- Volcado de prueba\n", "SET NAMES utf8mb4;\n", "/*!40101 SET @OLD=@@X */;\n"]
+    esperadas = []
+    for numero in range(aleatorio.randint(1, 4)):
+        tabla = f'tabla_{numero}'
+        columnas = aleatorio.randint(1, 6)
+        partes.append(
+            f"CREATE TABLE `{tabla}` (`id` int(11) NOT NULL COMMENT 'a;b', "
+            f"`obs` text DEFAULT NULL) ENGINE=InnoDB;\n"
+        )
+        filas = [
+            tuple(valor_aleatorio(aleatorio) for _ in range(columnas))
+            for _ in range(aleatorio.randint(1, 20))
+        ]
+        # Una fila por línea (phpMyAdmin) o todo en una línea (mysqldump --extended-insert)
+        separador = aleatorio.choice([',\n', ','])
+        tuplas = separador.join(
+            '(' + ', '.join(literal_sql(valor, aleatorio) for valor in fila) + ')' for fila in filas
+        )
+        partes.append(f"INSERT INTO `{tabla}` VALUES {tuplas};\n")
+        esperadas.extend((tabla, fila) for fila in filas)
+    return ''.join(partes), esperadas
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class PaginacionTests(TestCase):
+    """La paginación por clave recorre los registros en ambos sentidos sin repetir ni saltar filas."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('laboratorio', password='clave-de-prueba')
+        # Varias lecturas por instante: los empates de fecha_creacion se desempatan por id
+        inicio = datetime.datetime(2024, 3, 1, 7)
+        for i in range(24):
+            Temperatura.objects.create(temperatura=Decimal(20 + i % 10), hora=datetime.time(7), area_de_trabajo='Área Fase Adulta',
+                                       fecha_creacion=inicio + datetime.timedelta(hours=i // 4))
+        cls.orden = list(Temperatura.objects.order_by('-fecha_creacion', '-pk').values_list('pk', flat=True))
+
+    def paginas(self, tamano):
+        paginas, cursor = [], None
+        while True:
+            pagina = Temperatura.objects.pagina(cursor, tamano=tamano)
+            paginas.append(pagina)
+            if pagina.siguiente is None:
+                return paginas
+            cursor = pagina.siguiente
+
+    def ids(self, pagina):
+        return [obj.pk for obj in pagina]
+
+    def test_adelante_y_atras_devuelven_las_mismas_paginas(self):
+        for tamano in (1, 3, 5, 24, 30):
+            with self.subTest(tamano=tamano):
+                adelante = self.paginas(tamano)
+                self.assertEqual([pk for pagina in adelante for pk in self.ids(pagina)], self.orden)
+                self.assertIsNone(adelante[0].anterior)
+
+                # Desde la última página, con los cursores "anterior", hasta la primera
+                atras, pagina = [adelante[-1]], adelante[-1]
+                while pagina.anterior is not None:
+                    pagina = Temperatura.objects.pagina(pagina.anterior, ANTERIOR, tamano=tamano)
+                    atras.append(pagina)
+                self.assertEqual([self.ids(p) for p in reversed(atras)], [self.ids(p) for p in adelante])
+                self.assertEqual(pagina.siguiente, adelante[0].siguiente)
+
+    def test_empates_de_fecha_entre_paginas(self):
+        # Las cuatro lecturas más recientes tienen la misma fecha y quedan repartidas en dos páginas
+        primera = Temperatura.objects.pagina(tamano=3)
+        segunda = Temperatura.objects.pagina(primera.siguiente, tamano=3)
+        empatadas = [obj.pk for obj in Temperatura.objects.filter(fecha_creacion=primera.objetos[0].fecha_creacion)]
+        self.assertEqual(len(empatadas), 4)
+        self.assertEqual(self.ids(primera), sorted(empatadas, reverse=True)[:3])
+        self.assertEqual(self.ids(segunda)[0], min(empatadas))
+        self.assertEqual(segunda.objetos[0].fecha_creacion, primera.objetos[-1].fecha_creacion)
+
+        cursor = codificar_cursor(primera.objetos[1])
+        self.assertEqual(list(Temperatura.objects.despues_de(cursor).order_by('-fecha_creacion', '-pk').values_list('pk', flat=True)),
+                         self.orden[2:])
+        self.assertEqual(list(Temperatura.objects.antes_de(cursor).values_list('pk', flat=True)), self.orden[:1])
+        # Con el orden inverso desde la segunda página vuelve exactamente la primera
+        self.assertEqual(self.ids(Temperatura.objects.pagina(segunda.anterior, ANTERIOR, tamano=3)), self.ids(primera))
+
+    def test_cursor_alterado(self):
+        valido = codificar_cursor(Temperatura.objects.get(pk=self.orden[0]))
+        alterados = [
+            'no-es-un-cursor',
+            valido[:-3],
+            base64.urlsafe_b64encode(b'2024-03-01T07:00:00').decode(),
+            base64.urlsafe_b64encode(b'ayer|12').decode(),
+            base64.urlsafe_b64encode(b'2024-03-01T07:00:00|doce').decode(),
+            base64.urlsafe_b64encode('2024-03-01T07:00:00|1|2'.encode()).decode(),
+            base64.urlsafe_b64encode(b'\xff\xfe|1').decode(),
+        ]
+        self.client.force_login(self.usuario)
+        for cursor in alterados:
+            with self.subTest(cursor=cursor):
+                with self.assertRaises(CursorInvalido):
+                    Temperatura.objects.pagina(cursor)
+                response = self.client.get('/temperaturas/datos/', {'cursor': cursor, 'length': '5'})
+                self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get('/temperaturas/datos/', {'cursor': valido, 'length': '5'}).status_code, 200)
+
+
+class ResumenesTests(TestCase):
+    """Los resúmenes diarios y horarios siguen a las lecturas creadas, editadas y eliminadas desde las vistas."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('laboratorio', password='clave-de-prueba')
+        cls.lecturas = {}
+        for nombre, dia, hora, area, valor in [
+            ('baja', 1, 7, 'Área Fase Adulta', '21.0'),
+            ('media', 1, 7, 'Área Fase Adulta', '24.5'),
+            ('alta', 1, 7, 'Área Fase Adulta', '29.0'),
+            ('tarde', 1, 12, 'Área Fase Adulta', '27.5'),
+            ('inmadura', 1, 12, 'Área Fase Inmadura', '26.0'),
+            ('otro_dia', 2, 7, 'Área Fase Adulta', '22.5'),
+        ]:
+            cls.lecturas[nombre] = Temperatura.objects.create(
+                temperatura=Decimal(valor), max_temperatura=Decimal('30.0'), min_temperatura=Decimal('20.0'),
+                hora=datetime.time(hora, 15), area_de_trabajo=area, fecha_creacion=datetime.datetime(2024, 3, dia, hora, 15),
+            )
+        Humedad.objects.create(humedad=Decimal('80.0'), hora=datetime.time(7), area_de_trabajo='Área Fase Adulta',
+                               fecha_creacion=datetime.datetime(2024, 3, 1, 7))
+
+    def setUp(self):
+        self.client.force_login(self.usuario)
+
+    def assertResumenesIgualesALasLecturas(self):
+        """Compara los resúmenes con un cálculo desde cero, en Python, de las lecturas guardadas."""
+        diarios, horarios = defaultdict(list), defaultdict(list)
+        for modelo, (variable, campo) in resumenes.LECTURAS.items():
+            for valor, area, fecha, hora in modelo.objects.values_list(campo, 'area_de_trabajo', 'fecha_creacion', 'hora'):
+                if valor is not None:
+                    diarios[variable, area, fecha.date()].append(valor)
+                    horarios[variable, area, fecha.date(), hora.hour].append(valor)
+        totales = lambda grupos: {clave: (len(v), sum(v), min(v), max(v)) for clave, v in grupos.items()}
+        self.assertEqual({
+            (r.variable, r.area_de_trabajo, r.dia): (r.cantidad, r.suma, r.minimo, r.maximo)
+            for r in ResumenDiario.objects.all()
+        }, totales(diarios))
+        self.assertEqual({
+            (r.variable, r.area_de_trabajo, r.dia, r.hora): (r.cantidad, r.suma, r.minimo, r.maximo)
+            for r in ResumenHorario.objects.all()
+        }, totales(horarios))
+
+    def formulario(self, **cambios):
+        return {'temperatura': '25.0', 'max_temperatura': '30.0', 'min_temperatura': '20.0', 'hora': '07:15',
+                'area_de_trabajo': 'Área Fase Adulta', 'obs': '', **cambios}
+
+    def test_crear(self):
+        self.assertResumenesIgualesALasLecturas()
+        for valor in ('25.0', '19.5', '31.0'):
+            response = self.client.post(reverse('temperatura_create'), self.formulario(temperatura=valor))
+            self.assertEqual(response.status_code, 302)
+        hoy = ResumenDiario.objects.get(variable='temperatura', dia=datetime.date.today())
+        self.assertEqual((hoy.cantidad, hoy.minimo, hoy.maximo), (3, Decimal('19.5'), Decimal('31.0')))
+        self.assertResumenesIgualesALasLecturas()
+
+    def test_editar_cambia_de_area_y_hora(self):
+        # La máxima de su grupo pasa a otra área y otra hora: el grupo anterior se recalcula
+        alta = self.lecturas['alta']
+        response = self.client.post(reverse('temperatura_update', args=[alta.pk]),
+                                    self.formulario(temperatura='28.0', hora='12:40', area_de_trabajo='Área Fase Inmadura'))
+        self.assertEqual(response.status_code, 302)
+        adulta = ResumenHorario.objects.get(variable='temperatura', area_de_trabajo='Área Fase Adulta',
+                                            dia=datetime.date(2024, 3, 1), hora=7)
+        self.assertEqual((adulta.cantidad, adulta.maximo), (2, Decimal('24.5')))
+        self.assertResumenesIgualesALasLecturas()
+
+        # Solo cambia el valor, dentro del mismo grupo
+        response = self.client.post(reverse('temperatura_update', args=[self.lecturas['media'].pk]),
+                                    self.formulario(temperatura='20.5'))
+        self.assertEqual(response.status_code, 302)
+        self.assertResumenesIgualesALasLecturas()
+
+    def test_eliminar_el_minimo_y_el_maximo(self):
+        for nombre in ('baja', 'alta'):
+            response = self.client.post(reverse('temperatura_delete', args=[self.lecturas[nombre].pk]))
+            self.assertEqual(response.status_code, 302)
+            self.assertResumenesIgualesALasLecturas()
+        grupo = ResumenHorario.objects.get(variable='temperatura', area_de_trabajo='Área Fase Adulta',
+                                           dia=datetime.date(2024, 3, 1), hora=7)
+        self.assertEqual((grupo.cantidad, grupo.minimo, grupo.maximo), (1, Decimal('24.5'), Decimal('24.5')))
+
+        # La única lectura de un grupo: el grupo desaparece
+        self.client.post(reverse('temperatura_delete', args=[self.lecturas['otro_dia'].pk]))
+        self.assertFalse(ResumenDiario.objects.filter(variable='temperatura', dia=datetime.date(2024, 3, 2)).exists())
+        self.assertResumenesIgualesALasLecturas()
+
+    def test_analitica_lee_los_resumenes(self):
+        self.client.post(reverse('temperatura_delete', args=[self.lecturas['alta'].pk]))
+        params = {'area': 'Área Fase Adulta', 'hasta': '2024-03-01'}
+        esperado = ResumenDiario.objects.get(variable='temperatura', area_de_trabajo='Área Fase Adulta',
+                                             dia=datetime.date(2024, 3, 1))
+        consulta = resumenes.consultar(ResumenDiario, 'temperatura', 'Área Fase Adulta', hasta=datetime.date(2024, 3, 1))
+        self.assertEqual(list(consulta), [esperado])
+        with self.assertNumQueries(1):
+            diario = analitica.diario(analitica.TEMPERATURA, params)
+        self.assertEqual(diario.grupos, ('Área Fase Adulta',))
+        self.assertEqual((diario.cantidad.tolist(), diario.promedio.tolist(), diario.maximo.tolist()),
+                         ([esperado.cantidad], [float(esperado.promedio)], [27.5]))
+
+    def test_reconstruir_resumenes(self):
+        # Cambios que no pasan por las señales dejan los resúmenes desactualizados
+        Temperatura.objects.filter(pk=self.lecturas['alta'].pk).update(temperatura=Decimal('35.0'))
+        Temperatura.objects.filter(pk=self.lecturas['inmadura'].pk).delete()
+        ResumenHorario.objects.filter(hora=12).delete()
+        salida = io.StringIO()
+        call_command('reconstruir_resumenes', stdout=salida)
+        self.assertIn("Se crearon 3 resúmenes diarios y 4 resúmenes horarios.", salida.getvalue())
+        self.assertResumenesIgualesALasLecturas()
+
+
+class VolcadoTests(SimpleTestCase):
+    """Propiedades del tokenizador de volcados SQL, con volcados generados al azar."""
+
+    def test_ida_y_vuelta(self):
+        aleatorio = random.Random(1928)
+        for caso in range(300):
+            texto, esperadas = volcado_aleatorio(aleatorio)
+            tamano_bloque = aleatorio.choice([1, 2, 3, 5, 8, 13, 64, volcado.TAMANO_BLOQUE])
+            with self.subTest(caso=caso, tamano_bloque=tamano_bloque):
+                obtenidas = list(volcado.filas(io.StringIO(texto), tamano_bloque=tamano_bloque))
+                self.assertEqual(obtenidas, esperadas, texto)
+
+    def test_volcado_truncado(self):
+        # Cortado en cualquier punto: o bien falla con ErrorDeSintaxis, o bien
+        # devuelve un prefijo de las filas; nunca filas distintas
+        aleatorio = random.Random(2024)
+        for caso in range(300):
+            texto, esperadas = volcado_aleatorio(aleatorio)
+            corte = aleatorio.randrange(len(texto))
+            with self.subTest(caso=caso, corte=corte):
+                try:
+                    obtenidas = list(volcado.filas(io.StringIO(texto[:corte]), tamano_bloque=7))
+                except volcado.ErrorDeSintaxis:
+                    continue
+                self.assertEqual(obtenidas, esperadas[:len(obtenidas)])
+
+    def test_tipos_y_escapes(self):
+        self.assertEqual(
+            volcado.valores(
+                r"""(1, -2, 29.60, -1.5e3, NULL, null, 'a''b', "c""d", 'x\'y', 'C:\\ruta', '\%\_', 'l\n\0\Z'),"""
+                r"""('obs (con paréntesis), y coma; y punto y coma', '', "")"""
+            ),
+            [
+                (1, -2, Decimal('29.60'), Decimal('-1.5e3'), None, None, "a'b", 'c"d', "x'y", 'C:\\ruta',
+                 '\\%\\_', 'l\n\0\x1a'),
+                ('obs (con paréntesis), y coma; y punto y coma', '', ''),
+            ],
+        )
+
+    def test_filtra_tablas_y_sentencias(self):
+        texto = (
+            "INSERT IGNORE INTO `otra` (`id`) VALUES (1);\n"
+            "# comentario\n"
+            "INSERT INTO `lecturas` (`id`, `obs`) VALUES /* sin filas ocultas */ (1, 'a'), -- fin\n (2, NULL);\n"
+        )
+        self.assertEqual(
+            list(volcado.filas(io.StringIO(texto), tablas={'lecturas'})),
+            [('lecturas', (1, 'a')), ('lecturas', (2, None))],
+        )
+
+    def test_errores(self):
+        for texto in ["(1, 'sin cerrar)", "(1 2)", "(1, FALSO)", "(1,), (2)", "1, 2"]:
+            with self.subTest(texto=texto):
+                with self.assertRaises(volcado.ErrorDeSintaxis):
+                    volcado.valores(texto)
+
+    def test_volcado_del_sistema_anterior(self):
+        ruta = Path(settings.BASE_DIR) / 'bd_insecta.sql'
+        if not ruta.exists():
+            self.skipTest("bd_insecta.sql no está en el repositorio")
+        with open(ruta, encoding='utf-8') as archivo:
+            filas = list(volcado.filas(archivo))
+        with open(ruta, encoding='utf-8') as archivo:
+            self.assertEqual(list(volcado.filas(archivo, tamano_bloque=3)), filas)
+        cantidades = {}
+        for tabla, _ in filas:
+            cantidades[tabla] = cantidades.get(tabla, 0) + 1
+        self.assertEqual(cantidades['environmental_temperatures'], 1025)
+        self.assertEqual(cantidades['humidities'], 998)
+        self.assertEqual(cantidades['lives'], 897)
+        self.assertEqual(cantidades['pupa_mortality_in_breeders'], 22)
+        self.assertEqual(filas[0], (
+            'environmental_temperatures',
+            (1, Decimal('29.60'), Decimal('33.80'), Decimal('25.40'), '12:00 md', 'Area Fase Adulta', None, 8,
+             '2023-01-05 18:54:36', '2023-01-05 18:54:36'),
+        ))
+
+    def test_secciones_para_importar_en_paralelo(self):
+        texto = (
+            "-- ñandú\nCREATE TABLE `lives` (`id` int);\n"
+            "INSERT INTO `lives` VALUES (1, 'año'),\n(2, 'pequeño; (sí)');\n"
+            "INSERT INTO `otra` VALUES (3, 'x');\n"
+            "INSERT INTO `lives` VALUES (4, 'línea\\nnueva');\n"
+        )
+        contenido = texto.encode()
+        archivo = io.BytesIO(contenido)
+        tablas = {'lives'}
+        with tempfile.NamedTemporaryFile(suffix='.sql') as temporal:
+            temporal.write(contenido)
+            temporal.flush()
+            secciones = importacion_paralela.secciones(temporal.name, tablas)
+        self.assertEqual([s.tabla for s in secciones], ['lives', 'lives'])
+        filas = []
+        for seccion in secciones:
+            # Bloques de un byte: los caracteres de varios bytes quedan partidos
+            texto_seccion = importacion_paralela._TextoDeSeccion(archivo, seccion.inicio, seccion.fin)
+            filas += volcado.filas(texto_seccion, tablas=tablas, tamano_bloque=1)
+        self.assertEqual(filas, list(volcado.filas(io.StringIO(texto), tablas=tablas)))
+        self.assertEqual([valores[0] for _, valores in filas], [1, 2, 4])
+
+
+class ImportacionTests(TestCase):
+    """Importar el mismo volcado varias veces o reanudar una importación no duplica registros."""
+
+    def escribir_volcado(self, filas):
+        """Volcado con ``filas`` de environmental_temperatures: ``(id, temperatura, updated_at)``."""
+        archivo = tempfile.NamedTemporaryFile('w', suffix='.sql', encoding='utf-8', delete=False)
+        self.addCleanup(Path(archivo.name).unlink)
+        valores = ',\n'.join(
+            f"({id_sql}, {temperatura}, 30.0, 20.0, '7:30 am', 'Area Fase Adulta', NULL, 8, "
+            f"'2023-01-0{id_sql % 9 + 1} 07:35:00', '{actualizacion}')"
+            for id_sql, temperatura, actualizacion in filas
+        )
+        with archivo:
+            archivo.write(f"INSERT INTO `environmental_temperatures` VALUES\n{valores};\n")
+        return archivo.name
+
+    def importar(self, ruta, *argumentos):
+        salida = io.StringIO()
+        call_command('importar_volcado', ruta, *argumentos, stdout=salida, stderr=io.StringIO())
+        return salida.getvalue()
+
+    def assertResumenesAlDia(self):
+        incrementales = [list(modelo.objects.order_by('pk').values_list(
+            'variable', 'area_de_trabajo', 'dia', 'cantidad', 'suma', 'minimo', 'maximo',
+        )) for modelo in (ResumenDiario, ResumenHorario)]
+        resumenes.reconstruir()
+        reconstruidos = [list(modelo.objects.order_by('pk').values_list(
+            'variable', 'area_de_trabajo', 'dia', 'cantidad', 'suma', 'minimo', 'maximo',
+        )) for modelo in (ResumenDiario, ResumenHorario)]
+        self.assertEqual([sorted(filas) for filas in incrementales], [sorted(filas) for filas in reconstruidos])
+
+    def test_repetir_la_importacion_no_duplica(self):
+        ruta = self.escribir_volcado([(i, 25 + i, '2023-02-01 10:00:00') for i in range(1, 8)])
+        self.importar(ruta, '--lote', '3')
+        self.assertIn("Se saltaron 7 filas", self.importar(ruta))
+        salida = self.importar(ruta, '--reiniciar')
+        self.assertIn("Temperatura: 0 registros insertados, 0 actualizados, 7 sin cambios", salida)
+        self.assertEqual(Temperatura.objects.count(), 7)
+        self.assertEqual(
+            sorted(Temperatura.objects.values_list('id_anterior', flat=True)), list(range(1, 8)),
+        )
+        self.assertResumenesAlDia()
+
+    def test_actualiza_solo_las_filas_modificadas(self):
+        self.importar(self.escribir_volcado([(i, 25, '2023-02-01 10:00:00') for i in range(1, 6)]))
+        ruta = self.escribir_volcado([
+            (1, 25, '2023-02-01 10:00:00'),
+            (2, 31, '2023-03-01 09:00:00'),  # modificada después
+            (3, 40, '2023-01-15 09:00:00'),  # updated_at anterior: se conserva la importada
+            (4, 25, '2023-02-01 10:00:00'),
+            (5, 25, '2023-02-01 10:00:00'),
+            (6, 27, '2023-03-01 09:00:00'),  # nueva
+        ])
+        salida = self.importar(ruta)
+        self.assertIn("Temperatura: 1 registros insertados, 1 actualizados, 4 sin cambios", salida)
+        temperaturas = dict(Temperatura.objects.values_list('id_anterior', 'temperatura'))
+        self.assertEqual(temperaturas, {1: 25, 2: 31, 3: 25, 4: 25, 5: 25, 6: 27})
+        self.assertEqual(
+            Temperatura.objects.get(id_anterior=2).actualizacion_anterior, datetime.datetime(2023, 3, 1, 9),
+        )
+        self.assertResumenesAlDia()
+
+    def test_reanuda_desde_el_ultimo_lote_guardado(self):
+        ruta = self.escribir_volcado([(i, 20 + i, '2023-02-01 10:00:00') for i in range(1, 11)])
+        marcar = Importador._marcar
+        llamadas = []
+
+        def interrumpir_en_el_tercer_lote(importador, tabla):
+            llamadas.append(tabla)
+            if len(llamadas) == 3:
+                raise KeyboardInterrupt
+            marcar(importador, tabla)
+
+        with mock.patch.object(Importador, '_marcar', interrumpir_en_el_tercer_lote):
+            with self.assertRaises(KeyboardInterrupt):
+                self.importar(ruta, '--lote', '3')
+        # Los dos primeros lotes quedaron guardados con su punto de control; el tercero no
+        self.assertEqual(Temperatura.objects.count(), 6)
+
+        salida = self.importar(ruta, '--lote', '3')
+        self.assertIn("Se saltaron 6 filas", salida)
+        self.assertIn("Temperatura: 4 registros insertados, 0 actualizados, 0 sin cambios", salida)
+        self.assertEqual(sorted(Temperatura.objects.values_list('id_anterior', flat=True)), list(range(1, 11)))
+        self.assertResumenesAlDia()
+
+
+async def leer(response):
+    """El cuerpo completo de una respuesta por partes (asíncrona o síncrona)."""
+    if not response.is_async:
+        return b''.join(response.streaming_content)
+    return b''.join([parte async for parte in response.streaming_content])
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class DataTablesTests(TestCase):
+    """Los endpoints de DataTables respetan draw, start, length, el orden y la búsqueda, y piden sesión."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('laboratorio', password='clave-de-prueba')
+        cls.lecturas = [
+            Temperatura.objects.create(
+                temperatura=Decimal(20 + (i * 7) % 12), hora=datetime.time(7, 30),
+                area_de_trabajo='Área Fase Adulta' if i % 3 else 'Área Fase Inmadura', obs=f'lectura {i}',
+                fecha_creacion=datetime.datetime(2024, 3, 1) + datetime.timedelta(hours=i),
+            )
+            for i in range(12)
+        ]
+
+    def setUp(self):
+        caches['default'].clear()
+        self.client.force_login(self.usuario)
+
+    def pagina(self, **params):
+        response = self.client.get('/temperaturas/datos/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def ids(self, datos):
+        return [int(fila[0]) for fila in datos['data']]
+
+    def test_requieren_sesion(self):
+        anonimo = Client()
+        for vista in ('temperatura', 'humedad', 'vida', 'mortalidad_pupas', 'registrotemperaturaagua'):
+            urls = [reverse(f'{vista}_{accion}') for accion in ('list', 'data', 'export', 'create')]
+            urls += [reverse(f'{vista}_{accion}', args=[1]) for accion in ('observaciones', 'update', 'delete')]
+            for url in urls:
+                with self.subTest(url=url):
+                    response = anonimo.get(url)
+                    self.assertEqual(response.status_code, 302)
+                    self.assertIn(settings.LOGIN_URL, response['Location'])
+
+    def test_draw_start_y_length(self):
+        recientes = [lectura.pk for lectura in reversed(self.lecturas)]
+        datos = self.pagina(draw='7', start='0', length='5')
+        self.assertEqual((datos['draw'], datos['recordsTotal'], datos['recordsFiltered']), (7, 12, 12))
+        self.assertEqual(self.ids(datos), recientes[:5])
+        self.assertEqual(self.ids(self.pagina(start='10', length='5')), recientes[10:])
+        # Valores que no son números usan los de por defecto
+        datos = self.pagina(draw='x', start='-3', length='abc')
+        self.assertEqual((datos['draw'], self.ids(datos)), (0, recientes[:datatables.LONGITUD_PAGINA]))
+
+    def test_longitud_maxima(self):
+        with mock.patch.object(datatables, 'LONGITUD_MAXIMA', 4):
+            # Más que el máximo, y -1 ("todas" en DataTables), devuelven el máximo
+            for longitud in ('1000', '-1', '0'):
+                with self.subTest(length=longitud):
+                    self.assertEqual(len(self.pagina(length=longitud)['data']), 4)
+
+    def test_orden(self):
+        por_temperatura = sorted(self.lecturas, key=lambda lectura: (lectura.temperatura, lectura.pk))
+        datos = self.pagina(**{'order[0][column]': '1', 'order[0][dir]': 'asc', 'length': '12'})
+        self.assertEqual([Decimal(fila[1].replace(',', '.')) for fila in datos['data']],
+                         [lectura.temperatura for lectura in por_temperatura])
+        self.assertIsNone(datos['siguiente'])
+        datos = self.pagina(**{'order[0][column]': '1', 'order[0][dir]': 'desc', 'length': '1'})
+        self.assertEqual(Decimal(datos['data'][0][1].replace(',', '.')), max(l.temperatura for l in self.lecturas))
+        # Columnas sin campo (acciones) o fuera de rango usan el orden por defecto
+        for columna in ('9', '99', 'x'):
+            with self.subTest(columna=columna):
+                datos = self.pagina(**{'order[0][column]': columna, 'order[0][dir]': 'asc', 'length': '3'})
+                self.assertEqual(self.ids(datos), [lectura.pk for lectura in reversed(self.lecturas[-3:])])
+
+    def test_busqueda(self):
+        datos = self.pagina(**{'search[value]': 'inmadura', 'length': '100'})
+        inmaduras = [l.pk for l in reversed(self.lecturas) if l.area_de_trabajo == 'Área Fase Inmadura']
+        self.assertEqual((datos['recordsTotal'], datos['recordsFiltered']), (12, len(inmaduras)))
+        self.assertEqual(self.ids(datos), inmaduras)
+        # Un número busca también por id
+        datos = self.pagina(**{'search[value]': str(self.lecturas[5].pk)})
+        self.assertIn(self.lecturas[5].pk, self.ids(datos))
+        self.assertEqual(self.pagina(**{'search[value]': 'no aparece'})['data'], [])
+
+    def test_busqueda_de_digitos_que_no_son_un_id(self):
+        # '²' y los dígitos de otras escrituras no son un número para int(); un número
+        # demasiado grande no cabe en el id: se buscan solo como texto
+        for termino in ('²', '٣', '9' * 30):
+            with self.subTest(termino=termino):
+                datos = self.pagina(**{'search[value]': termino})
+                self.assertEqual((datos['recordsFiltered'], datos['data']), (0, []))
+
+
+class IngestaTests(TestCase):
+    """Los lotes de los registradores se guardan completos o no se guarda nada, con los errores por fila."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.registrador = User.objects.create_user('registrador', password='clave-de-prueba')
+        cls.registrador.user_permissions.add(Permission.objects.get(codename='add_temperatura'))
+        User.objects.create_user('laboratorio', password='clave-de-prueba')
+
+    def enviar(self, cuerpo, tipo='application/json', usuario='registrador', clave='clave-de-prueba', url='/temperaturas/ingesta/'):
+        cabecera = 'Basic ' + base64.b64encode(f'{usuario}:{clave}'.encode()).decode()
+        if not isinstance(cuerpo, str):
+            cuerpo = json.dumps(cuerpo)
+        return self.client.post(url, cuerpo, content_type=tipo, headers={'authorization': cabecera})
+
+    def lectura(self, **cambios):
+        return {'temperatura': '25.5', 'max_temperatura': '30.0', 'min_temperatura': '20.0', 'hora': '07:30',
+                'area_de_trabajo': 'Área Fase Adulta', 'obs': '', 'fecha_creacion': '2024-03-01T07:30:00', **cambios}
+
+    def test_credenciales_y_permisos(self):
+        response = self.client.post('/temperaturas/ingesta/', '[]', content_type='application/json')
+        self.assertEqual(response.status_code, 401)
+        self.assertIn('Basic', response['WWW-Authenticate'])
+        self.assertEqual(self.enviar([self.lectura()], clave='otra').status_code, 401)
+        self.assertEqual(self.enviar([self.lectura()], usuario='laboratorio').status_code, 403)
+        # El permiso es por modelo: add_temperatura no permite cargar humedades
+        self.assertEqual(self.enviar([], url='/humedades/ingesta/').status_code, 403)
+        self.assertFalse(Temperatura.objects.exists())
+
+    def test_lote_json(self):
+        response = self.enviar({'lecturas': [self.lectura(), self.lectura(hora='12:00', temperatura=31, fecha_creacion=None)]})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json(), {'creados': 2, 'errores': []})
+        primera, segunda = Temperatura.objects.order_by('hora')
+        self.assertEqual((primera.temperatura, primera.hora, primera.fecha_creacion),
+                         (Decimal('25.5'), datetime.time(7, 30), datetime.datetime(2024, 3, 1, 7, 30)))
+        # Sin fecha_creacion se usa la hora de llegada
+        self.assertEqual((segunda.temperatura, segunda.fecha_creacion.date()), (Decimal('31'), datetime.date.today()))
+        self.assertEqual(self.enviar([self.lectura()] * 2).status_code, 201)
+        self.assertEqual(Temperatura.objects.count(), 4)
+
+    def test_lote_csv(self):
+        filas = [self.lectura(), self.lectura(hora='15:00', obs='ventilador apagado')]
+        texto = ','.join(filas[0]) + '\n' + '\n'.join(','.join(fila.values()) for fila in filas) + '\n'
+        response = self.enviar(texto, tipo='text/csv')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['creados'], 2)
+        self.assertEqual(list(Temperatura.objects.order_by('hora').values_list('hora', 'obs')),
+                         [(datetime.time(7, 30), ''), (datetime.time(15), 'ventilador apagado')])
+
+    def test_errores_por_fila_y_nada_guardado(self):
+        response = self.enviar([
+            self.lectura(),
+            self.lectura(temperatura='caliente', area_de_trabajo='Área del laboratorio de campo'),
+            self.lectura(),
+            self.lectura(hora=730),
+            self.lectura(fecha_creacion=1709278200.5),
+            'no es una lectura',
+        ])
+        self.assertEqual(response.status_code, 400)
+        datos = response.json()
+        self.assertEqual(datos['creados'], 0)
+        self.assertEqual({error['fila']: sorted(error['errores']) for error in datos['errores']}, {
+            1: ['area_de_trabajo', 'temperatura'],
+            3: ['hora'],
+            4: ['fecha_creacion'],
+            5: ['__all__'],
+        })
+        self.assertFalse(Temperatura.objects.exists())
+        self.assertFalse(ResumenDiario.objects.exists())
+
+    def test_cuerpo_invalido(self):
+        for cuerpo, tipo in (('{"lecturas": ', 'application/json'), ('{"otra": []}', 'application/json'),
+                             ('<lecturas/>', 'application/xml')):
+            with self.subTest(tipo=tipo, cuerpo=cuerpo):
+                response = self.enviar(cuerpo, tipo=tipo)
+                self.assertEqual(response.status_code, 400)
+                self.assertIsNone(response.json()['errores'][0]['fila'])
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class CacheListasTests(TestCase):
+    """Las páginas de lista se sirven desde la caché hasta que cambia un registro del modelo."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('laboratorio', password='clave-de-prueba')
+        Temperatura.objects.create(temperatura=Decimal('24.5'), hora=datetime.time(7, 30), area_de_trabajo='Área Fase Adulta')
+
+    def setUp(self):
+        caches['default'].clear()
+
+    def pedir(self, vista, usuario=None):
+        request = RequestFactory().get('/')
+        request.user = usuario or self.usuario
+
+        async def auser():
+            return request.user
+        request.auser = auser
+        return async_to_sync(vista)(request)
+
+    def test_la_segunda_peticion_no_consulta_la_base_de_datos(self):
+        fallos = cache_listas.fallos['insect_app.temperatura']
+        aciertos = cache_listas.aciertos['insect_app.temperatura']
+        primera = self.pedir(views.temperatura_list)
+        with self.assertNumQueries(0):
+            segunda = self.pedir(views.temperatura_list)
+        self.assertEqual(segunda.status_code, 200)
+        self.assertEqual(segunda.content, primera.content)
+        self.assertEqual(cache_listas.fallos['insect_app.temperatura'], fallos + 1)
+        self.assertEqual(cache_listas.aciertos['insect_app.temperatura'], aciertos + 1)
+
+    def test_guardar_o_eliminar_un_registro_renueva_la_pagina(self):
+        self.pedir(views.temperatura_list)
+        with self.captureOnCommitCallbacks(execute=True):
+            nueva = Temperatura.objects.create(
+                temperatura=Decimal('31.7'), hora=datetime.time(12, 0), area_de_trabajo='Área Fase Adulta',
+            )
+        self.assertContains(self.pedir(views.temperatura_list), '31,7')
+        with self.captureOnCommitCallbacks(execute=True):
+            nueva.delete()
+        self.assertNotContains(self.pedir(views.temperatura_list), '31,7')
+        # Los cambios en otro modelo no afectan a esta lista
+        version = cache_listas.version(Temperatura)
+        with self.captureOnCommitCallbacks(execute=True):
+            Humedad.objects.create(humedad=Decimal('80.0'), hora=datetime.time(7, 30), area_de_trabajo='Área Fase Adulta')
+        self.assertEqual(cache_listas.version(Temperatura), version)
+
+    def test_cada_usuario_tiene_su_pagina(self):
+        otro = User.objects.create_user('tecnico', password='clave-de-prueba')
+        self.assertContains(self.pedir(views.temperatura_list), 'laboratorio')
+        self.assertContains(self.pedir(views.temperatura_list, otro), 'tecnico')
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class GetCondicionalTests(TestCase):
+    """Las listas y exportaciones responden 304 sin leer filas si el navegador ya tiene la versión actual."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('laboratorio', password='clave-de-prueba')
+        cls.temperatura = Temperatura.objects.create(
+            temperatura=Decimal('24.5'), hora=datetime.time(7, 30), area_de_trabajo='Área Fase Adulta',
+        )
+
+    def setUp(self):
+        caches['default'].clear()
+        self.client.force_login(self.usuario)
+
+    def consultas_a_registros(self, url, **cabeceras):
+        """La respuesta y las consultas que tocan la tabla de Temperatura."""
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(url, headers=cabeceras)
+        return response, [c['sql'] for c in consultas if 'insect_app_temperatura' in c['sql']]
+
+    def test_lista_responde_304_sin_leer_filas(self):
+        primera, _ = self.consultas_a_registros('/temperaturas/')
+        self.assertEqual(primera.status_code, 200)
+        self.assertIn('ETag', primera)
+        self.assertIn('Last-Modified', primera)
+
+        caches['default'].clear()
+        response, consultas = self.consultas_a_registros('/temperaturas/', if_none_match=primera['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        # Solo el validador (MAX y COUNT), ninguna consulta que traiga filas
+        self.assertEqual(len(consultas), 1, consultas)
+        self.assertIn('MAX', consultas[0].upper())
+        self.assertIn('COUNT', consultas[0].upper())
+
+        # Con el validador ya en la caché, el 304 no consulta la tabla
+        response, consultas = self.consultas_a_registros('/temperaturas/', if_none_match=primera['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(consultas, [])
+
+        response, consultas = self.consultas_a_registros('/temperaturas/', if_modified_since=primera['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(consultas, [])
+
+    def test_exportacion_responde_304_sin_leer_filas(self):
+        primera = self.client.get('/temperaturas/exportar/')
+        self.assertEqual(primera.status_code, 200)
+        async_to_sync(leer)(primera)
+        response, consultas = self.consultas_a_registros('/temperaturas/exportar/', if_none_match=primera['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(consultas, [])
+
+    def test_un_cambio_o_un_usuario_distinto_cambian_el_etag(self):
+        etag = self.client.get('/temperaturas/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.temperatura.obs = 'revisada'
+            self.temperatura.save()
+        response = self.client.get('/temperaturas/', headers={'if_none_match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+        etag = response['ETag']
+        self.client.force_login(User.objects.create_user('tecnico', password='clave-de-prueba'))
+        response = self.client.get('/temperaturas/', headers={'if_none_match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'tecnico')
+
+
+
+class LoginTests(TestCase):
+    """El inicio de sesión verifica la contraseña una sola vez."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('laboratorio', password='clave-de-prueba')
+
+    def test_un_solo_hash_por_inicio_de_sesion(self):
+        with mock.patch.object(claves.PBKDF2Ajustable, 'verify', autospec=True,
+                               side_effect=claves.PBKDF2Ajustable.verify) as verify:
+            response = self.client.post('/', {'username': 'laboratorio', 'password': 'clave-de-prueba'})
+        self.assertRedirects(response, '/temperaturas/', fetch_redirect_response=False)
+        self.assertEqual(verify.call_count, 1)
+        self.assertEqual(self.client.session['_auth_user_id'], str(self.usuario.pk))
+
+        self.client.logout()
+        response = self.client.post('/', {'username': 'laboratorio', 'password': 'otra'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['form'].non_field_errors())
+        self.assertNotIn('_auth_user_id', self.client.session)
+
+    @override_settings(CLAVES_ITERACIONES=1000)
+    def test_las_iteraciones_se_ajustan_al_iniciar_sesion(self):
+        self.assertTrue(self.usuario.password.startswith('pbkdf2_sha256$'))
+        self.client.post('/', {'username': 'laboratorio', 'password': 'clave-de-prueba'})
+        self.usuario.refresh_from_db()
+        self.assertTrue(self.usuario.password.startswith('pbkdf2_sha256$1000$'))
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class SesionUsuarioTests(TestCase):
+    """Con la sesión en la caché y el usuario guardado en el proceso, autenticarse no consulta la base de datos;
+    un cambio del usuario en cualquier proceso lo descarta en todos."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('laboratorio', password='clave-de-prueba')
+        Temperatura.objects.create(temperatura=Decimal('24.5'), hora=datetime.time(7, 30), area_de_trabajo='Área Fase Adulta')
+
+    def setUp(self):
+        caches['default'].clear()
+        usuarios.vaciar()
+
+    def consultas(self, cliente=None, url='/temperaturas/'):
+        with CaptureQueriesContext(connection) as consultas:
+            response = (cliente or self.client).get(url)
+        return response, [c['sql'] for c in consultas]
+
+    def test_peticion_con_sesion_sin_consultas(self):
+        # La lista ya está en la caché: las únicas consultas posibles son las de la autenticación.
+        # Con la sesión en la base de datos y el ModelBackend de Django: la sesión y el usuario
+        with override_settings(SESSION_ENGINE='django.contrib.sessions.backends.db',
+                               AUTHENTICATION_BACKENDS=['django.contrib.auth.backends.ModelBackend']):
+            cliente = Client()
+            cliente.force_login(self.usuario)
+            cliente.get('/temperaturas/')
+            response, consultas = self.consultas(cliente)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(consultas), 2, consultas)
+        self.assertIn('django_session', consultas[0])
+        self.assertIn('auth_user', consultas[1])
+
+        self.client.force_login(self.usuario)
+        self.client.get('/temperaturas/')
+        response, consultas = self.consultas()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(consultas, [])
+
+    def test_cambio_de_contrasena_y_cierre_de_sesion(self):
+        self.client.force_login(self.usuario)
+        self.assertEqual(self.client.get('/temperaturas/').status_code, 200)
+        self.usuario.set_password('otra-clave-de-prueba')
+        self.usuario.save()
+        # El usuario guardado tenía la contraseña anterior: la sesión ya no vale
+        self.assertEqual(self.consultas()[0].status_code, 302)
+
+        self.client.force_login(self.usuario)
+        self.assertEqual(self.client.get('/temperaturas/').status_code, 200)
+        self.assertIsNotNone(usuarios._guardado(self.usuario.pk, usuarios.version(self.usuario.pk)))
+        self.client.get('/logout/')
+        self.assertIsNone(usuarios._guardado(self.usuario.pk, usuarios.version(self.usuario.pk)))
+        self.assertEqual(self.client.get('/temperaturas/').status_code, 302)
+
+    def test_cambio_en_otro_proceso(self):
+        self.client.force_login(self.usuario)
+        self.assertEqual(self.client.get('/temperaturas/').status_code, 200)
+        # Otro worker guarda el usuario: este proceso conserva su copia, pero la versión compartida cambia
+        with mock.patch.object(usuarios, 'olvidar'), self.captureOnCommitCallbacks(execute=True):
+            self.usuario.set_password('otra-clave-de-prueba')
+            self.usuario.save()
+        self.assertEqual(self.consultas()[0].status_code, 302)
+
+        self.client.force_login(self.usuario)
+        self.assertEqual(self.client.get('/temperaturas/').status_code, 200)
+        with mock.patch.object(usuarios, 'olvidar'), self.captureOnCommitCallbacks(execute=True):
+            self.usuario.is_active = False
+            self.usuario.save()
+        self.assertEqual(self.client.get('/temperaturas/').status_code, 302)
+
+
+class PoolConexionesTests(SimpleTestCase):
+    """El pool de conexiones (``conexiones.Pool``) con conexiones reales de sqlite3."""
+
+    def setUp(self):
+        self.abiertas = 0
+        self.maximo_abiertas = 0
+        self.candado = threading.Lock()
+
+    def crear(self):
+        with self.candado:
+            self.abiertas += 1
+            self.maximo_abiertas = max(self.maximo_abiertas, self.abiertas)
+        return sqlite3.connect(':memory:', check_same_thread=False)
+
+    def cerrar(self, conexion):
+        with self.candado:
+            self.abiertas -= 1
+        conexion.close()
+
+    @staticmethod
+    def verificar(conexion):
+        try:
+            conexion.execute('SELECT 1')
+        except sqlite3.Error:
+            return False
+        return True
+
+    def test_conexiones_acotadas_con_carga_concurrente(self):
+        pool = conexiones.Pool(self.verificar, self.cerrar, maximo=4, espera=10)
+
+        def peticiones():
+            for _ in range(25):
+                conexion = pool.obtener(self.crear)
+                conexion.execute('SELECT 1').fetchall()
+                time.sleep(0.001)
+                pool.devolver(conexion)
+
+        hilos = [threading.Thread(target=peticiones) for _ in range(16)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        estadisticas = pool.estadisticas()
+        self.assertLessEqual(self.maximo_abiertas, 4)
+        self.assertLessEqual(estadisticas['creadas'], 4)
+        self.assertEqual(estadisticas['en_uso'], 0)
+        self.assertEqual(estadisticas['libres'], self.abiertas)
+        self.assertGreater(estadisticas['esperas'], 0)
+        self.assertEqual(estadisticas['agotado'], 0)
+        pool.vaciar()
+        self.assertEqual(self.abiertas, 0)
+
+    def test_espera_agotada_y_conexiones_que_no_se_reutilizan(self):
+        pool = conexiones.Pool(self.verificar, self.cerrar, maximo=1, espera=0.05, verificar_despues=0)
+        conexion = pool.obtener(self.crear)
+        with self.assertRaises(conexiones.PoolAgotado):
+            pool.obtener(self.crear)
+        pool.devolver(conexion)
+        self.assertIs(pool.obtener(self.crear), conexion)
+
+        # El servidor cerró la conexión mientras estaba libre: se abre otra
+        pool.devolver(conexion)
+        conexion.close()
+        nueva = pool.obtener(self.crear)
+        self.assertIsNot(nueva, conexion)
+        self.assertTrue(self.verificar(nueva))
+
+        # Devuelta a medio usar, o más vieja que ``vida``: se cierra
+        pool.devolver(nueva, reutilizable=False)
+        self.assertEqual(pool.estadisticas()['libres'], 0)
+        pool.vida = 0
+        pool.devolver(pool.obtener(self.crear))
+        estadisticas = pool.estadisticas()
+        self.assertEqual((estadisticas['en_uso'], estadisticas['libres'], estadisticas['creadas']), (0, 0, 3))
+        self.assertEqual(self.abiertas, 0)
+
+
+@skipUnless(settings.DATABASES['default']['ENGINE'] == 'insect_app.bd_mysql', "Requiere MariaDB con el pool")
+class PoolMariaDBTests(TransactionTestCase):
+    """Con el backend ``insect_app.bd_mysql``, las conexiones abiertas no pasan del máximo del pool."""
+
+    def conectadas(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SHOW STATUS LIKE 'Threads_connected'")
+            return int(cursor.fetchone()[1])
+
+    def test_conexiones_acotadas_con_carga_concurrente(self):
+        maximo = connection.pool.maximo
+        antes = self.conectadas()
+        maximo_conectadas = antes
+
+        def peticiones():
+            # Como cada petición: toma la conexión, consulta y la cierra al terminar
+            for _ in range(10):
+                User.objects.count()
+                connections['default'].close()
+
+        hilos = [threading.Thread(target=peticiones) for _ in range(maximo * 3)]
+        for hilo in hilos:
+            hilo.start()
+        while any(hilo.is_alive() for hilo in hilos):
+            maximo_conectadas = max(maximo_conectadas, self.conectadas())
+            time.sleep(0.005)
+        for hilo in hilos:
+            hilo.join()
+
+        self.assertLessEqual(maximo_conectadas - antes, maximo)
+        estadisticas = connection.pool.estadisticas()
+        self.assertLessEqual(estadisticas['creadas'] - estadisticas['descartadas'], maximo)
+        self.assertEqual(estadisticas['agotado'], 0)
+
+
+class MetricasTests(TestCase):
+    """``/metrics`` publica las métricas por vista y solo responde con token o a usuarios staff."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user('administrador', password='clave-de-prueba', is_staff=True)
+        cls.usuario = User.objects.create_user('laboratorio', password='clave-de-prueba')
+        Temperatura.objects.create(temperatura=Decimal('24.5'), hora=datetime.time(7, 30), area_de_trabajo='Área Fase Adulta')
+
+    def setUp(self):
+        caches['default'].clear()
+
+    def test_requiere_token_o_staff(self):
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 401)
+        self.assertIn('Bearer', response['WWW-Authenticate'])
+
+        self.client.force_login(self.usuario)
+        self.assertEqual(self.client.get('/metrics').status_code, 401)
+
+        self.client.force_login(self.staff)
+        self.assertEqual(self.client.get('/metrics').status_code, 200)
+
+    @override_settings(METRICAS_TOKEN='token-de-prueba')
+    def test_token_de_prometheus(self):
+        self.assertEqual(self.client.get('/metrics', headers={'authorization': 'Bearer otro'}).status_code, 401)
+        response = self.client.get('/metrics', headers={'authorization': 'Bearer token-de-prueba'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+
+    def test_metricas_por_vista(self):
+        self.client.force_login(self.staff)
+        self.assertEqual(self.client.get('/temperaturas/').status_code, 200)
+        texto = self.client.get('/metrics').content.decode()
+        serie = 'vista="temperatura_list"'
+        for metrica in ('insectario_peticion_segundos_count', 'insectario_peticion_consultas_count',
+                        'insectario_peticion_bd_segundos_sum', 'insectario_respuesta_bytes_sum',
+                        'insectario_plantilla_segundos_sum'):
+            self.assertTrue(
+                any(linea.startswith(metrica + '{') and serie in linea for linea in texto.splitlines()),
+                metrica,
+            )
+        self.assertIn('insectario_cache_listas_total{modelo="insect_app.temperatura",resultado="fallo"}', texto)
+
+    async def test_consultas_de_las_vistas_asincronas(self):
+        # El ORM de las vistas asíncronas corre en el hilo de sync_to_async, con sus propias conexiones
+        etiquetas = {'vista': 'temperatura_data', 'metodo': 'GET'}
+        antes = REGISTRY.get_sample_value('insectario_peticion_consultas_sum', etiquetas) or 0
+        cliente = AsyncClient()
+        await cliente.aforce_login(self.staff)
+        self.assertEqual((await cliente.get('/temperaturas/datos/', {'length': '10'})).status_code, 200)
+        self.assertGreater(REGISTRY.get_sample_value('insectario_peticion_consultas_sum', etiquetas) - antes, 0)
+        self.assertGreater(REGISTRY.get_sample_value('insectario_peticion_bd_segundos_sum', etiquetas), 0)
+
+    def test_metodos_no_estandar(self):
+        # Un método inventado por el cliente no crea una serie por cada nombre
+        antes = REGISTRY.get_sample_value('insectario_peticion_segundos_count', {'vista': 'sin_ruta', 'metodo': 'otro'}) or 0
+        for metodo in ('FOOBAR', 'PROPFIND', 'M-SEARCH'):
+            self.client.generic(metodo, '/no-existe/')
+        self.assertEqual(REGISTRY.get_sample_value('insectario_peticion_segundos_count', {'vista': 'sin_ruta', 'metodo': 'otro'}), antes + 3)
+        texto = generate_latest(REGISTRY).decode()
+        self.assertNotIn('metodo="FOOBAR"', texto)
+        self.assertNotIn('metodo="PROPFIND"', texto)
+
+    def test_gunicorn_crea_el_directorio_de_las_metricas(self):
+        # La imagen no lo crea: lo crea gunicorn al arrancar, antes de cargar la aplicación
+        configuracion = settings.BASE_DIR / 'gunicorn.conf.py'
+        with tempfile.TemporaryDirectory() as temporal:
+            directorio = str(Path(temporal) / 'metricas')
+            codigo = (
+                f"import runpy; runpy.run_path({str(configuracion)!r})['on_starting'](None); "
+                "from prometheus_client import Histogram; Histogram('prueba', 'Prueba.').observe(1)"
+            )
+            entorno = {**os.environ, 'PROMETHEUS_MULTIPROC_DIR': directorio}
+            subprocess.run([sys.executable, '-c', codigo], env=entorno, check=True)
+            self.assertTrue(list(Path(directorio).glob('histogram_*.db')))
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class VistasAsincronasTests(TestCase):
+    """Las listas, páginas de DataTables y exportaciones se sirven con vistas asíncronas."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('laboratorio', password='clave-de-prueba')
+        for i in range(30):
+            Temperatura.objects.create(
+                temperatura=Decimal('24.5') + i, hora=datetime.time(7, 30),
+                area_de_trabajo='Área Fase Adulta' if i % 2 else 'Área Fase Inmadura', obs=f'lectura {i}',
+            )
+
+    def setUp(self):
+        caches['default'].clear()
+        self.async_client = AsyncClient()
+
+    async def test_pagina_de_datatables(self):
+        await self.async_client.aforce_login(self.usuario)
+        recientes = [pk async for pk in Temperatura.objects.order_by('-fecha_creacion', '-id').values_list('pk', flat=True)]
+        adultas = [pk async for pk in Temperatura.objects.filter(area_de_trabajo='Área Fase Adulta')
+                   .order_by('-fecha_creacion', '-id').values_list('pk', flat=True)]
+        por_temperatura = [pk async for pk in Temperatura.objects.order_by('temperatura', 'id').values_list('pk', flat=True)]
+        for params, total, ids in (({'draw': '3', 'length': '10'}, 30, recientes[:10]),
+                                   ({'length': '5', 'search[value]': 'Adulta'}, 15, adultas[:5]),
+                                   ({'order[0][column]': '1', 'order[0][dir]': 'asc', 'start': '10'}, 30, por_temperatura[10:15])):
+            datos = (await self.async_client.get('/temperaturas/datos/', params)).json()
+            self.assertEqual(datos['draw'], int(params.get('draw', 0)))
+            self.assertEqual((datos['recordsTotal'], datos['recordsFiltered']), (30, total))
+            self.assertEqual([int(fila[0]) for fila in datos['data']], ids)
+
+        primera = (await self.async_client.get('/temperaturas/datos/', {'length': '10'})).json()
+        siguiente = (await self.async_client.get('/temperaturas/datos/', {'length': '10', 'cursor': primera['siguiente']})).json()
+        self.assertEqual(len(siguiente['data']), 10)
+        self.assertLess(int(siguiente['data'][0][0]), int(primera['data'][-1][0]))
+        response = await self.async_client.get('/temperaturas/datos/', {'cursor': 'no-es-un-cursor'})
+        self.assertEqual(response.status_code, 400)
+
+    async def test_exportaciones(self):
+        await self.async_client.aforce_login(self.usuario)
+        response = await self.async_client.get('/temperaturas/exportar/', {'area': 'Área Fase Adulta'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_async)
+        lineas = (await leer(response)).decode('utf-8-sig').splitlines()
+        self.assertEqual(lineas[0].split(','), exportar.TEMPERATURA.encabezados)
+        adultas = [pk async for pk in Temperatura.objects.filter(area_de_trabajo='Área Fase Adulta')
+                   .order_by('-fecha_creacion', '-id').values_list('pk', flat=True)]
+        self.assertEqual([int(linea.split(',')[0]) for linea in lineas[1:]], adultas)
+
+        response = await self.async_client.get('/temperaturas/exportar/', {'formato': 'xlsx'})
+        self.assertIn('spreadsheetml', response['Content-Type'])
+        self.assertTrue((await leer(response)).startswith(b'PK'))
+        for params in ({'formato': 'pdf'}, {'desde': 'ayer'}):
+            self.assertEqual((await self.async_client.get('/temperaturas/exportar/', params)).status_code, 400)
+
+    async def test_lista(self):
+        await self.async_client.aforce_login(self.usuario)
+        response = await self.async_client.get('/temperaturas/')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'laboratorio')
+        self.assertContains(response, '53,5')
+        self.assertEqual((await self.async_client.get('/temperaturas/', headers={'if_none_match': response['ETag']})).status_code, 304)
+        # Sin sesión redirige al login, como las vistas síncronas
+        response = await AsyncClient().get('/temperaturas/exportar/')
+        self.assertEqual(response.status_code, 302)
+
+
+class GenerarDatosTests(TestCase):
+    """``generar_datos`` sigue el ritmo diario del volcado y la misma semilla da los mismos datos."""
+
+    def generar(self, **opciones):
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('generar_datos', desde=datetime.date(2024, 1, 1), stdout=io.StringIO(), **opciones)
+
+    def test_ritmo_diario_y_opciones_de_los_formularios(self):
+        # 2024-01-01 a 2024-01-14: diez días hábiles
+        self.generar(dias=14, sitios=2, dias_por_bloque=4)
+        self.assertEqual(Temperatura.objects.count(), 10 * 2 * 2 * 3)
+        self.assertEqual(Humedad.objects.count(), 10 * 2 * 2 * 3)
+        self.assertEqual(
+            set(Temperatura.objects.values_list('hora', flat=True)),
+            {datetime.time(7, 30), datetime.time(12, 0), datetime.time(15, 0)},
+        )
+        self.assertEqual(set(Humedad.objects.values_list('area_de_trabajo', flat=True)), {'Área Fase Inmadura', 'Área Fase Adulta'})
+        self.assertFalse(Temperatura.objects.filter(fecha_creacion__week_day__in=[1, 7]).exists())
+        for lectura in Temperatura.objects.all():
+            self.assertLessEqual(lectura.min_temperatura, lectura.temperatura)
+            self.assertLessEqual(lectura.temperatura, lectura.max_temperatura)
+        cepas = {valor for valor, _ in forms.CEPAS if valor}
+        self.assertTrue(set(Vida.objects.values_list('cepa', flat=True)) <= cepas)
+        self.assertTrue(set(Mortalidad_pupas.objects.values_list('cepa', flat=True)) <= cepas)
+        self.assertTrue(RegistroTemperaturaAgua.objects.exists())
+        # Los resúmenes se reconstruyen después de la carga
+        self.assertEqual(ResumenDiario.objects.filter(variable='temperatura').count(), 10 * 2)
+
+    def test_misma_semilla_mismos_datos(self):
+        campos = ('temperatura', 'max_temperatura', 'min_temperatura', 'hora', 'area_de_trabajo', 'fecha_creacion')
+        self.generar(dias=7, semilla=7)
+        primera = list(Temperatura.objects.order_by('id').values_list(*campos))
+        Temperatura.objects.all().delete()
+        self.generar(dias=7, semilla=7)
+        self.assertEqual(list(Temperatura.objects.order_by('id').values_list(*campos)), primera)
+
+
+class EstaticosTests(SimpleTestCase):
+    """Las librerías de la interfaz se sirven desde static/, con hash, comprimidas y con caché permanente."""
+
+    def test_sin_cdn(self):
+        html = Client().get('/').content.decode()
+        self.assertNotIn('https://', html)
+        self.assertIn('/static/vendor/bootstrap-5.3.0/css/bootstrap.min.css', html)
+        self.assertIn('/static/vendor/jquery-3.7.1/jquery.min.js', html)
+        # Sin collectstatic los nombres no llevan hash
+        self.assertIn('/static/img/favicon.ico', html)
+
+    def test_textos_de_las_tablas_en_un_solo_archivo(self):
+        plantillas = Path(__file__).resolve().parent / 'templates'
+        for plantilla in plantillas.glob('*_list.html'):
+            contenido = plantilla.read_text(encoding='utf-8')
+            self.assertNotIn('var idioma_espanol', contenido)
+            self.assertIn("{% static 'js/tablas.js' %}", contenido)
+        tablas = Path(__file__).resolve().parent / 'static' / 'js' / 'tablas.js'
+        self.assertIn('var idioma_espanol', tablas.read_text(encoding='utf-8'))
+
+    def test_collectstatic_con_hash_comprimidos_y_cache_permanente(self):
+        with tempfile.TemporaryDirectory() as directorio, override_settings(STATIC_ROOT=directorio):
+            call_command('collectstatic', interactive=False, verbosity=0)
+            self.assertTrue(list(Path(directorio).glob('js/tablas.*.js.br')))
+            self.assertTrue(list(Path(directorio).glob('js/tablas.*.js.gz')))
+
+            url = staticfiles_storage.url('vendor/jquery-3.7.1/jquery.min.js')
+            self.assertRegex(url, r'^/static/vendor/jquery-3\.7\.1/jquery\.min\.[0-9a-f]{12}\.js$')
+
+            response = Client().get(url, HTTP_ACCEPT_ENCODING='gzip, br')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response['Content-Encoding'], 'br')
+            self.assertIn('immutable', response['Cache-Control'])
+            self.assertIn('max-age=315360000', response['Cache-Control'])
+            response.close()
+
+    def test_archivo_fuera_del_manifiesto_es_un_error(self):
+        with tempfile.TemporaryDirectory() as directorio, override_settings(STATIC_ROOT=directorio):
+            call_command('collectstatic', interactive=False, verbosity=0)
+            with self.assertRaises(ValueError):
+                staticfiles_storage.url('vendor/no-existe/libreria.js')
+
+    def test_las_librerias_enlazadas_estan_en_el_repositorio(self):
+        with tempfile.TemporaryDirectory() as directorio, override_settings(STATIC_ROOT=directorio):
+            call_command('collectstatic', interactive=False, verbosity=0)
+            html = Client().get('/').content.decode()
+            self.assertRegex(html, r'/static/vendor/datatables-2\.3\.8/js/dataTables\.min\.[0-9a-f]{12}\.js')
+            self.assertRegex(html, r'/static/vendor/bootstrap-icons-1\.11\.3/font/bootstrap-icons\.[0-9a-f]{12}\.css')
+            # Las fuentes que enlaza el CSS de los íconos también se copian con hash
+            self.assertTrue(list(Path(directorio).glob('vendor/bootstrap-icons-1.11.3/font/fonts/bootstrap-icons.*.woff2')))
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class ListasTests(TestCase):
+    """Las listas leen solo las columnas que muestran y el comienzo de las observaciones."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('laboratorio', password='clave-de-prueba')
+        cls.corta = Temperatura.objects.create(temperatura=Decimal('24.5'), hora=datetime.time(7, 30),
+                                               area_de_trabajo='Área Fase Adulta', obs='<b>corta</b>')
+        cls.larga = Temperatura.objects.create(temperatura=Decimal('25.5'), hora=datetime.time(12, 0),
+                                               area_de_trabajo='Área Fase Adulta', obs='x' * 500 + ' fin')
+
+    def setUp(self):
+        caches['default'].clear()
+        self.client.force_login(self.usuario)
+
+    def test_filas_sin_instancias_del_modelo(self):
+        filas = {fila.pk: fila for fila in listas.TEMPERATURA.queryset()}
+        self.assertFalse(hasattr(filas[self.corta.pk], '__dict__'))
+        for obj in (self.corta, self.larga):
+            for campo in listas.TEMPERATURA.campos:
+                self.assertEqual(getattr(filas[obj.pk], campo), getattr(obj, campo))
+        self.assertEqual(filas[self.corta.pk].obs, '<b>corta</b>')
+        self.assertFalse(filas[self.corta.pk].observaciones_larga)
+        self.assertEqual(filas[self.larga.pk].obs, 'x' * listas.OBSERVACIONES_VISIBLES)
+        self.assertTrue(filas[self.larga.pk].observaciones_larga)
+        with self.assertNumQueries(1):
+            pagina = listas.TEMPERATURA.queryset().pagina(tamano=1)
+        self.assertEqual([fila.pk for fila in pagina], [self.larga.pk])
+        self.assertEqual(listas.TEMPERATURA.queryset().despues_de(pagina.siguiente).get().pk, self.corta.pk)
+
+    def test_observaciones_completas_bajo_pedido(self):
+        url = f'/temperaturas/{self.larga.pk}/observaciones/'
+        html = self.client.get('/temperaturas/').content.decode()
+        self.assertIn('<td>&lt;b&gt;corta&lt;/b&gt;</td>', html)
+        self.assertIn(f'<td>{"x" * listas.OBSERVACIONES_VISIBLES}… <a href="{url}" class="ver-observaciones">ver más</a></td>', html)
+        self.assertNotIn(' fin', html)
+        # La página de DataTables formatea la celda igual que la plantilla
+        datos = self.client.get('/temperaturas/datos/').json()['data']
+        self.assertEqual(datos[0][-2], f'{"x" * listas.OBSERVACIONES_VISIBLES}… <a href="{url}" class="ver-observaciones">ver más</a>')
+        self.assertEqual(self.client.get(url).json(), {'observaciones': 'x' * 500 + ' fin'})
+        self.assertEqual(self.client.get('/temperaturas/0/observaciones/').status_code, 404)
+
+
+class FiltrosTests(TestCase):
+    """Los filtros de la URL en las listas, sus páginas de DataTables y las exportaciones."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('laboratorio', password='clave-de-prueba')
+        cls.lecturas = {}
+        for dia, hora, area in [(1, 7, 'Área Fase Adulta'), (3, 12, 'Área Fase Adulta'), (3, 23, 'Área Fase Adulta'),
+                                (5, 7, 'Área Fase Inmadura'), (9, 7, 'Área Fase Adulta')]:
+            cls.lecturas[dia, hora, area] = Temperatura.objects.create(
+                hora=datetime.time(hora), area_de_trabajo=area,
+                fecha_creacion=datetime.datetime(2024, 3, dia, hora, 15),
+            ).pk
+
+    def setUp(self):
+        caches['default'].clear()
+        self.client.force_login(self.usuario)
+
+    def pks(self, **params):
+        return set(Temperatura.objects.filter(filtros.TEMPERATURA.condicion(params)).values_list('pk', flat=True))
+
+    def lecturas_de(self, condicion):
+        return {pk for clave, pk in self.lecturas.items() if condicion(*clave)}
+
+    def test_rango_de_fechas_area_y_hora(self):
+        self.assertEqual(
+            self.pks(desde='2024-03-03', hasta='2024-03-05', area=' Área Fase Adulta '),
+            self.lecturas_de(lambda dia, hora, area: 3 <= dia <= 5 and area == 'Área Fase Adulta'),
+        )
+        # "hasta" incluye todas las horas del último día
+        self.assertEqual(self.pks(hasta='2024-03-03'), self.lecturas_de(lambda dia, hora, area: dia <= 3))
+        self.assertEqual(self.pks(hasta='9999-12-31'), set(self.lecturas.values()))
+        self.assertEqual(self.pks(desde='2024-03-01', hora='07:00-12:00'), self.lecturas_de(lambda dia, hora, area: 7 <= hora <= 12))
+        self.assertEqual(self.pks(desde='2024-03-01', hora='22:00-08:00'), self.lecturas_de(lambda dia, hora, area: hora in (7, 23)))
+        self.assertEqual(self.pks(area='Área Fase Adulta', hora='12:00'), self.lecturas_de(lambda dia, hora, area: hora == 12))
+        # Los parámetros vacíos y los que no son filtros no cambian nada
+        self.assertEqual(self.pks(desde='', area='', draw='2', formato='xlsx'), set(self.lecturas.values()))
+
+    def test_filtros_invalidos(self):
+        casos = [
+            (filtros.TEMPERATURA, {'desde': '03/03/2024'}),
+            (filtros.TEMPERATURA, {'desde': '2024-03-05', 'hasta': '2024-03-01'}),
+            (filtros.TEMPERATURA, {'hora': '07:00-12:00'}),
+            (filtros.TEMPERATURA, {'desde': '2024-03-01', 'hora': 'mañana'}),
+            (filtros.TEMPERATURA, {'area': 'Área Fase Adulta', 'hora': '07:30+05:00'}),
+            (filtros.TEMPERATURA, {'area': 'Área Fase Adulta', 'hora': '22:00-07:30Z'}),
+            (filtros.TEMPERATURA, {'cepa': 'Yaviza'}),
+            (filtros.VIDA, {'area': 'Área Fase Adulta'}),
+            (filtros.REGISTRO_TEMPERATURA_AGUA, {'desde': '2024-03-01', 'hora': '07:30'}),
+        ]
+        for filtro, params in casos:
+            with self.subTest(modelo=filtro.modelo.__name__, params=params):
+                with self.assertRaises(filtros.FiltroInvalido):
+                    filtro.condicion(params)
+
+    def test_lista_datos_y_exportacion(self):
+        params = {'desde': '2024-03-03', 'area': 'Área Fase Adulta'}
+        esperados = self.lecturas_de(lambda dia, hora, area: dia >= 3 and area == 'Área Fase Adulta')
+        consulta = 'desde=2024-03-03&area=%C3%81rea+Fase+Adulta'
+
+        response = self.client.get('/temperaturas/', params)
+        self.assertEqual({fila.pk for fila in response.context['temperaturas']}, esperados)
+        self.assertEqual(response.context['total'], len(esperados))
+        self.assertContains(response, f'href="/temperaturas/exportar/?{consulta.replace("&", "&amp;")}"')
+        self.assertContains(response, f'href="/temperaturas/exportar/?formato=xlsx&amp;{consulta.replace("&", "&amp;")}"')
+        self.assertEqual(response.context['filtros'], consulta)
+        self.assertContains(response, 'ajaxPorCursor("/temperaturas/datos/?desde')
+
+        datos = self.client.get('/temperaturas/datos/', {**params, 'search[value]': '23:15'}).json()
+        self.assertEqual(datos['recordsTotal'], len(esperados))
+        datos = self.client.get('/temperaturas/datos/', {**params, 'length': '1'}).json()
+        siguiente = self.client.get('/temperaturas/datos/', {**params, 'length': '10', 'cursor': datos['siguiente']}).json()
+        self.assertEqual({int(fila[0]) for fila in datos['data'] + siguiente['data']}, esperados)
+
+        csv = async_to_sync(leer)(self.client.get('/temperaturas/exportar/', params)).decode('utf-8-sig')
+        self.assertEqual({int(linea.split(',')[0]) for linea in csv.splitlines()[1:]}, esperados)
+
+        for url in ('/temperaturas/', '/temperaturas/datos/', '/temperaturas/exportar/'):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url, {'hora': '07:00'}).status_code, 400)
+                self.assertEqual(self.client.get(url, {'hora': '07:30+05:00', 'area': 'X'}).status_code, 400)
+                self.assertEqual(self.client.get(url, {'hasta': '9999-12-31'}).status_code, 200)
+        self.assertEqual(self.client.get('/vidas/', {'area': 'Área Fase Adulta'}).status_code, 400)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class AnaliticaTests(TestCase):
+    """Las estadísticas vectorizadas de las series coinciden con el cálculo fila por fila."""
+
+    @classmethod
+    def setUpTestData(cls):
+        for area, dia, hora, valor, maximo, minimo in [
+            ('Área Fase Adulta', 1, 7, '25.0', '30.0', '20.0'),
+            ('Área Fase Adulta', 1, 12, '31.0', '30.0', '20.0'),
+            ('Área Fase Adulta', 3, 7, '27.0', None, None),
+            ('Área Fase Inmadura', 1, 7, '19.0', '30.0', '20.0'),
+            ('Área Fase Inmadura', 2, 7, '22.0', '30.0', '20.0'),
+            ('Área Fase Inmadura', 2, 12, None, '30.0', '20.0'),
+        ]:
+            Temperatura.objects.create(
+                temperatura=valor and Decimal(valor), max_temperatura=maximo and Decimal(maximo),
+                min_temperatura=minimo and Decimal(minimo), hora=datetime.time(hora), area_de_trabajo=area,
+                fecha_creacion=datetime.datetime(2024, 3, dia, hora),
+            )
+
+    def setUp(self):
+        caches['default'].clear()
+
+    def filas(self, diario):
+        return list(zip(diario.grupo.tolist(), diario.dia.astype(str).tolist(), diario.cantidad.tolist(),
+                        diario.promedio.tolist(), diario.minimo.tolist(), diario.maximo.tolist()))
+
+    def test_estadisticas_diarias_y_fuera_de_rango(self):
+        serie = analitica.cargar(analitica.TEMPERATURA)
+        self.assertEqual(serie.grupos, ('Área Fase Adulta', 'Área Fase Inmadura'))
+        self.assertEqual(len(serie), 5)
+        diario = serie.diario()
+        self.assertEqual(self.filas(diario), [
+            (0, '2024-03-01', 2, 28.0, 25.0, 31.0),
+            (0, '2024-03-03', 1, 27.0, 27.0, 27.0),
+            (1, '2024-03-01', 1, 19.0, 19.0, 19.0),
+            (1, '2024-03-02', 1, 22.0, 22.0, 22.0),
+        ])
+        envolvente = serie.fuera_de_rango()
+        self.assertEqual(envolvente.evaluadas.tolist(), [2, 2])
+        self.assertEqual(envolvente.arriba.tolist(), [1, 0])
+        self.assertEqual(envolvente.abajo.tolist(), [0, 1])
+        self.assertEqual(envolvente.fraccion.tolist(), [0.5, 0.5])
+
+        adulta = analitica.cargar(analitica.TEMPERATURA, {'area': 'Área Fase Adulta', 'hasta': '2024-03-02'})
+        self.assertEqual(adulta.valor.tolist(), [25.0, 31.0])
+        with self.assertRaises(filtros.FiltroInvalido):
+            analitica.cargar(analitica.TEMPERATURA, {'cepa': 'Yaviza'})
+
+    def test_ventana_movil(self):
+        movil = analitica.cargar(analitica.TEMPERATURA).movil(dias=2)
+        self.assertEqual(movil.dias.astype(str).tolist(), ['2024-03-01', '2024-03-02', '2024-03-03'])
+        self.assertEqual(movil.cantidad.tolist(), [[2, 2, 1], [1, 2, 1]])
+        self.assertEqual(movil.promedio.tolist(), [[28.0, 28.0, 27.0], [19.0, 20.5, 22.0]])
+        self.assertEqual(movil.minimo.tolist(), [[25.0, 25.0, 27.0], [19.0, 19.0, 22.0]])
+        self.assertEqual(movil.maximo.tolist(), [[31.0, 31.0, 27.0], [19.0, 22.0, 22.0]])
+        # Un día sin lecturas en la ventana queda en nan
+        un_dia = analitica.cargar(analitica.TEMPERATURA).movil(dias=1)
+        self.assertTrue(numpy.isnan(un_dia.promedio[0, 1]))
+        self.assertEqual(un_dia.cantidad[0, 1], 0)
+
+    def test_diario_y_movil_desde_los_resumenes(self):
+        for params in ({}, {'area': 'Área Fase Adulta', 'hasta': '2024-03-02'}, {'desde': '2024-03-02', 'hasta': '9999-12-31'}):
+            with self.subTest(params=params):
+                serie = analitica.cargar(analitica.TEMPERATURA, params)
+                # Una sola consulta, a ResumenDiario: no se leen las lecturas
+                with self.assertNumQueries(1):
+                    diario = analitica.diario(analitica.TEMPERATURA, params)
+                self.assertEqual(diario.grupos, serie.grupos)
+                self.assertEqual(self.filas(diario), self.filas(serie.diario()))
+        movil = analitica.movil(analitica.TEMPERATURA, dias=2)
+        self.assertEqual(movil.cantidad.tolist(), [[2, 2, 1], [1, 2, 1]])
+        self.assertEqual(movil.promedio.tolist(), [[28.0, 28.0, 27.0], [19.0, 20.5, 22.0]])
+
+        # Los resúmenes diarios no distinguen la hora: con 'hora' se calcula sobre las lecturas
+        params = {'desde': '2024-03-01', 'hora': '07:00'}
+        self.assertEqual(self.filas(analitica.diario(analitica.TEMPERATURA, params)), [
+            (0, '2024-03-01', 1, 25.0, 25.0, 25.0),
+            (0, '2024-03-03', 1, 27.0, 27.0, 27.0),
+            (1, '2024-03-01', 1, 19.0, 19.0, 19.0),
+            (1, '2024-03-02', 1, 22.0, 22.0, 22.0),
+        ])
+        self.assertEqual(analitica.diario(analitica.HUMEDAD).grupos, ())
+        with self.assertRaises(filtros.FiltroInvalido):
+            analitica.diario(analitica.TEMPERATURA, {'desde': '2024-03-02', 'hasta': '2024-03-01'})
+
+    def test_temperatura_del_agua_tres_lecturas_por_registro(self):
+        RegistroTemperaturaAgua.objects.create(
+            fecha=datetime.date(2024, 3, 1), especie='Aedes aegypti', cepa='Rockefeller',
+            fecha_bandeja=datetime.date(2024, 2, 20),
+            temp_730am=Decimal('26.50'), temp_max_730am=Decimal('27.00'), temp_min_730am=Decimal('26.00'),
+            temp_1500pm=Decimal('28.25'), temp_max_1500pm=Decimal('28.00'), temp_min_1500pm=Decimal('27.00'),
+        )
+        serie = analitica.cargar(analitica.REGISTRO_TEMPERATURA_AGUA)
+        self.assertEqual(serie.grupos, ('Aedes aegypti / Rockefeller',))
+        self.assertEqual(serie.instante.astype(str).tolist(), ['2024-03-01T07:30:00', '2024-03-01T15:00:00'])
+        self.assertEqual(serie.valor.tolist(), [26.5, 28.25])
+        self.assertEqual(serie.fuera_de_rango().arriba.tolist(), [1])
+
+    def test_cache_por_filtros_y_version_del_modelo(self):
+        primera = analitica.serie(analitica.TEMPERATURA, {'desde': '2024-03-01'})
+        with self.assertNumQueries(0):
+            segunda = analitica.serie(analitica.TEMPERATURA, {'desde': '2024-03-01'})
+        self.assertEqual(segunda.valor.tolist(), primera.valor.tolist())
+        self.assertEqual(len(analitica.serie(analitica.TEMPERATURA, {'area': 'Área Fase Inmadura'})), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Temperatura.objects.create(temperatura=Decimal('24.0'), hora=datetime.time(7), area_de_trabajo='Área Fase Adulta',
+                                       fecha_creacion=datetime.datetime(2024, 3, 4, 7))
+        self.assertEqual(len(analitica.serie(analitica.TEMPERATURA, {'desde': '2024-03-01'})), 6)
+
+
+class AlertasTests(TestCase):
+    """Las lecturas fuera de rango registran su alerta al guardarse, sin consultas si están dentro."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.adulta = ReglaAlerta.objects.create(variable='temperatura', area_de_trabajo='Área Fase Adulta', maximo=Decimal('30.0'))
+        cls.todas = ReglaAlerta.objects.create(variable='temperatura', minimo=Decimal('15.0'))
+        cls.agua = ReglaAlerta.objects.create(variable='temperatura_agua', especie='Aedes aegypti', franja='1500pm', maximo=Decimal('28.0'))
+
+    def setUp(self):
+        # Las reglas en memoria son del proceso: que no pasen de una prueba a otra
+        alertas.olvidar_reglas()
+        self.addCleanup(alertas.olvidar_reglas)
+
+    def temperatura(self, valor, area='Área Fase Adulta'):
+        return Temperatura.objects.create(temperatura=Decimal(valor), hora=datetime.time(7), area_de_trabajo=area,
+                                          fecha_creacion=datetime.datetime(2024, 3, 1, 7))
+
+    def test_alerta_por_area_y_general(self):
+        alta = self.temperatura('31.0')
+        self.temperatura('31.0', area='Área Fase Inmadura')
+        baja = self.temperatura('14.0', area='Área Fase Inmadura')
+        self.temperatura('25.0')
+        self.assertEqual(
+            sorted(Alerta.objects.values_list('regla', 'registro', 'valor', 'limite')),
+            sorted([(self.adulta.pk, alta.pk, Decimal('31.0'), Decimal('30.0')),
+                    (self.todas.pk, baja.pk, Decimal('14.0'), Decimal('15.0'))]),
+        )
+        self.assertEqual(SalidaAlerta.objects.filter(entregada__isnull=True).count(), 2)
+
+    def test_editar_no_repite_la_alerta(self):
+        lectura = self.temperatura('31.0')
+        lectura.temperatura = Decimal('32.0')
+        lectura.save()
+        lectura.temperatura = Decimal('25.0')
+        lectura.save()
+        self.assertEqual(Alerta.objects.count(), 1)
+        self.assertEqual(SalidaAlerta.objects.count(), 1)
+
+    def test_dentro_de_rango_no_consulta(self):
+        lectura = self.temperatura('25.0')
+        with self.assertNumQueries(0):
+            self.assertEqual(alertas.evaluar(lectura), [])
+        ReglaAlerta.objects.all().delete()
+        with self.assertNumQueries(1):
+            alertas.evaluar(lectura)
+        alta = Temperatura(temperatura=Decimal('99.0'), area_de_trabajo='Área Fase Adulta')
+        with self.assertNumQueries(0):
+            self.assertEqual(alertas.evaluar(alta), [])
+
+    def test_regla_editada_se_aplica_ya(self):
+        self.temperatura('25.0')
+        self.adulta.maximo = Decimal('20.0')
+        self.adulta.save()
+        lectura = self.temperatura('25.0')
+        self.assertEqual(list(Alerta.objects.values_list('regla', 'registro')), [(self.adulta.pk, lectura.pk)])
+
+    def test_temperatura_del_agua_por_franja(self):
+        registro = RegistroTemperaturaAgua.objects.create(
+            fecha=datetime.date(2024, 3, 1), especie='Aedes aegypti', cepa='Rockefeller', fecha_bandeja=datetime.date(2024, 2, 20),
+            temp_730am=Decimal('29.0'), temp_1500pm=Decimal('28.5'),
+        )
+        RegistroTemperaturaAgua.objects.create(
+            fecha=datetime.date(2024, 3, 1), especie='Culex', cepa='Rockefeller', fecha_bandeja=datetime.date(2024, 2, 20),
+            temp_1500pm=Decimal('35.0'),
+        )
+        self.assertEqual(list(Alerta.objects.values_list('regla', 'registro', 'franja')), [(self.agua.pk, registro.pk, '1500pm')])
+
+    def test_ingesta_revisa_el_lote(self):
+        creadas = ingesta.TEMPERATURA.guardar([
+            Temperatura(temperatura=Decimal(valor), hora=datetime.time(7), area_de_trabajo='Área Fase Adulta',
+                        fecha_creacion=datetime.datetime(2024, 3, 1, 7))
+            for valor in ('25.0', '31.0', '10.0')
+        ])
+        self.assertEqual(creadas, 3)
+        self.assertEqual(sorted(Alerta.objects.values_list('limite', flat=True)), [Decimal('15.0'), Decimal('30.0')])
+
+    def test_validacion_de_reglas(self):
+        for datos in [{'variable': 'temperatura'},
+                      {'variable': 'humedad', 'minimo': Decimal('80'), 'maximo': Decimal('60')},
+                      {'variable': 'humedad', 'maximo': Decimal('80'), 'especie': 'Aedes aegypti'},
+                      {'variable': 'temperatura_agua', 'maximo': Decimal('30'), 'area_de_trabajo': 'Área Fase Adulta'}]:
+            with self.subTest(datos=datos), self.assertRaises(ValidationError):
+                ReglaAlerta(**datos).full_clean()
+
+    @override_settings(ALERTAS_DESTINATARIOS=['insectario@example.org'])
+    def test_enviar_alertas(self):
+        self.temperatura('31.0')
+        self.temperatura('14.0')
+        call_command('enviar_alertas', stdout=io.StringIO())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['insectario@example.org'])
+        self.assertIn('2 lecturas fuera de rango', mail.outbox[0].subject)
+        self.assertFalse(SalidaAlerta.objects.filter(entregada__isnull=True).exists())
+        call_command('enviar_alertas', stdout=io.StringIO())
+        self.assertEqual(len(mail.outbox), 1)
+
+        self.temperatura('32.0')
+        with mock.patch.object(alertas, 'send_mail', side_effect=OSError('sin conexión')):
+            self.assertEqual(alertas.entregar(), (0, 1))
+        pendiente = SalidaAlerta.objects.get(entregada__isnull=True)
+        self.assertEqual((pendiente.intentos, pendiente.error), (1, 'sin conexión'))
+        self.assertEqual(alertas.entregar(), (1, 0))
+
+    @override_settings(ALERTAS_DESTINATARIOS=[])
+    def test_enviar_alertas_sin_destinatarios(self):
+        with self.assertRaises(CommandError):
+            call_command('enviar_alertas', stdout=io.StringIO())
@@ -7,31 +7,51 @@ urlpatterns = [
     path('', views.login_view, name='login'),
     path('logout/', views.logout_view, name='logout'),
 
+    # Métricas para Prometheus
+    path('metrics', views.metricas_view, name='metricas'),
+
     # URLs para Temperatura
     path('temperaturas/', views.temperatura_list, name='temperatura_list'),
+    path('temperaturas/datos/', views.temperatura_data, name='temperatura_data'),
+    path('temperaturas/<int:pk>/observaciones/', views.temperatura_observaciones, name='temperatura_observaciones'),
+    path('temperaturas/exportar/', views.temperatura_export, name='temperatura_export'),
+    path('temperaturas/ingesta/', views.temperatura_ingesta, name='temperatura_ingesta'),
     path('temperaturas/crear/', views.temperatura_create, name='temperatura_create'),
     path('temperaturas/<int:pk>/actualizar/', views.temperatura_update, name='temperatura_update'),
     path('temperaturas/<int:pk>/eliminar/', views.temperatura_delete, name='temperatura_delete'),
 
     # URLs para Humedad
     path('humedades/', views.humedad_list, name='humedad_list'),
+    path('humedades/datos/', views.humedad_data, name='humedad_data'),
+    path('humedades/<int:pk>/observaciones/', views.humedad_observaciones, name='humedad_observaciones'),
+    path('humedades/exportar/', views.humedad_export, name='humedad_export'),
+    path('humedades/ingesta/', views.humedad_ingesta, name='humedad_ingesta'),
     path('humedades/crear/', views.humedad_create, name='humedad_create'),
     path('humedades/<int:pk>/actualizar/', views.humedad_update, name='humedad_update'),
     path('humedades/<int:pk>/eliminar/', views.humedad_delete, name='humedad_delete'),
 
     # URLs para Vida
     path('vidas/', views.vida_list, name='vida_list'),
+    path('vidas/datos/', views.vida_data, name='vida_data'),
+    path('vidas/<int:pk>/observaciones/', views.vida_observaciones, name='vida_observaciones'),
+    path('vidas/exportar/', views.vida_export, name='vida_export'),
     path('vidas/crear/', views.vida_create, name='vida_create'),
     path('vidas/<int:pk>/actualizar/', views.vida_update, name='vida_update'),
     path('vidas/<int:pk>/eliminar/', views.vida_delete, name='vida_delete'),
 
     # URLs para Mortalidad_pupas
     path('mortalidad-pupas/', views.mortalidad_pupas_list, name='mortalidad_pupas_list'),
+    path('mortalidad-pupas/datos/', views.mortalidad_pupas_data, name='mortalidad_pupas_data'),
+    path('mortalidad-pupas/<int:pk>/observaciones/', views.mortalidad_pupas_observaciones, name='mortalidad_pupas_observaciones'),
+    path('mortalidad-pupas/exportar/', views.mortalidad_pupas_export, name='mortalidad_pupas_export'),
     path('mortalidad-pupas/crear/', views.mortalidad_pupas_create, name='mortalidad_pupas_create'),
     path('mortalidad-pupas/<int:pk>/actualizar/', views.mortalidad_pupas_update, name='mortalidad_pupas_update'),
     path('mortalidad-pupas/<int:pk>/eliminar/', views.mortalidad_pupas_delete, name='mortalidad_pupas_delete'),
 
     path('temperatura-agua/', views.registrotemperaturaagua_list, name='registrotemperaturaagua_list'),
+    path('temperatura-agua/datos/', views.registrotemperaturaagua_data, name='registrotemperaturaagua_data'),
+    path('temperatura-agua/<int:pk>/observaciones/', views.registrotemperaturaagua_observaciones, name='registrotemperaturaagua_observaciones'),
+    path('temperatura-agua/exportar/', views.registrotemperaturaagua_export, name='registrotemperaturaagua_export'),
     path('temperatura-agua/crear/', views.registrotemperaturaagua_create, name='registrotemperaturaagua_create'),
     path('temperatura-agua/<int:pk>/actualizar/', views.registrotemperaturaagua_update, name='registrotemperaturaagua_update'),
     path('temperatura-agua/<int:pk>/eliminar/', views.registrotemperaturaagua_delete, name='registrotemperaturaagua_delete'),    
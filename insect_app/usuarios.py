@@ -0,0 +1,127 @@
+"""
+Usuario de la sesión sin consultar la base de datos en cada petición.
+
+Cada vista con ``@login_required`` lee la sesión y el usuario antes de hacer
+nada. La sesión se lee de la caché (``SESSION_ENGINE = 'cached_db'`` en
+settings.py; se guarda también en la base de datos para que sobreviva a la
+caché) y ``UsuariosEnCache``, el ``ModelBackend`` de Django, guarda en la
+memoria del proceso el usuario de cada sesión durante
+``USUARIOS_CACHE_SEGUNDOS``. Django sigue comprobando en cada petición que la
+contraseña no cambió desde el inicio de sesión (el hash de la sesión), con el
+usuario guardado.
+
+Cada usuario tiene una versión en la caché de las sesiones, compartida por
+todos los procesos (``usuario:version:<id>``), que cambia al guardarlo o
+eliminarlo (cambio de contraseña, ``is_active``, ...; señales, ver
+``signals.py``) al confirmarse la transacción. El usuario guardado en un
+proceso solo se usa mientras la versión con que se leyó sea la actual: después
+de un cambio, cada worker lo vuelve a leer de la base de datos en su siguiente
+petición y las sesiones anteriores dejan de valer en todos los procesos. Al
+cerrar sesión la sesión se elimina de la caché y de la base de datos.
+"""
+import copy
+import functools
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+from django.db import transaction
+
+# Usuarios guardados como máximo; al llegar se vacía (son pocos usuarios)
+MAXIMO = 1000
+
+_usuarios = {}
+_candado = threading.Lock()
+
+
+def _duracion():
+    return getattr(settings, 'USUARIOS_CACHE_SEGUNDOS', 30)
+
+
+def backend():
+    return caches[settings.SESSION_CACHE_ALIAS]
+
+def _clave_version(user_id):
+    return f'usuario:version:{user_id}'
+
+def version(user_id):
+    """Versión actual del usuario ``user_id`` (cambia cada vez que se guarda)."""
+    cache = backend()
+    actual = cache.get(_clave_version(user_id))
+    if actual is None:
+        # Sin versión (caché vacía o la clave se descartó): se empieza una nueva,
+        # distinta de cualquiera con la que se haya guardado el usuario
+        cache.add(_clave_version(user_id), time.time_ns(), timeout=None)
+        actual = cache.get(_clave_version(user_id))
+    return actual
+
+async def aversion(user_id):
+    """Como ``version``, para las vistas asíncronas."""
+    cache = backend()
+    actual = await cache.aget(_clave_version(user_id))
+    if actual is None:
+        await cache.aadd(_clave_version(user_id), time.time_ns(), timeout=None)
+        actual = await cache.aget(_clave_version(user_id))
+    return actual
+
+def _nueva_version(user_id):
+    backend().set(_clave_version(user_id), time.time_ns(), timeout=None)
+
+
+def _guardado(user_id, version_actual):
+    with _candado:
+        guardado = _usuarios.get(str(user_id))
+    if guardado is None or guardado[0] < time.monotonic() or guardado[1] != version_actual:
+        return None
+    # Una copia por petición: la vista puede modificar el usuario
+    return copy.copy(guardado[2])
+
+
+def _guardar(user_id, version_leida, usuario):
+    if usuario is None:
+        return
+    with _candado:
+        if len(_usuarios) >= MAXIMO:
+            _usuarios.clear()
+        _usuarios[str(user_id)] = (time.monotonic() + _duracion(), version_leida, copy.copy(usuario))
+
+
+def olvidar(user_id):
+    """Descarta el usuario guardado en este proceso."""
+    with _candado:
+        _usuarios.pop(str(user_id), None)
+
+
+def invalidar(user_id):
+    """Descarta el usuario en todos los procesos al confirmarse la transacción en curso."""
+    olvidar(user_id)
+    transaction.on_commit(functools.partial(_nueva_version, user_id))
+
+
+def vaciar():
+    with _candado:
+        _usuarios.clear()
+
+
+class UsuariosEnCache(ModelBackend):
+    """``ModelBackend`` que guarda en el proceso el usuario de las sesiones."""
+
+    def get_user(self, user_id):
+        # La versión se lee antes que el usuario: si cambia entre las dos
+        # lecturas, el usuario queda guardado con la anterior y no se usa
+        version_actual = version(user_id)
+        usuario = _guardado(user_id, version_actual)
+        if usuario is None:
+            usuario = super().get_user(user_id)
+            _guardar(user_id, version_actual, usuario)
+        return usuario
+
+    async def aget_user(self, user_id):
+        version_actual = await aversion(user_id)
+        usuario = _guardado(user_id, version_actual)
+        if usuario is None:
+            usuario = await super().aget_user(user_id)
+            _guardar(user_id, version_actual, usuario)
+        return usuario
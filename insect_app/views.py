@@ -1,7 +1,20 @@
 from django.shortcuts import render, redirect, get_object_or_404
-from django.contrib.auth import authenticate, login, logout # Importa funciones de autenticación
+from django.contrib.auth import login, logout # Importa funciones de autenticación
 from django.contrib.auth.decorators import login_required # Decorador para requerir inicio de sesión
+from django.db import transaction
+from django.http import HttpResponseBadRequest
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 from .models import Temperatura, Humedad, Vida, Mortalidad_pupas, RegistroTemperaturaAgua
+from . import asincronas # Apoyo para las vistas asíncronas (ORM asíncrono con ASGI)
+from . import cache_listas # Páginas de lista en caché, por versión del modelo
+from . import condicional # Respuestas 304 (ETag / Last-Modified) en listas y exportaciones
+from . import datatables # Paginación del lado del servidor para las tablas
+from . import exportar # Exportación a CSV / XLSX
+from . import filtros # Filtros de la URL (fechas, área, especie, cepa, hora) de las listas
+from . import ingesta # Carga masiva desde los registradores
+from . import listas # Consultas de las listas (solo las columnas que se muestran)
+from . import metricas # Métricas de las peticiones para Prometheus
 from .forms import TemperaturaForm, HumedadForm, VidaForm, MortalidadPupasForm, CustomAuthenticationForm, RegistroTemperaturaAguaForm # Asegúrate de usar el nombre correcto del formulario
 # --- Vistas de Autenticación ---
 
@@ -12,15 +25,10 @@ def login_view(request):
     if request.method == 'POST':
         form = CustomAuthenticationForm(request, data=request.POST)
         if form.is_valid():
-            username = form.cleaned_data.get('username')
-            password = form.cleaned_data.get('password')
-            user = authenticate(username=username, password=password)
-            if user is not None:
-                login(request, user)
-                # CAMBIA ESTA LÍNEA
-                return redirect('temperatura_list') # Redirige temperatura_list
-            else:
-                form.add_error(None, "Nombre de usuario o contraseña incorrectos.")
+            # El formulario ya verificó la contraseña (authenticate en clean()): no se vuelve a calcular el hash
+            login(request, form.get_user())
+            # CAMBIA ESTA LÍNEA
+            return redirect('temperatura_list') # Redirige temperatura_list
     else:
         form = CustomAuthenticationForm()
     return render(request, 'login.html', {'form': form, 'titulo': 'Iniciar Sesión'})
@@ -33,17 +41,67 @@ def logout_view(request):
     logout(request)
     return redirect('login') # Redirige a la página de login después de cerrar sesión
 
+def metricas_view(request):
+    """
+    Métricas de las peticiones en formato Prometheus. Requiere el token de
+    METRICAS_TOKEN (Authorization: Bearer) o un usuario staff con sesión iniciada.
+    """
+    return metricas.respuesta(request)
+
 # --- Vistas para el modelo Temperatura ---
 
 @login_required # Protege esta vista, solo usuarios logueados pueden acceder
-def temperatura_list(request):
+@condicional.segun_cambios(Temperatura)
+@cache_listas.en_cache(Temperatura)
+async def temperatura_list(request):
     """
     Muestra una lista de todos los registros de Temperatura.
+    Solo se renderiza la primera página; el resto la pide DataTables a temperatura_data.
+    """
+    try:
+        condicion = filtros.TEMPERATURA.condicion(request.GET)
+    except filtros.FiltroInvalido as e:
+        return HttpResponseBadRequest(str(e))
+    pagina = await listas.TEMPERATURA.queryset().filter(condicion).apagina(tamano=datatables.LONGITUD_PAGINA) # Primera página, de la más reciente a la más antigua
+    return await asincronas.render(request, 'temperatura_list.html', {
+        'temperaturas': pagina.objetos,
+        'pagina': pagina,
+        'total': await Temperatura.objects.filter(condicion).acount(),
+        'filtros': filtros.TEMPERATURA.consulta(request.GET),
+    })
+
+@login_required
+async def temperatura_data(request):
+    """
+    Devuelve en JSON la página de registros de Temperatura que pide DataTables (modo serverSide).
+    """
+    return await datatables.arespuesta(request, datatables.TEMPERATURA)
+
+@login_required
+async def temperatura_observaciones(request, pk):
+    """
+    Devuelve en JSON las observaciones completas de un registro de Temperatura (enlace "ver más" de la lista).
+    """
+    return await listas.aobservaciones(request, listas.TEMPERATURA, pk)
+
+@login_required
+@condicional.segun_cambios(Temperatura)
+async def temperatura_export(request):
+    """
+    Descarga los registros de Temperatura en CSV o XLSX, con los filtros de la URL.
+    """
+    return await exportar.arespuesta(request, exportar.TEMPERATURA)
+
+@csrf_exempt # Los registradores se autentican con HTTP Basic, no con la sesión
+@require_POST
+def temperatura_ingesta(request):
+    """
+    Recibe un lote de lecturas de Temperatura (JSON o CSV) desde los registradores.
     """
-    temperaturas = Temperatura.objects.all().order_by('-fecha_creacion') # Ordenar por fecha de creación descendente
-    return render(request, 'temperatura_list.html', {'temperaturas': temperaturas})
+    return ingesta.respuesta(request, ingesta.TEMPERATURA)
 
 @login_required
+@transaction.atomic # La lectura y sus resúmenes se guardan juntos
 def temperatura_create(request):
     """
     Permite crear un nuevo registro de Temperatura.
@@ -58,6 +116,7 @@ def temperatura_create(request):
     return render(request, 'temperatura_form.html', {'form': form, 'titulo': 'Crear Registro de Temperatura'})
 
 @login_required
+@transaction.atomic # La lectura y sus resúmenes se guardan juntos
 def temperatura_update(request, pk):
     """
     Permite actualizar un registro de Temperatura existente.
@@ -73,6 +132,7 @@ def temperatura_update(request, pk):
     return render(request, 'temperatura_form.html', {'form': form, 'titulo': 'Actualizar Registro de Temperatura'})
 
 @login_required
+@transaction.atomic # La lectura y sus resúmenes se guardan juntos
 def temperatura_delete(request, pk):
     """
     Permite eliminar un registro de Temperatura.
@@ -87,14 +147,57 @@ def temperatura_delete(request, pk):
 # --- Vistas para el modelo Humedad ---
 
 @login_required
-def humedad_list(request):
+@condicional.segun_cambios(Humedad)
+@cache_listas.en_cache(Humedad)
+async def humedad_list(request):
     """
     Muestra una lista de todos los registros de Humedad.
+    Solo se renderiza la primera página; el resto la pide DataTables a humedad_data.
+    """
+    try:
+        condicion = filtros.HUMEDAD.condicion(request.GET)
+    except filtros.FiltroInvalido as e:
+        return HttpResponseBadRequest(str(e))
+    pagina = await listas.HUMEDAD.queryset().filter(condicion).apagina(tamano=datatables.LONGITUD_PAGINA)
+    return await asincronas.render(request, 'humedad_list.html', {
+        'humedades': pagina.objetos,
+        'pagina': pagina,
+        'total': await Humedad.objects.filter(condicion).acount(),
+        'filtros': filtros.HUMEDAD.consulta(request.GET),
+    })
+
+@login_required
+async def humedad_data(request):
+    """
+    Devuelve en JSON la página de registros de Humedad que pide DataTables (modo serverSide).
     """
-    humedades = Humedad.objects.all().order_by('-fecha_creacion')
-    return render(request, 'humedad_list.html', {'humedades': humedades})
+    return await datatables.arespuesta(request, datatables.HUMEDAD)
 
 @login_required
+async def humedad_observaciones(request, pk):
+    """
+    Devuelve en JSON las observaciones completas de un registro de Humedad (enlace "ver más" de la lista).
+    """
+    return await listas.aobservaciones(request, listas.HUMEDAD, pk)
+
+@login_required
+@condicional.segun_cambios(Humedad)
+async def humedad_export(request):
+    """
+    Descarga los registros de Humedad en CSV o XLSX, con los filtros de la URL.
+    """
+    return await exportar.arespuesta(request, exportar.HUMEDAD)
+
+@csrf_exempt # Los registradores se autentican con HTTP Basic, no con la sesión
+@require_POST
+def humedad_ingesta(request):
+    """
+    Recibe un lote de lecturas de Humedad (JSON o CSV) desde los registradores.
+    """
+    return ingesta.respuesta(request, ingesta.HUMEDAD)
+
+@login_required
+@transaction.atomic # La lectura y sus resúmenes se guardan juntos
 def humedad_create(request):
     """
     Permite crear un nuevo registro de Humedad.
@@ -109,6 +212,7 @@ def humedad_create(request):
     return render(request, 'humedad_form.html', {'form': form, 'titulo': 'Crear Registro de Humedad'})
 
 @login_required
+@transaction.atomic # La lectura y sus resúmenes se guardan juntos
 def humedad_update(request, pk):
     """
     Permite actualizar un registro de Humedad existente.
@@ -124,6 +228,7 @@ def humedad_update(request, pk):
     return render(request, 'humedad_form.html', {'form': form, 'titulo': 'Actualizar Registro de Humedad'})
 
 @login_required
+@transaction.atomic # La lectura y sus resúmenes se guardan juntos
 def humedad_delete(request, pk):
     """
     Permite eliminar un registro de Humedad.
@@ -138,12 +243,46 @@ def humedad_delete(request, pk):
 # --- Vistas para el modelo Vida ---
 
 @login_required
-def vida_list(request):
+@condicional.segun_cambios(Vida)
+@cache_listas.en_cache(Vida)
+async def vida_list(request):
     """
     Muestra una lista de todos los registros de Vida.
+    Solo se renderiza la primera página; el resto la pide DataTables a vida_data.
+    """
+    try:
+        condicion = filtros.VIDA.condicion(request.GET)
+    except filtros.FiltroInvalido as e:
+        return HttpResponseBadRequest(str(e))
+    pagina = await listas.VIDA.queryset().filter(condicion).apagina(tamano=datatables.LONGITUD_PAGINA)
+    return await asincronas.render(request, 'vida_list.html', {
+        'vidas': pagina.objetos,
+        'pagina': pagina,
+        'total': await Vida.objects.filter(condicion).acount(),
+        'filtros': filtros.VIDA.consulta(request.GET),
+    })
+
+@login_required
+async def vida_data(request):
+    """
+    Devuelve en JSON la página de registros de Vida que pide DataTables (modo serverSide).
     """
-    vidas = Vida.objects.all().order_by('-fecha_creacion')
-    return render(request, 'vida_list.html', {'vidas': vidas})
+    return await datatables.arespuesta(request, datatables.VIDA)
+
+@login_required
+async def vida_observaciones(request, pk):
+    """
+    Devuelve en JSON las observaciones completas de un registro de Vida (enlace "ver más" de la lista).
+    """
+    return await listas.aobservaciones(request, listas.VIDA, pk)
+
+@login_required
+@condicional.segun_cambios(Vida)
+async def vida_export(request):
+    """
+    Descarga los registros de Vida en CSV o XLSX, con los filtros de la URL.
+    """
+    return await exportar.arespuesta(request, exportar.VIDA)
 
 @login_required
 def vida_create(request):
@@ -189,12 +328,46 @@ def vida_delete(request, pk):
 # --- Vistas para el modelo Mortalidad_pupas ---
 
 @login_required
-def mortalidad_pupas_list(request):
+@condicional.segun_cambios(Mortalidad_pupas)
+@cache_listas.en_cache(Mortalidad_pupas)
+async def mortalidad_pupas_list(request):
     """
     Muestra una lista de todos los registros de Mortalidad_pupas.
+    Solo se renderiza la primera página; el resto la pide DataTables a mortalidad_pupas_data.
+    """
+    try:
+        condicion = filtros.MORTALIDAD_PUPAS.condicion(request.GET)
+    except filtros.FiltroInvalido as e:
+        return HttpResponseBadRequest(str(e))
+    pagina = await listas.MORTALIDAD_PUPAS.queryset().filter(condicion).apagina(tamano=datatables.LONGITUD_PAGINA)
+    return await asincronas.render(request, 'mortalidad_pupas_list.html', {
+        'mortalidades': pagina.objetos,
+        'pagina': pagina,
+        'total': await Mortalidad_pupas.objects.filter(condicion).acount(),
+        'filtros': filtros.MORTALIDAD_PUPAS.consulta(request.GET),
+    })
+
+@login_required
+async def mortalidad_pupas_data(request):
+    """
+    Devuelve en JSON la página de registros de Mortalidad_pupas que pide DataTables (modo serverSide).
+    """
+    return await datatables.arespuesta(request, datatables.MORTALIDAD_PUPAS)
+
+@login_required
+async def mortalidad_pupas_observaciones(request, pk):
+    """
+    Devuelve en JSON las observaciones completas de un registro de Mortalidad_pupas (enlace "ver más" de la lista).
+    """
+    return await listas.aobservaciones(request, listas.MORTALIDAD_PUPAS, pk)
+
+@login_required
+@condicional.segun_cambios(Mortalidad_pupas)
+async def mortalidad_pupas_export(request):
+    """
+    Descarga los registros de Mortalidad_pupas en CSV o XLSX, con los filtros de la URL.
     """
-    mortalidades = Mortalidad_pupas.objects.all().order_by('-fecha_creacion')
-    return render(request, 'mortalidad_pupas_list.html', {'mortalidades': mortalidades})
+    return await exportar.arespuesta(request, exportar.MORTALIDAD_PUPAS)
 
 @login_required
 def mortalidad_pupas_create(request):
@@ -237,13 +410,50 @@ def mortalidad_pupas_delete(request, pk):
     return render(request, 'mortalidad_pupas_confirm_delete.html', {'mortalidad': mortalidad})
 
 
-def registrotemperaturaagua_list(request):
+@login_required
+@condicional.segun_cambios(RegistroTemperaturaAgua)
+@cache_listas.en_cache(RegistroTemperaturaAgua)
+async def registrotemperaturaagua_list(request):
     """
     Muestra una lista de todos los registros de Temperatura del Agua.
+    Solo se renderiza la primera página; el resto la pide DataTables a registrotemperaturaagua_data.
+    """
+    try:
+        condicion = filtros.REGISTRO_TEMPERATURA_AGUA.condicion(request.GET)
+    except filtros.FiltroInvalido as e:
+        return HttpResponseBadRequest(str(e))
+    pagina = await listas.REGISTRO_TEMPERATURA_AGUA.queryset().filter(condicion).apagina(tamano=datatables.LONGITUD_PAGINA)
+    return await asincronas.render(request, 'registrotemperaturaagua_list.html', {
+        'registros': pagina.objetos,
+        'pagina': pagina,
+        'total': await RegistroTemperaturaAgua.objects.filter(condicion).acount(),
+        'filtros': filtros.REGISTRO_TEMPERATURA_AGUA.consulta(request.GET),
+    })
+
+@login_required
+async def registrotemperaturaagua_data(request):
     """
-    registros = RegistroTemperaturaAgua.objects.all().order_by('-fecha_creacion')
-    return render(request, 'registrotemperaturaagua_list.html', {'registros': registros})
+    Devuelve en JSON la página de registros de Temperatura del Agua que pide DataTables (modo serverSide).
+    """
+    return await datatables.arespuesta(request, datatables.REGISTRO_TEMPERATURA_AGUA)
 
+@login_required
+async def registrotemperaturaagua_observaciones(request, pk):
+    """
+    Devuelve en JSON las observaciones completas de un registro de RegistroTemperaturaAgua (enlace "ver más" de la lista).
+    """
+    return await listas.aobservaciones(request, listas.REGISTRO_TEMPERATURA_AGUA, pk)
+
+@login_required
+@condicional.segun_cambios(RegistroTemperaturaAgua)
+async def registrotemperaturaagua_export(request):
+    """
+    Descarga los registros de Temperatura del Agua en CSV o XLSX, con los filtros de la URL.
+    """
+    return await exportar.arespuesta(request, exportar.REGISTRO_TEMPERATURA_AGUA)
+
+@login_required
+@transaction.atomic # El registro y sus alertas se guardan juntos
 def registrotemperaturaagua_create(request):
     """
     Permite crear un nuevo registro de Temperatura del Agua.
@@ -257,6 +467,8 @@ def registrotemperaturaagua_create(request):
         form = RegistroTemperaturaAguaForm()
     return render(request, 'registrotemperaturaagua_form.html', {'form': form, 'titulo': 'Crear Nuevo Registro de Temperatura del Agua'})
 
+@login_required
+@transaction.atomic # El registro y sus alertas se guardan juntos
 def registrotemperaturaagua_update(request, pk):
     """
     Permite actualizar un registro de Temperatura del Agua existente.
@@ -271,6 +483,7 @@ def registrotemperaturaagua_update(request, pk):
         form = RegistroTemperaturaAguaForm(instance=registro)
     return render(request, 'registrotemperaturaagua_form.html', {'form': form, 'titulo': 'Actualizar Registro de Temperatura del Agua'})
 
+@login_required
 def registrotemperaturaagua_delete(request, pk):
     """
     Permite eliminar un registro de Temperatura del Agua.
@@ -0,0 +1,299 @@
+"""
+Lectura de volcados SQL de MySQL/MariaDB (mysqldump, phpMyAdmin).
+
+``filas(archivo)`` recorre el volcado una sola vez, por bloques, y genera
+``(tabla, valores)`` por cada fila de cada ``INSERT INTO ... VALUES``, con los
+valores ya convertidos a tipos de Python:
+
+* ``NULL`` -> ``None``
+* enteros -> ``int``; números con punto decimal o exponente -> ``Decimal``
+  (sin pasar por ``float``, para no perder los decimales)
+* cadenas (``'...'`` o ``"..."``) -> ``str``, con las secuencias de escape de
+  MySQL (``\\'``, ``\\\\``, ``\\n``, ``\\0``, ...) y la comilla repetida
+  (``''``) ya resueltas
+
+El análisis es léxico: cada token (o cada fila completa, ver ``_FILA``) se
+reconoce con una expresión regular anclada en la posición actual, sin volver a
+recorrer el resto del texto. Las comillas, paréntesis, comas o punto y coma
+dentro de las cadenas no afectan a la estructura, da igual que cada fila esté en
+su línea o que todo el ``INSERT`` esté en una sola, y la memoria depende del
+tamaño del bloque y de la fila más larga, no del tamaño del volcado.
+
+Las demás sentencias (``CREATE TABLE``, ``SET``, comentarios) se saltan.
+"""
+import re
+from decimal import Decimal
+
+TAMANO_BLOQUE = 1 << 16
+
+# Tipos de token
+CADENA = 'cadena'
+NUMERO = 'numero'
+PALABRA = 'palabra'
+IDENTIFICADOR = 'identificador'
+SIMBOLO = 'simbolo'
+
+_CADENA_SIMPLE = r"'[^'\\]*(?:(?:\\.|'')[^'\\]*)*'"
+_CADENA_DOBLE = r'"[^"\\]*(?:(?:\\.|"")[^"\\]*)*"'
+_NUMERO = r'-?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?'
+_NULL = r'[Nn][Uu][Ll][Ll]\b'
+
+_TOKEN = re.compile(rf"""
+    (?P<espacio>\s+)
+  | (?P<comentario>--[^\n]*|\#[^\n]*|/\*.*?\*/)
+  | (?P<cadena>{_CADENA_SIMPLE}|{_CADENA_DOBLE})
+  | (?P<identificador>`[^`]*(?:``[^`]*)*`)
+  | (?P<numero>{_NUMERO})
+  | (?P<palabra>[A-Za-z_$][\w$]*)
+  | (?P<simbolo>/(?!\*)|[^\s\w'"`/])
+""", re.VERBOSE | re.DOTALL)
+
+_IGNORADOS = ('espacio', 'comentario')
+# Tokens que empiezan y terminan con el mismo carácter y lo admiten repetido dentro
+_ENTRE_COMILLAS = (CADENA, IDENTIFICADOR)
+
+# Una fila completa de VALUES con lo que la sigue ("," o ";"). Es el camino
+# rápido: una sola coincidencia por fila y ``findall`` para sus valores. Lo que
+# no encaje (una fila cortada entre dos bloques, comentarios entre filas, un
+# valor no soportado) se lee token por token.
+_VALOR = rf'(?:{_NUMERO}|{_CADENA_SIMPLE}|{_CADENA_DOBLE}|{_NULL})'
+_FILA = re.compile(rf'\s*\(\s*((?:{_VALOR}\s*,\s*)*{_VALOR})?\s*\)\s*([,;])', re.DOTALL)
+_VALORES = re.compile(_VALOR, re.DOTALL)
+
+# Máximo de textos distintos que se recuerdan ya convertidos (ver ``_Conversiones``)
+MAXIMO_CONVERSIONES = 10000
+
+# Secuencias de escape de las cadenas de MySQL; cualquier otra "\x" es "x",
+# salvo "\%" y "\_", que conservan la barra
+_ESCAPES = {
+    '0': '\0', "'": "'", '"': '"', 'b': '\b', 'n': '\n', 'r': '\r', 't': '\t',
+    'Z': '\x1a', '\\': '\\', '%': '\\%', '_': '\\_',
+}
+# Escapes y comilla repetida, en una sola pasada de izquierda a derecha
+_ESCAPE = {
+    "'": re.compile(r"\\(.)|''", re.DOTALL),
+    '"': re.compile(r'\\(.)|""', re.DOTALL),
+}
+
+
+class ErrorDeSintaxis(ValueError):
+    """El volcado no tiene la forma esperada de un INSERT de MySQL."""
+
+
+def _reemplazo(m):
+    escapado = m.group(1)
+    if escapado is None:
+        return m.group()[0]
+    return _ESCAPES.get(escapado, escapado)
+
+def _cadena(texto):
+    comilla = texto[0]
+    valor = texto[1:-1]
+    if '\\' in valor or comilla in valor:
+        valor = _ESCAPE[comilla].sub(_reemplazo, valor)
+    return valor
+
+def _numero(texto):
+    if '.' in texto or 'e' in texto or 'E' in texto:
+        return Decimal(texto)
+    return int(texto)
+
+class _Conversiones(dict):
+    """
+    Texto de un valor -> valor convertido. En un volcado se repiten mucho los
+    mismos valores (horas, áreas, lecturas), así que cada texto se convierte una
+    sola vez. Se vacía al llegar a ``MAXIMO_CONVERSIONES`` para acotar la memoria.
+    """
+
+    def __missing__(self, texto):
+        inicial = texto[0]
+        if inicial == "'" or inicial == '"':
+            valor = _cadena(texto)
+        elif inicial == 'N' or inicial == 'n':
+            valor = None
+        else:
+            valor = _numero(texto)
+        if len(self) >= MAXIMO_CONVERSIONES:
+            self.clear()
+        self[texto] = valor
+        return valor
+
+
+def _valor(tipo, texto):
+    if tipo == CADENA:
+        return _cadena(texto)
+    if tipo == NUMERO:
+        return _numero(texto)
+    if tipo == PALABRA and texto.upper() == 'NULL':
+        return None
+    raise ErrorDeSintaxis(f"Valor no soportado en VALUES: {texto!r}")
+
+
+class _Lector:
+    """
+    Recorre el texto de un volcado por bloques de ``tamano_bloque`` caracteres.
+    Solo guarda el bloque actual y lo que quedó sin leer del anterior.
+    """
+
+    def __init__(self, archivo, tamano_bloque=TAMANO_BLOQUE):
+        self.archivo = archivo
+        self.tamano_bloque = tamano_bloque
+        self.texto = ''
+        self.posicion = 0
+        self.fin = False
+        self.conversiones = _Conversiones()
+
+    def _leer(self):
+        bloque = self.archivo.read(self.tamano_bloque)
+        self.texto = self.texto[self.posicion:] + bloque
+        self.posicion = 0
+        self.fin = not bloque
+
+    def token(self):
+        """Devuelve el siguiente ``(tipo, texto)``, o ``(None, None)`` al final del volcado."""
+        while True:
+            texto = self.texto
+            posicion = self.posicion
+            if posicion >= len(texto):
+                if self.fin:
+                    return None, None
+                self._leer()
+                continue
+            m = _TOKEN.match(texto, posicion)
+            if m is None:
+                # Cadena o comentario sin cerrar: puede que se cierre en el bloque siguiente
+                if self.fin:
+                    raise ErrorDeSintaxis(f"Token sin terminar cerca de: {texto[posicion:posicion + 80]!r}")
+                self._leer()
+                continue
+            final = m.end()
+            tipo = m.lastgroup
+            # Una comilla justo después de una cadena significa que la cadena no se
+            # cerró dentro de ``texto`` (la expresión retrocedió desde un '')
+            sin_cerrar = tipo in _ENTRE_COMILLAS and final < len(texto) and texto[final] == texto[posicion]
+            if not self.fin and (final == len(texto) or sin_cerrar):
+                # El token puede seguir en el bloque siguiente
+                self._leer()
+                continue
+            if sin_cerrar:
+                raise ErrorDeSintaxis(f"Cadena sin terminar cerca de: {texto[posicion:posicion + 80]!r}")
+            self.posicion = final
+            if tipo not in _IGNORADOS:
+                return tipo, m.group()
+
+    def esperar_simbolo(self, simbolo):
+        tipo, texto = self.token()
+        if tipo != SIMBOLO or texto != simbolo:
+            raise ErrorDeSintaxis(f"Se esperaba {simbolo!r} y se encontró {texto!r}")
+
+    def saltar_sentencia(self):
+        tipo, texto = self.token()
+        while tipo is not None and not (tipo == SIMBOLO and texto == ';'):
+            tipo, texto = self.token()
+
+    def cabecera(self):
+        """``[IGNORE] INTO `tabla` [(columnas)] VALUES``; devuelve el nombre de la tabla."""
+        tipo, texto = self.token()
+        while tipo == PALABRA and texto.upper() != 'INTO':
+            # Modificadores: LOW_PRIORITY, DELAYED, HIGH_PRIORITY, IGNORE
+            tipo, texto = self.token()
+        if tipo != PALABRA:
+            raise ErrorDeSintaxis(f"Se esperaba INTO y se encontró {texto!r}")
+        tipo, tabla = self.token()
+        if tipo == IDENTIFICADOR:
+            tabla = tabla[1:-1].replace('``', '`')
+        elif tipo != PALABRA:
+            raise ErrorDeSintaxis(f"Se esperaba el nombre de la tabla y se encontró {tabla!r}")
+        tipo, texto = self.token()
+        if tipo == SIMBOLO and texto == '(':
+            while not (tipo == SIMBOLO and texto == ')'):
+                tipo, texto = self.token()
+                if tipo is None:
+                    raise ErrorDeSintaxis("Lista de columnas sin cerrar")
+            tipo, texto = self.token()
+        if tipo != PALABRA or texto.upper() not in ('VALUES', 'VALUE'):
+            raise ErrorDeSintaxis(f"Se esperaba VALUES y se encontró {texto!r}")
+        return tabla
+
+    def _fila_rapida(self):
+        """La fila en la posición actual y su separador, si encaja en ``_FILA``; si no, ``None``."""
+        m = _FILA.match(self.texto, self.posicion)
+        if m is None:
+            return None
+        self.posicion = m.end()
+        contenido = m.group(1)
+        if contenido is None:
+            return (), m.group(2)
+        return tuple(map(self.conversiones.__getitem__, _VALORES.findall(contenido))), m.group(2)
+
+    def _fila_por_tokens(self):
+        self.esperar_simbolo('(')
+        fila = []
+        while True:
+            tipo, texto = self.token()
+            if tipo is None:
+                raise ErrorDeSintaxis("Fila sin cerrar al final del volcado")
+            if tipo == SIMBOLO and texto == ')' and not fila:
+                break
+            fila.append(_valor(tipo, texto))
+            tipo, texto = self.token()
+            if tipo == SIMBOLO and texto == ')':
+                break
+            if tipo != SIMBOLO or texto != ',':
+                raise ErrorDeSintaxis(f"Se esperaba ',' o ')' y se encontró {texto!r}")
+        tipo, texto = self.token()
+        if tipo is not None and (tipo != SIMBOLO or texto not in (',', ';')):
+            raise ErrorDeSintaxis(f"Se esperaba ',' o ';' después de la fila y se encontró {texto!r}")
+        return tuple(fila), texto or ';'
+
+    def tuplas(self):
+        """Genera las filas de ``VALUES (...), (...);`` como tuplas de valores."""
+        while True:
+            fila, separador = self._fila_rapida() or self._fila_por_tokens()
+            yield fila
+            if separador == ';':
+                return
+
+
+def filas(archivo, tablas=None, tamano_bloque=TAMANO_BLOQUE):
+    """
+    Genera ``(tabla, valores)`` por cada fila insertada en el volcado. Con
+    ``tablas`` solo se entregan las filas de esas tablas (las demás se leen
+    igual, para saber dónde termina cada sentencia).
+    """
+    lector = _Lector(archivo, tamano_bloque)
+    while True:
+        tipo, texto = lector.token()
+        if tipo is None:
+            return
+        if tipo == SIMBOLO and texto == ';':
+            continue
+        if tipo == PALABRA and texto.upper() in ('INSERT', 'REPLACE'):
+            tabla = lector.cabecera()
+            if tablas is None or tabla in tablas:
+                for fila in lector.tuplas():
+                    yield tabla, fila
+            else:
+                for _ in lector.tuplas():
+                    pass
+        else:
+            lector.saltar_sentencia()
+
+
+def valores(texto):
+    """
+    Las filas de una lista de VALUES (``(...), (...)``, con o sin ``;`` al
+    final) como lista de tuplas.
+    """
+    return list(_Lector(_Texto(texto)).tuplas())
+
+
+class _Texto:
+    """Archivo de solo lectura sobre una cadena, entregada en un único bloque."""
+
+    def __init__(self, texto):
+        self.texto = texto
+
+    def read(self, tamano):
+        texto, self.texto = self.texto, ''
+        return texto
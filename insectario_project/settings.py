@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -46,8 +48,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'insect_app.metricas.MetricasMiddleware', # Primero, para medir la petición completa (ver /metrics)
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'insect_app.asincronas.ArchivosEstaticosMiddleware', # WhiteNoise, también con ASGI
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -60,7 +63,8 @@ ROOT_URLCONF = 'insectario_project.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # El motor de Django, midiendo el tiempo de render para las métricas (insect_app/metricas.py)
+        'BACKEND': 'insect_app.metricas.PlantillasDjango',
         'DIRS': [],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -79,9 +83,14 @@ WSGI_APPLICATION = 'insectario_project.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Conexiones por worker en el pool de la base de datos (ver insect_app/conexiones.py).
+# Con 0 no hay pool: cada hilo conserva su conexión CONN_MAX_AGE segundos (solo
+# sirve con WSGI; con ASGI cada petición abre la suya)
+BD_POOL = int(os.environ.get('BD_POOL', '10'))
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.mysql',
+        'ENGINE': 'insect_app.bd_mysql' if BD_POOL else 'django.db.backends.mysql',
         'NAME': 'bd_insectario',
         
         'USER': 'ins_user',
@@ -102,10 +111,74 @@ DATABASES = {
         # 'HOST': '127.0.0.1',        
         # 'PORT': '3307',
 
+        # Con el pool, Django "cierra" la conexión al final de cada petición y vuelve al pool
+        'CONN_MAX_AGE': 0 if BD_POOL else 60,
+        'CONN_HEALTH_CHECKS': True, # Comprueba la conexión conservada antes de reutilizarla
+        'OPTIONS': {'pool': {'maximo': BD_POOL}} if BD_POOL else {},
      }
 }
 
 
+# Caché
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Las páginas de lista se guardan en la caché CACHE_LISTAS (ver insect_app/cache_listas.py).
+# Gunicorn corre varios procesos, así que la caché tiene que ser compartida entre ellos:
+# en archivos (por defecto) o en memcached.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': Path(tempfile.gettempdir()) / 'insectario_cache',
+    },
+
+    # Con memcached (requiere el paquete pymemcache y un servidor memcached)
+    # 'default': {
+    #     'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+    #     'LOCATION': '127.0.0.1:11211',
+    # },
+
+    # En la memoria de cada proceso: solo con un único proceso (runserver)
+    # 'default': {
+    #     'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    # },
+}
+CACHE_LISTAS = 'default'
+
+
+# Sesiones y usuarios (ver insect_app/usuarios.py)
+# La sesión se lee de la caché (y se guarda también en la base de datos) y el
+# usuario de cada sesión se guarda USUARIOS_CACHE_SEGUNDOS en la memoria de cada
+# proceso: una petición con sesión iniciada no consulta la base de datos para
+# autenticarse.
+
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+AUTHENTICATION_BACKENDS = ['insect_app.usuarios.UsuariosEnCache']
+USUARIOS_CACHE_SEGUNDOS = 30
+
+
+# Métricas (/metrics, ver insect_app/metricas.py)
+# Prometheus se autentica con "Authorization: Bearer <METRICAS_TOKEN>"; sin token solo
+# pueden verlas los usuarios staff con sesión iniciada. Con varios procesos de gunicorn,
+# PROMETHEUS_MULTIPROC_DIR (variable de entorno, ver gunicorn.conf.py) suma las de todos.
+
+METRICAS_TOKEN = os.environ.get('METRICAS_TOKEN', '')
+
+
+# Alertas por umbrales (ver insect_app/alertas.py)
+# Las reglas activas se guardan ALERTAS_REGLAS_SEGUNDOS en la memoria de cada proceso.
+# `python manage.py enviar_alertas` envía las pendientes a ALERTAS_DESTINATARIOS
+# (variable de entorno, direcciones separadas por comas) con el servidor EMAIL_*.
+
+ALERTAS_REGLAS_SEGUNDOS = 30
+ALERTAS_DESTINATARIOS = [correo.strip() for correo in os.environ.get('ALERTAS_DESTINATARIOS', '').split(',') if correo.strip()]
+EMAIL_HOST = os.environ.get('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.environ.get('EMAIL_PORT') or 25)
+EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS', '') == '1'
+DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'insectario@localhost')
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -125,6 +198,22 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing
+# https://docs.djangoproject.com/en/5.2/topics/auth/passwords/
+# PBKDF2 con CLAVES_ITERACIONES iteraciones (variable de entorno; vacía: las de
+# Django), ver insect_app/claves.py. Los demás hashers verifican contraseñas
+# guardadas con ellos, que se vuelven a calcular con el primero al iniciar sesión.
+
+CLAVES_ITERACIONES = int(os.environ.get('CLAVES_ITERACIONES') or 0) or None
+PASSWORD_HASHERS = [
+    'insect_app.claves.PBKDF2Ajustable',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 
@@ -147,11 +236,14 @@ STATIC_URL = '/static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
-STORAGE = {
-    "staticfiles":{
-        "BACKEND":"whitenoise.storage.CompressedManifestStaticFilesStorage",
-    }
+# Nombres con hash, brotli/gzip y caché permanente (ver insect_app/estaticos.py)
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "insect_app.estaticos.ArchivosConHash",
+    },
 }
 STATICFILES_DIRS = [
     BASE_DIR / 'insect_app/static',